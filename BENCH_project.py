@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+The BENCH_project is the program for benchmarks of statistical modules
+(KGE_RMSD, DAV_metric) with synthetic data in the format of CDO text output
+(cdo -outputtab, cdo -outputts). The grid size (number of cells) and the
+length of timeseries (years, daily data) can be changed, so the benchmarks
+show the scaling from the 3 km domain of Germany to larger domains.
+
+The synthetic data have the structure of TEST_dataset:
+    HYRAS/hyras_<par>_mean_obs.csv, hyras_<par>_std_obs.csv,
+          hyras_<par>_mean_dav_obs.csv
+    GC/LU_GC_<par>_mean_mod.csv, LU_GC_<par>_std_mod.csv,
+       Corr_hyras_LU_GC_<par>.csv, LU_GC_<par>_mean_dav_mod.csv
+
+The results (time, throughput and peak memory of every stage) are added to
+the JSON history file. Usage:
+    python BENCH_project.py --cells 10000 1000000 --years 1 10 100
+
+The progam contains several subroutine:
+    write_tab     ---> The subroutine needs for writing of cdo -outputtab files
+    write_ts      ---> The subroutine needs for writing of cdo -outputts files
+    make_dataset  ---> The subroutine needs for generation of synthetic data
+    measure       ---> The subroutine needs for time and memory of one stage
+    bench         ---> The subroutine needs for benchmarks of one dataset
+    save_history  ---> The subroutine needs for saving of results to history
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import subprocess
+import contextlib
+import tracemalloc
+import numpy as np
+import pandas as pd
+import DAV_metric as dav
+import KGE_RMSD   as kge
+import CDO_reader as rd
+
+
+# Synthetic data of parameters: mean, std of field values, std of daily
+# values, range of correlation
+PARAMETERS = {'T_2M'     : ( 9.0, 1.5, 7.0, (0.95, 1.00)),
+              'TMAX_2M'  : (13.5, 1.5, 8.0, (0.90, 0.98)),
+              'TMIN_2M'  : ( 4.5, 1.5, 6.0, (0.88, 0.97)),
+              'TOT_PREC' : ( 2.5, 0.8, 4.0, (0.40, 0.80))}
+
+# Start date of synthetic timeseries
+START = '2002-01-01'
+
+
+#------------------------------------------------------------------------------
+# Subroutine: write_tab
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for writing of cdo -outputtab,date,lon,lat,value file
+# (NaN values are written as -999)
+#
+# Input parameters : path     - path for file
+#                    lon, lat - coordinates of grid cells
+#                    value    - values of grid cells
+#                    date     - date of field
+#
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def write_tab(path, lon, lat, value, date = '2011-12-31'):
+    df = pd.DataFrame({'' : '', 'date' : date, 'lon' : lon, 'lat' : lat,
+                       'value' : value})
+    with open(path, 'w') as f:
+        f.write('#      date    lon    lat    value \n')
+        df.to_csv(f, sep = ' ', header = False, index = False, na_rep = '-999',
+                  float_format = '%.6g', lineterminator = '\n')
+
+# end Subroutine write_tab
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: write_ts
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for writing of cdo -outputts file (daily values)
+#
+# Input parameters : path  - path for file
+#                    value - daily values (START is the first day)
+#
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def write_ts(path, value):
+    date = np.arange(np.datetime64(START), np.datetime64(START) + len(value))
+    df   = pd.DataFrame({'' : '', 'date' : date.astype(str), 'time' : '00:00:00',
+                         'value' : value})
+    df.to_csv(path, sep = ' ', header = False, index = False,
+              float_format = '%.6f', lineterminator = '\n')
+
+# end Subroutine write_ts
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: make_dataset
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for generation of synthetic data (see the structure
+# above). The data are not generated again if the folder has the data with
+# the same settings.
+#
+# Input parameters : folder   - path for data
+#                    cells    - number of grid cells
+#                    years    - length of timeseries (years, 365 days)
+#                    par_list - names of parameters
+#                    seed     - seed of random numbers
+#
+#
+# Output parameters: folder   - path for data
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def make_dataset(folder, cells, years, par_list = ['T_2M'], seed = 1):
+    meta = {'cells' : cells, 'years' : years, 'parameters' : list(par_list),
+            'seed'  : seed}
+    meta_path = os.path.join(folder, 'bench.json')
+    try:
+        with open(meta_path) as f:
+            if json.load(f) == meta:
+                return folder
+    except (OSError, ValueError):
+        pass
+
+    os.makedirs(os.path.join(folder, 'HYRAS'), exist_ok = True)
+    os.makedirs(os.path.join(folder, 'GC'   ), exist_ok = True)
+    rng = np.random.default_rng(seed)
+
+    # Regular grid (rows of latitude like CDO output)
+    nx  = int(np.ceil(np.sqrt(cells)))
+    idx = np.arange(cells)
+    lon = (5.5  + 0.0275 * (idx % nx )).astype(np.float32)
+    lat = (47.0 + 0.0275 * (idx // nx)).astype(np.float32)
+
+    days = 365 * years
+    day  = np.arange(days)
+    for par in par_list:
+        mean, std, std_day, corr_range = PARAMETERS[par]
+
+        # Fields: model = reference + bias, some cells are missing
+        m_obs = rng.normal(mean, std, cells)
+        s_obs = np.abs(rng.normal(std_day, 1.0, cells)) + 0.1
+        m_mod = m_obs + rng.normal(0.5, 1.0, cells)
+        s_mod = s_obs * rng.normal(1.0, 0.1, cells)
+        corr  = rng.uniform(corr_range[0], corr_range[1], cells)
+        for arr in [m_mod, s_mod, corr]:
+            arr[rng.random(cells) < 0.02] = np.nan
+
+        path = os.path.join(folder, 'HYRAS', 'hyras_' + par)
+        write_tab(path + '_mean_obs.csv', lon, lat, m_obs)
+        write_tab(path + '_std_obs.csv' , lon, lat, s_obs)
+        path = os.path.join(folder, 'GC', 'LU_GC_' + par)
+        write_tab(path + '_mean_mod.csv', lon, lat, m_mod)
+        write_tab(path + '_std_mod.csv' , lon, lat, s_mod)
+        write_tab(os.path.join(folder, 'GC', 'Corr_hyras_LU_GC_' + par + '.csv'),
+                  lon, lat, corr)
+
+        # Timeseries of field mean: annual cycle + noise (precipitation:
+        # dry days and gamma distribution)
+        if par == 'TOT_PREC':
+            ts_obs = rng.gamma(0.6, mean / 0.6 / 0.6, days) * (rng.random(days) < 0.6)
+            ts_mod = ts_obs * rng.lognormal(0.0, 0.3, days)
+        else:
+            ts_obs = mean - std_day * np.cos(2.0 * np.pi * day / 365.0) + \
+                     rng.normal(0.0, 3.0, days)
+            ts_mod = ts_obs + rng.normal(0.5, 1.0, days)
+        write_ts(os.path.join(folder, 'HYRAS', 'hyras_' + par + '_mean_dav_obs.csv'),
+                 ts_obs)
+        write_ts(os.path.join(folder, 'GC', 'LU_GC_' + par + '_mean_dav_mod.csv'),
+                 ts_mod)
+
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+
+    return folder
+
+# end Subroutine make_dataset
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: measure
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for time and memory of one stage. The time is measured
+# without tracemalloc, the peak memory (Python and NumPy allocations) in the
+# second run with tracemalloc. The output of stage is not printed.
+#
+# Input parameters : rows   - number of processed rows (cells or days)
+#                    func   - function of stage
+#                    args   - arguments of function
+#                    repeat - number of calls (for short stages)
+#                    memory - False: peak memory is not measured
+#
+#
+# Output parameters: stat   - dictionary: time (one call, s), rows,
+#                             rows_per_s, peak_mb
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def measure(rows, func, *args, repeat = 1, memory = True):
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            func(*args)
+        wall = (time.perf_counter() - t0) / repeat
+
+        peak = None
+        if memory:
+            tracemalloc.start()
+            func(*args)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+    return {'time'       : wall,
+            'rows'       : rows,
+            'rows_per_s' : rows / wall if wall > 0 else None,
+            'peak_mb'    : peak}
+
+# end Subroutine measure
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: bench
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for benchmarks of one dataset (one parameter). Stages:
+#     get_data          - parsing of cdo -outputtab file (without cache)
+#     get_data_cached   - reading of cdo -outputtab file from cache
+#     KGE_RMSD_analysis - KGE, RMSD and CORR (5 files, cache)
+#     get_pdf           - probability density function of timeseries
+#     DAV_metric        - DAV index of three PDFs
+#     DAV_analysis      - DAV index (3 files, cache)
+#
+# Input parameters : folder - path for data (see make_dataset)
+#                    par    - the name of parameter
+#                    memory - False: peak memory is not measured
+#
+#
+# Output parameters: stages - dictionary: stage --> stat (see measure)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def bench(folder, par = 'T_2M', memory = True):
+    mf_com   = os.path.join(folder, '')
+    path_tab = mf_com + 'HYRAS/hyras_' + par + '_mean_obs.csv'
+    path_ts  = mf_com + 'HYRAS/hyras_' + par + '_mean_dav_obs.csv'
+
+    # Cache of all files (stages with cache)
+    rd.cache_warm(folder)
+    cells = len(rd.get_tab(path_tab)[0])
+    ts    = dav.get_dav(path_ts)[1]
+    bins  = dav.get_bins(par)
+    pdf   = dav.get_pdf(ts, bins, norm = True)
+
+    stages = {}
+    rd.use_cache = False
+    try:
+        stages['get_data'] = measure(cells, kge.get_data, path_tab, par,
+                                     memory = memory)
+    finally:
+        rd.use_cache = True
+    stages['get_data_cached'] = measure(cells, kge.get_data, path_tab, par,
+                                        memory = memory)
+    stages['KGE_RMSD_analysis'] = measure(
+        cells, kge.KGE_RMSD_analysis, mf_com, 'HYRAS/', 'GC/', par, 'hyras',
+        'GC', 3, memory = memory)
+    stages['get_pdf'] = measure(len(ts), dav.get_pdf, ts, bins,
+                                memory = memory)
+    stages['DAV_metric'] = measure(1, dav.DAV_metric, pdf, pdf, pdf,
+                                   repeat = 1000, memory = memory)
+    stages['DAV_analysis'] = measure(
+        len(ts), dav.DAV_analysis, mf_com, 'HYRAS/', 'GC/', 'GC/', par,
+        'hyras', 'GC', 3, memory = memory)
+
+    return stages
+
+# end Subroutine bench
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: save_history
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for saving of results to the JSON history file (list
+# of runs, the new run is added to the end)
+#
+# Input parameters : path    - path for history file
+#                    results - list of results (see bench)
+#
+#
+# Output parameters: run     - dictionary with the run (date, version of
+#                              code, system, results)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def save_history(path, results):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                cwd = os.path.dirname(os.path.abspath(__file__)),
+                                capture_output = True, text = True).stdout.strip()
+    except OSError:
+        commit = ''
+
+    run = {'date'    : time.strftime('%Y-%m-%dT%H:%M:%S'),
+           'commit'  : commit,
+           'system'  : {'python' : platform.python_version(),
+                        'numpy'  : np.__version__,
+                        'pandas' : pd.__version__,
+                        'cpus'   : os.cpu_count(),
+                        'host'   : platform.node()},
+           'max_rss_mb' : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+           'results' : results}
+
+    history = []
+    try:
+        with open(path) as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        pass
+    history.append(run)
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok = True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(history, f, indent = 1)
+    os.replace(path + '.tmp', path)
+
+    return run
+
+# end Subroutine save_history
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Benchmarks of STAT_project '
+                                     'modules with synthetic CDO text data')
+    parser.add_argument('--cells', type = int, nargs = '+', default = [10000, 100000],
+                        help = 'numbers of grid cells (10000 ... 10000000)')
+    parser.add_argument('--years', type = int, nargs = '+', default = [1, 10],
+                        help = 'lengths of timeseries, years (1 ... 100)')
+    parser.add_argument('--par', default = 'T_2M', choices = sorted(PARAMETERS),
+                        help = 'parameter')
+    parser.add_argument('--folder', default = 'BENCH/',
+                        help = 'folder for synthetic data')
+    parser.add_argument('--history', default = 'BENCH/history.json',
+                        help = 'JSON history file')
+    parser.add_argument('--no-memory', action = 'store_true',
+                        help = 'do not measure peak memory')
+    args = parser.parse_args()
+
+    results = []
+    for cells in args.cells:
+        for years in args.years:
+            folder = make_dataset(os.path.join(args.folder,
+                                  'c{}_y{}'.format(cells, years)),
+                                  cells, years, [args.par])
+            stages = bench(folder, args.par, not args.no_memory)
+            results.append({'cells' : cells, 'years' : years, 'par' : args.par,
+                            'stages' : stages})
+
+            print('cells {:>9d}, years {:>3d}'.format(cells, years))
+            for name, stat in stages.items():
+                peak = '' if stat['peak_mb'] is None else \
+                       '{:9.1f} MB'.format(stat['peak_mb'])
+                print('    {:<18s} {:10.4f} s {:14.0f} rows/s {}'.format(
+                      name, stat['time'], stat['rows_per_s'] or 0, peak))
+            sys.stdout.flush()
+
+    save_history(args.history, results)
@@ -0,0 +1,650 @@
+# -*- coding: utf-8 -*-
+"""
+The CDO_reader is the program for reading of CDO text output (cdo -outputtab,
+cdo -outputts) which is used by KGE_RMSD and DAV_metric modules.
+
+The progam contains several subroutine:
+    get_tab       ---> The subroutine needs for reading of cdo -outputtab files
+                       (lon, lat and values in one pass)
+    get_ts        ---> The subroutine needs for reading of cdo -outputts files
+                       (fixed date format, days since 1970-01-01)
+    cache_load    ---> The subroutine needs for loading of parsed data from cache
+    cache_save    ---> The subroutine needs for saving of parsed data to cache
+    read_cached   ---> The subroutine needs for reading of data with cache
+    cache_warm    ---> The subroutine needs for filling of cache for a folder
+    cache_purge   ---> The subroutine needs for deleting of cache for a folder
+    test1         ---> The subroutine needs for test of cache
+    test2         ---> The subroutine needs for test of cache_warm (no cache)
+    test3         ---> The subroutine needs for test of DataContext (threads)
+    DataContext   ---> The class for data which are shared during one run
+
+The cache keeps the parsed arrays as .npy files in the subfolder .cdo_cache
+next to the source files. The arrays are valid while the path, size and
+modification time of the source file are the same. The cache can be filled
+or deleted from the command line:
+    python CDO_reader.py warm  TEST_dataset
+    python CDO_reader.py purge TEST_dataset
+    python CDO_reader.py test
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import sys
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+
+# Missing values in CDO text output
+NA_VALUES = ['-999', '-1', '***', '******']
+
+# Cache settings: subfolder name, version of cache format, on/off switch
+CACHE_DIR     = '.cdo_cache'
+CACHE_VERSION = 2
+use_cache     = True
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_tab
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for reading of cdo -outputtab,date,lon,lat,value files.
+# The file is parsed only once with fixed data types (float32, no date
+# parsing), missing values are NaN.
+#
+# Input parameters : path  - path for data
+#
+#
+# Output parameters: lon   - longitude (float32 array)
+#                    lat   - latitude  (float32 array)
+#                    value - values    (float32 array)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_tab(path):
+    data = read_cached(path, 'tab', parse_tab)
+
+    return data['lon'], data['lat'], data['value']
+
+# end Subroutine get_tab
+#------------------------------------------------------------------------------
+
+
+def parse_tab(path):
+    df = pd.read_csv(path, sep = r'\s+', comment = '#', header = None,
+                     usecols = [1, 2, 3], names = ['date', 'lon', 'lat', 'value'],
+                     dtype = np.float32, na_values = NA_VALUES, engine = 'c')
+
+    return {'lon'   : df['lon'  ].to_numpy(),
+            'lat'   : df['lat'  ].to_numpy(),
+            'value' : df['value'].to_numpy()}
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_ts
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for reading of cdo -outputts files (date, time, value).
+# The dates have the fixed format YYYY-MM-DD, they are decoded from the
+# digits to days since 1970-01-01 (no parsing of strings, the time is not
+# used). The files with several values of one day (e.g. hourly data) are not
+# accepted (ValueError).
+#
+# Input parameters : path  - path for data
+#
+#
+# Output parameters: day   - days since 1970-01-01 (int32 array), e.g.
+#                            day.astype('datetime64[D]') - dates
+#                    value - values (float64 array)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_ts(path):
+    data = read_cached(path, 'ts', parse_ts)
+
+    return data['day'], data['value']
+
+# end Subroutine get_ts
+#------------------------------------------------------------------------------
+
+
+def parse_ts(path):
+    # Columns: date, time, value (tokens of the file)
+    with open(path, 'rb') as f:
+        tok = f.read().split()
+    if len(tok) % 3:
+        raise ValueError('No cdo -outputts file: ' + path)
+
+    # Digits of YYYY-MM-DD (positions 0-3, 5-6, 8-9)
+    dig = np.array(tok[0::3], dtype = 'S10').view(np.uint8).reshape(-1, 10)
+    dig = dig.astype(np.int32)
+    if not ((dig[:, 4] == ord('-')) & (dig[:, 7] == ord('-'))).all():
+        raise ValueError('No YYYY-MM-DD dates in ' + path)
+    dig   = dig - ord('0')
+    year  = dig[:, 0] * 1000 + dig[:, 1] * 100 + dig[:, 2] * 10 + dig[:, 3]
+    month = dig[:, 5] * 10 + dig[:, 6]
+    # Days of the first day of month (numpy calendar) + day of month
+    first = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    day   = first.astype('datetime64[D]').astype(np.int32) + \
+            dig[:, 8] * 10 + dig[:, 9] - 1
+    # Sorted days: unique if increasing
+    if not (np.diff(day) > 0).all() and len(np.unique(day)) < len(day):
+        raise ValueError('Not unique days in ' + path + ' (' +
+                         str(len(day) - len(np.unique(day))) + ' duplicates)')
+
+    return {'day'   : day.astype(np.int32),
+            'value' : np.fromiter(map(float, tok[2::3]), dtype = np.float64,
+                                  count = len(day))}
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cache_load
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for loading of parsed data from cache. The arrays are
+# memory-mapped (read only).
+#
+# Input parameters : path  - path for source data
+#                    kind  - type of data ('tab' or 'ts')
+#
+#
+# Output parameters: data  - dictionary with arrays or None (no valid cache)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def cache_load(path, kind):
+    meta_path = cache_name(path, kind) + '.json'
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta != dict(cache_key(path), columns = meta['columns']):
+            return None
+        data = {}
+        for col in meta['columns']:
+            data[col] = np.load(cache_name(path, kind) + '.' + col + '.npy',
+                                mmap_mode = 'r')
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return data
+
+# end Subroutine cache_load
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cache_save
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for saving of parsed data to cache. If the folder is
+# not writable the data are not saved.
+#
+# Input parameters : path  - path for source data
+#                    kind  - type of data ('tab' or 'ts')
+#                    data  - dictionary with arrays
+#
+#
+# Output parameters: status - True if the cache was saved
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def cache_save(path, kind, data):
+    name = cache_name(path, kind)
+    try:
+        os.makedirs(os.path.dirname(name), exist_ok = True)
+        for col, arr in data.items():
+            np.save(name + '.' + col + '.npy', np.ascontiguousarray(arr))
+        # Meta data are written at the end, so a broken cache is never valid
+        with open(name + '.json.tmp', 'w') as f:
+            json.dump(dict(cache_key(path), columns = list(data)), f)
+        os.replace(name + '.json.tmp', name + '.json')
+    except OSError:
+        return False
+
+    return True
+
+# end Subroutine cache_save
+#------------------------------------------------------------------------------
+
+
+def cache_name(path, kind):
+    folder, fname = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR, fname + '.' + kind)
+
+
+def cache_key(path):
+    stat = os.stat(path)
+    return {'version' : CACHE_VERSION,
+            'path'    : os.path.abspath(path),
+            'size'    : stat.st_size,
+            'mtime'   : stat.st_mtime_ns}
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: read_cached
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for reading of data with cache: the cache is used if
+# it is valid, otherwise the text file is parsed and the cache is updated.
+#
+# Input parameters : path   - path for source data
+#                    kind   - type of data ('tab' or 'ts')
+#                    parser - function for parsing of the text file
+#
+#
+# Output parameters: data   - dictionary with arrays
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def read_cached(path, kind, parser):
+    if use_cache:
+        data = cache_load(path, kind)
+        if data is not None:
+            return data
+
+    data = parser(path)
+
+    if use_cache:
+        cache_save(path, kind, data)
+
+    return data
+
+# end Subroutine read_cached
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cache_warm
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for filling of cache for all CDO text files (*.csv) in
+# a folder (with subfolders). Files with a '#' header are cdo -outputtab
+# files, other files are cdo -outputts files. Files whose cache cannot be
+# written (e.g. read only folder) are not cached, the walk is continued.
+#
+# Input parameters : folder - path for data
+#
+#
+# Output parameters: timing - list with (file, parsing time, loading time),
+#                             loading time is None for files not cached
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def cache_warm(folder):
+    timing = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if d != CACHE_DIR)
+        for fname in sorted(files):
+            if not fname.endswith('.csv'):
+                continue
+            path = os.path.join(root, fname)
+            with open(path) as f:
+                kind = 'tab' if f.read(1) == '#' else 'ts'
+            parser = parse_tab if kind == 'tab' else parse_ts
+
+            t0 = time.perf_counter()
+            data = parser(path)
+            t1 = time.perf_counter()
+            if not cache_save(path, kind, data):
+                timing.append((path, t1 - t0, None))
+                continue
+            t2 = time.perf_counter()
+            data = cache_load(path, kind)
+            if data is None:
+                timing.append((path, t1 - t0, None))
+                continue
+            # Touch all values, the arrays are memory-mapped
+            for arr in data.values():
+                np.array(arr)
+            t3 = time.perf_counter()
+
+            timing.append((path, t1 - t0, t3 - t2))
+
+    return timing
+
+# end Subroutine cache_warm
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cache_purge
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for deleting of cache for a folder (with subfolders)
+#
+# Input parameters : folder - path for data
+#
+#
+# Output parameters: count  - number of deleted files
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def cache_purge(folder):
+    count = 0
+    for root, dirs, files in os.walk(folder):
+        if os.path.basename(root) != CACHE_DIR:
+            continue
+        for fname in files:
+            os.remove(os.path.join(root, fname))
+            count = count + 1
+        os.rmdir(root)
+
+    return count
+
+# end Subroutine cache_purge
+#------------------------------------------------------------------------------
+
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of cache (small cdo -outputtab file in
+# temporary folder): the second reading uses the cache (memory-mapped read
+# only arrays), the file is parsed again after changes of size or of
+# modification time
+#
+# Input parameters : -
+#
+#
+# Output parameters: count - number of parsings of the test file
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1():
+
+    global parse_tab
+    import tempfile
+
+    rows  = ['#      date    lon    lat    value ',
+             ' 2006-12-31 6.69056 46.5676 3.252009 ',
+             ' 2006-12-31 6.73002 46.5717 -999 ',
+             ' 2006-12-31 6.76948 46.5759 3.452331 ']
+    parse = parse_tab
+    count = []
+    def parse_count(path):
+        count.append(path)
+        return parse(path)
+
+    def write(path, rows, mtime):
+        with open(path, 'w') as f:
+            f.write('\n'.join(rows) + '\n')
+        os.utime(path, ns = (mtime, mtime))
+
+    try:
+        parse_tab = parse_count
+        with tempfile.TemporaryDirectory() as tmp:
+            path  = os.path.join(tmp, 'test_mean_obs.csv')
+            mtime = 1500000000 * 10**9
+            write(path, rows, mtime)
+
+            lon, lat, value = get_tab(path)
+            assert len(count) == 1 and value.dtype == np.float32
+            assert np.isnan(value[1]) and np.allclose(value[[0, 2]],
+                                                      [3.252009, 3.452331])
+
+            # Cache: no parsing, read only arrays
+            data = get_tab(path)
+            assert len(count) == 1
+            for arr, ref in zip(data, [lon, lat, value]):
+                assert isinstance(arr, np.memmap) and not arr.flags.writeable
+                assert np.array_equal(arr, ref, equal_nan = True)
+            try:
+                data[2][0] = 0.0
+                raise AssertionError('Cached array is writable')
+            except ValueError:
+                pass
+
+            # Other modification time (the same size)
+            rows[1] = rows[1].replace('3.252009', '4.252009')
+            write(path, rows, mtime + 10**9)
+            value = get_tab(path)[2]
+            assert len(count) == 2 and value[0] == np.float32(4.252009)
+
+            # Other size (the same modification time)
+            write(path, rows + [' 2006-12-31 6.80894 46.5800 1.0 '],
+                  mtime + 10**9)
+            value = get_tab(path)[2]
+            assert len(count) == 3 and len(value) == 4
+            assert len(get_tab(path)[2]) == 4 and len(count) == 3
+    finally:
+        parse_tab = parse
+
+    return len(count)
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test2
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of cache_warm for folders whose cache cannot
+# be written (a file with the name of cache folder): the files are parsed,
+# not cached, and the walk is continued in other folders
+#
+# Input parameters : -
+#
+#
+# Output parameters: timing - result of cache_warm (see cache_warm)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test2():
+
+    import tempfile
+
+    rows = ['#      date    lon    lat    value ',
+            ' 2006-12-31 6.69056 46.5676 3.252009 ',
+            ' 2006-12-31 6.73002 46.5717 3.429411 ']
+    with tempfile.TemporaryDirectory() as tmp:
+        for sub in ['a_locked', 'b_open']:
+            os.makedirs(os.path.join(tmp, sub))
+            with open(os.path.join(tmp, sub, 'test_mean_obs.csv'), 'w') as f:
+                f.write('\n'.join(rows) + '\n')
+        # The cache folder cannot be created (also for root)
+        with open(os.path.join(tmp, 'a_locked', CACHE_DIR), 'w') as f:
+            f.write('')
+
+        timing = cache_warm(tmp)
+        names  = [os.path.relpath(t[0], tmp) for t in timing]
+        assert names == [os.path.join('a_locked', 'test_mean_obs.csv'),
+                         os.path.join('b_open'  , 'test_mean_obs.csv')], names
+        assert timing[0][2] is None and timing[1][2] is not None
+        assert cache_load(timing[0][0], 'tab') is None
+        assert cache_load(timing[1][0], 'tab') is not None
+
+        # Reading without cache
+        assert np.allclose(get_tab(timing[0][0])[2], [3.252009, 3.429411])
+
+    return timing
+
+# end Subroutine test2
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test3
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of DataContext with several threads (slow
+# reader): every file is read once, all threads get the same arrays, clear
+# during reading does not break the data
+#
+# Input parameters : nthread - number of threads
+#
+#
+# Output parameters: reads   - number of read files
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test3(nthread = 8):
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = []
+    def reader(path):
+        calls.append(path)
+        time.sleep(0.01)
+        return np.arange(3.0), np.full(3, float(len(path)))
+
+    ctx   = DataContext()
+    paths = ['a.csv', 'bb.csv', 'ccc.csv']
+    with ThreadPoolExecutor(max_workers = nthread) as pool:
+        out = list(pool.map(lambda k: ctx.get(paths[k % 3], 'ts', reader),
+                            range(10 * nthread)))
+    assert sorted(calls) == sorted(paths) and ctx.reads == 3
+    for k, data in enumerate(out):
+        assert data is out[k % 3]
+
+    # Clear while other threads read
+    with ThreadPoolExecutor(max_workers = nthread) as pool:
+        out = list(pool.map(lambda k: ctx.clear() if k % 5 == 0 else
+                            ctx.get(paths[k % 3], 'ts', reader)[1][0],
+                            range(10 * nthread)))
+    assert all(v is None or v == len(paths[k % 3]) for k, v in enumerate(out))
+
+    return ctx.reads
+
+# end Subroutine test3
+#------------------------------------------------------------------------------
+
+
+
+
+class DataContext(object):
+    """
+    Data which are shared during one run (e.g. reference dataset).
+    Every file is read only once, the next requests return the same arrays.
+    The data can be used by several threads (e.g. prefetch, see STAT_runner).
+    Only the data of the current scope (e.g. parameter) are kept.
+    """
+
+    def __init__(self):
+        self.data  = {}
+        self.reads = 0                  # Number of read files
+        self.lock  = threading.Lock()
+        self.scope = None
+
+    def set_scope(self, scope):
+        """Delete the shared data if the scope (e.g. parameter) is changed."""
+
+        with self.lock:
+            if scope != self.scope:
+                self.data.clear()
+                self.scope = scope
+
+    def get_tab(self, path):
+        """Get lon, lat, value of cdo -outputtab file (see get_tab)."""
+
+        return self.get(path, 'tab', get_tab)
+
+    def get_ts(self, path):
+        """Get day, value of cdo -outputts file (see get_ts)."""
+
+        return self.get(path, 'ts', get_ts)
+
+    def get(self, path, kind, reader):
+        key = (kind, os.path.abspath(path))
+        # The file is read once also if other thread requests it
+        with self.lock:
+            if key not in self.data:
+                self.data[key] = reader(path)
+                self.reads = self.reads + 1
+
+            return self.data[key]
+
+    def clear(self):
+        """Delete all shared data."""
+
+        with self.lock:
+            self.data.clear()
+
+
+if __name__ == '__main__':
+
+    if len(sys.argv) == 2 and sys.argv[1] == 'test':
+        print('Parsings of test file:', test1())
+        print('Files not cached:', sum(t[2] is None for t in test2()))
+        print('Read files (threads):', test3())
+        sys.exit(0)
+
+    if len(sys.argv) < 3 or sys.argv[1] not in ('warm', 'purge'):
+        print('Usage: python CDO_reader.py warm|purge folder [folder ...]')
+        print('       python CDO_reader.py test')
+        sys.exit(1)
+
+    for folder in sys.argv[2:]:
+        if sys.argv[1] == 'warm':
+            timing = cache_warm(folder)
+            for path, t_cold, t_warm in timing:
+                if t_warm is None:
+                    print('{:<60s} cold {:8.1f} ms   not cached'.format(
+                          os.path.relpath(path, folder), 1000 * t_cold))
+                    continue
+                print('{:<60s} cold {:8.1f} ms   warm {:8.2f} ms'.format(
+                      os.path.relpath(path, folder), 1000 * t_cold, 1000 * t_warm))
+            cached = [t for t in timing if t[2] is not None]
+            print('Total: {} files ({} not cached), cold {:.2f} s, warm {:.3f} s'.format(
+                  len(timing), len(timing) - len(cached),
+                  sum(t[1] for t in timing), sum(t[2] for t in cached)))
+        else:
+            print('Deleted {} cache files'.format(cache_purge(folder)))
@@ -9,8 +9,15 @@ https://doi.org/10.1002/joc.5261
                                       
 The progam contains several subroutine:
     get_dav       ---> The subroutine needs for getting data for DAV analisis 
+    align_dav     ---> The subroutine needs for common days of timeseries
     get_pdg       ---> The subroutine needs for getting probability density function
+    get_bins      ---> The subroutine needs for getting bin edges for parameter
     DAV_metric    ---> The subroutine needs for DAV calculations
+    DAV_series    ---> The subroutine needs for DAV calculations (preloaded data)
+    DAV_bootstrap ---> The subroutine needs for confidence intervals of DAV
+    get_pdf_cells ---> The subroutine needs for PDFs of all grid cells
+    DAV_counts    ---> The subroutine needs for DAV of grid cells (counts)
+    DAV_grid      ---> The subroutine needs for DAV of grid cells (arrays)
     DAV_analysis  ---> The subroutine needs for DAV calculations
     
 Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang, 
@@ -30,19 +37,35 @@ Version    Date       Name
 """
 
 
+import numpy as np
 import pandas as pd
+import CDO_reader as rd
+import STAT_boot  as boot
+
+
+# Bin edges for PDF of temperature, degC (T_2M, TMAX_2M, TMIN_2M)
+TEMP_BINS = [-10.0, -5.0, 0.0, 5.0, 10.0, 15.0, 20.0, 25.0, 30.0]
+
+# Bin edges for PDF of parameters
+PDF_BINS  = {'T_2M'     : TEMP_BINS,
+             'TMAX_2M'  : TEMP_BINS,
+             'TMIN_2M'  : TEMP_BINS,
+             'TOT_PREC' : [0.1, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 50.0]}  # mm/day
 
 
 #------------------------------------------------------------------------------
 # Subroutine: get_dav
 #------------------------------------------------------------------------------
 #
-# The subroutine needs for getting data for DAV analisis
+# The subroutine needs for getting data for DAV analisis: the timeseries is
+# the pair of arrays (day, value), the dates are not converted (see
+# align_dav)
 # 
 # Input parameters : iPath   - absolute path for data
-#                    ts_name - the name of parameter for analysis   
+#                    ctx     - CDO_reader.DataContext for shared data (optional)
 #
-# Output parameters: ts      - timeseries with intersting parameter 
+# Output parameters: day     - days since 1970-01-01 (see CDO_reader.get_ts)
+#                    value   - values of days
 #
 # 
 #
@@ -52,21 +75,90 @@ import pandas as pd
 #
 #------------------------------------------------------------------------------
 
-def get_dav(iPath, ts_name):
-    df = pd.read_csv(iPath, skiprows = 0, sep=' ', parse_dates = {'Date':[1,2]},
-                     header = None)
-    df = df.drop(0, axis = 1)
-    # Get indices
-    date_index = pd.to_datetime(df['Date'])
-    # Create timeseries
-    ts = pd.Series(df[3].values, index = date_index, dtype = 'float') 
-    ts = ts.rename(ts_name)
-    return ts
+def get_dav(iPath, ctx = None):
+    if ctx is None:
+        day, value = rd.get_ts(iPath)
+    else:
+        day, value = ctx.get_ts(iPath)
+    return day, value
 
 # end Subroutine get_data
 #------------------------------------------------------------------------------
 
 
+def get_days(ts):
+    # Timeseries: (day, value) or pandas Series with DatetimeIndex
+    if isinstance(ts, pd.Series):
+        return (ts.index.values.astype('datetime64[D]').astype(np.int64),
+                ts.to_numpy(dtype = np.float64))
+    return (np.asarray(ts[0], dtype = np.int64),
+            np.asarray(ts[1], dtype = np.float64))
+
+
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: align_dav
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for common days of timeseries: the dates are integer
+# days (since 1970-01-01), the common days are the intersection of arrays.
+# The missing days (days of observations which are not in timeseries) and
+# the extra days (days which are not in observations) are reported. The
+# timeseries with several values of one day (e.g. hourly data) are not
+# accepted (ValueError).
+#
+# Input parameters : ts_obs - timeseries of observations: (day, value), see
+#                             get_dav, or pandas Series (DatetimeIndex)
+#                    ts_lr  - timeseries of low resolution data
+#                    ts_hr  - timeseries of high resolution data
+#                    report - True: print the numbers of missing and extra
+#                             days
+#
+# Output parameters: day    - common days (int64 array)
+#                    data   - values of common days (OBS, LR, HR) x days
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def align_dav(ts_obs, ts_lr, ts_hr, report = True):
+    names  = ['OBS', 'LR', 'HR']
+    series = [get_days(ts) for ts in [ts_obs, ts_lr, ts_hr]]
+    days   = [ts[0] for ts in series]
+    values = [ts[1] for ts in series]
+    for name, d in zip(names, days):
+        # Sorted days: unique if increasing
+        if not (np.diff(d) > 0).all() and len(np.unique(d)) < len(d):
+            raise ValueError('Not unique days of ' + name + ' (' +
+                             str(len(d) - len(np.unique(d))) + ' duplicates)')
+    
+    # The same days (e.g. one period of all datasets): the order of file
+    if all(np.array_equal(days[0], d) for d in days[1:]):
+        return days[0], np.stack(values)
+    
+    day = np.intersect1d(np.intersect1d(days[0], days[1]), days[2])
+    data = np.empty((len(series), len(day)))
+    for k in range(len(series)):
+        data[k] = values[k][np.intersect1d(day, days[k],
+                                           return_indices = True)[2]]
+    
+    if report:
+        info = []
+        for name, d in zip(names, days):
+            info.append('{} {} ({} missing, {} extra)'.format(
+                name, len(d), len(np.setdiff1d(days[0], d)),
+                len(np.setdiff1d(d, days[0]))))
+        print('DAV days:', len(day), 'common of', ', '.join(info))
+    
+    return day, data
+
+# end Subroutine align_dav
+#------------------------------------------------------------------------------
+
+
 
 
 
@@ -74,9 +166,14 @@ def get_dav(iPath, ts_name):
 # Subroutine: get_pdg
 #------------------------------------------------------------------------------
 #
-# The subroutine needs for getting probability density function
+# The subroutine needs for getting probability density function. The values
+# are sorted to bins in one pass (NumPy), nan values are not counted. 
+# Bins: values < edges[0], edges[0] <= values < edges[1], ... , 
+#       values >= edges[-1] 
 # 
 # Input parameters : data_array - array with data
+#                    bins       - bin edges (default: TEMP_BINS)
+#                    norm       - True: normalized frequencies, False: counts
 #
 # Output parameters: list_num   - probability density function  
 #
@@ -88,46 +185,22 @@ def get_dav(iPath, ts_name):
 #
 #------------------------------------------------------------------------------
 
-def get_pdf(data_array):
-    
-    df_mod = data_array
-    
-    count_1  = 0  # for values which are less then -10
-    count_2  = 0  # for values from -10 to -5
-    count_3  = 0  # for values from  -5 to  0
-    count_4  = 0  # for values from   0 to  5
-    count_5  = 0  # for values from   5 to 10
-    count_6  = 0  # for values from  10 to 15
-    count_7  = 0  # for values from  15 to 20
-    count_8  = 0  # for values from  20 to 25
-    count_9  = 0  # for values from  25 to 30
-    count_10 = 0  # for values wich are bigger then 30
-    
-    for j in range(len(df_mod)):
-        if df_mod[j] < -10.0:
-            count_1 = count_1 + 1
-        elif df_mod[j] >= -10.0 and df_mod[j] < -5.0:
-            count_2 = count_2 + 1
-        elif df_mod[j] >= -5.0  and df_mod[j] < -0.0: 
-            count_3 = count_3 + 1
-        elif df_mod[j] >=  0.0  and df_mod[j] <  5.0: 
-            count_4 = count_4 + 1
-        elif df_mod[j] >=  5.0  and df_mod[j] < 10.0: 
-            count_5 = count_5 + 1
-        elif df_mod[j] >=  10.0 and df_mod[j] < 15.0: 
-            count_6 = count_6 + 1
-        elif df_mod[j] >=  15.0 and df_mod[j] < 20.0: 
-            count_7 = count_7 + 1
-        elif df_mod[j] >=  20.0 and df_mod[j] < 25.0: 
-            count_8 = count_8 + 1
-        elif df_mod[j] >=  25.0 and df_mod[j] < 30.0: 
-            count_9 = count_9 + 1
-        else:  
-            count_10 = count_10 + 1        
-        
-    list_num = []
-    list_num.extend([count_1, count_2, count_3, count_4, count_5,
-                     count_6, count_7, count_8, count_9, count_10])
+def get_pdf(data_array, bins = None, norm = False):
+    
+    if bins is None:
+        bins = TEMP_BINS
+    edges = np.asarray(bins, dtype = np.float64)
+    
+    df_mod = np.asarray(data_array, dtype = np.float64)
+    df_mod = df_mod[~np.isnan(df_mod)]
+    
+    # Number of the bin for every value
+    num = np.searchsorted(edges, df_mod, side = 'right')
+    
+    list_num = np.bincount(num, minlength = len(edges) + 1)
+    
+    if norm:
+        list_num = list_num / max(len(df_mod), 1)
 
     return list_num
 
@@ -137,11 +210,36 @@ def get_pdf(data_array):
 
 
 
+#------------------------------------------------------------------------------
+# Subroutine: get_bins
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for getting bin edges for parameter
+# 
+# Input parameters : par_name - the name of parameter
+#
+# Output parameters: bins     - bin edges (PDF_BINS, TEMP_BINS by default)
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_bins(par_name):
+    return PDF_BINS.get(par_name, TEMP_BINS)
+
+# end Subroutine get_bins
+#------------------------------------------------------------------------------
+
+
+
 #------------------------------------------------------------------------------
 # Subroutine: DAV_metric
 #------------------------------------------------------------------------------
 #
-# The subroutine needs for DAV calculations
+# The subroutine needs for DAV calculations (PDFs are the last axis of
+# arrays, so DAV of several PDFs can be calculated in one call)
 # 
 # Input parameters : pr1 - high resolution parameter
 #                    pr2 -  low resolution parameter
@@ -158,14 +256,8 @@ def get_pdf(data_array):
 #------------------------------------------------------------------------------
 
 def DAV_metric(pr1, pr2, pr3):
-    s_hr = 0 
-    s_lr = 0
-
-    for j in range(len(pr1)):
-        s_hr = s_hr + min(pr1[j], pr3[j])
-        
-        s_lr = s_lr + min(pr2[j], pr3[j])
-    
+    s_hr = np.minimum(pr1, pr3).sum(axis = -1)
+    s_lr = np.minimum(pr2, pr3).sum(axis = -1)
     
     DAV = (s_hr - s_lr) / s_lr
     return DAV
@@ -175,6 +267,233 @@ def DAV_metric(pr1, pr2, pr3):
 
 
 
+#------------------------------------------------------------------------------
+# Subroutine: DAV_series
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for DAV calculations based on preloaded timeseries
+# (the common days of timeseries, see align_dav)
+# 
+# Input parameters : ts_obs - timeseries of observations
+#                    ts_lr  - timeseries of low resolution data
+#                    ts_hr  - timeseries of high resolution data
+#                    bins   - bin edges for PDF (default: TEMP_BINS)
+#
+# Output parameters: dav    - the DAV metric
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def DAV_series(ts_obs, ts_lr, ts_hr, bins = None):
+    
+    day, data = align_dav(ts_obs, ts_lr, ts_hr)
+
+    # Create PDF
+    obs = get_pdf(data[0], bins, norm = True)
+    lr  = get_pdf(data[1], bins, norm = True)
+    hr  = get_pdf(data[2], bins, norm = True)
+    
+    # Calculate DAV metric
+    dav = DAV_metric(hr, lr, obs)
+
+    return dav
+
+# end Subroutine DAV_series
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: DAV_bootstrap
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for bootstrap confidence interval of DAV: the days are
+# resampled (the common days of timeseries, see align_dav). The PDFs of all
+# resamples are calculated in one matrix product of numbers of days and bins
+# (see STAT_boot).
+# 
+# Input parameters : ts_obs  - timeseries of observations
+#                    ts_lr   - timeseries of low resolution data
+#                    ts_hr   - timeseries of high resolution data
+#                    bins    - bin edges for PDF (default: TEMP_BINS)
+#                    n_boot  - number of resamples
+#                    seed    - seed of random numbers (see STAT_boot)
+#                    level   - confidence level
+#                    workers - number of processes
+#
+# Output parameters: ci      - (lower, upper) limits of DAV
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def DAV_bootstrap(ts_obs, ts_lr, ts_hr, bins = None, n_boot = 1000, seed = None,
+                  level = 0.95, workers = 1):
+    
+    if bins is None:
+        bins = TEMP_BINS
+    edges = np.asarray(bins, dtype = np.float64)
+    nbin  = len(edges) + 1
+    
+    # The days are reported by DAV_series
+    day, df_data = align_dav(ts_obs, ts_lr, ts_hr, report = False)
+    
+    # Days x bins of all timeseries (one-hot, NaN values are not in bins)
+    values = np.zeros((len(day), 3 * nbin))
+    for k, row in enumerate([2, 1, 0]):         # HR, LR, OBS
+        data = df_data[row]
+        num   = np.searchsorted(edges, data, side = 'right') + k * nbin
+        valid = np.flatnonzero(~np.isnan(data))
+        values[valid, num[valid]] = 1.0
+    
+    # PDFs of resamples: (n_boot, 3, nbin)
+    pdf = boot.resample_sums(values, n_boot, seed, workers).reshape(n_boot, 3, nbin)
+    pdf = pdf / np.maximum(pdf.sum(axis = 2, keepdims = True), 1.0)
+    
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        dav = DAV_metric(pdf[:, 0], pdf[:, 1], pdf[:, 2])
+    lo, hi = boot.get_ci(dav[:, None], level)
+    
+    return lo[0], hi[0]
+
+# end Subroutine DAV_bootstrap
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_pdf_cells
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for PDFs (counts) of all grid cells: for every bin
+# edge the number of values >= edge is counted over time (one comparison of
+# the chunk per edge), the counts of bins are differences of these numbers.
+# The counts of time chunks can be summed (counts). Bins and nan values as
+# in get_pdf. float32 data are not converted: the edges are replaced by the
+# smallest float32 >= edge, so the bins are the same as for float64.
+# 
+# Input parameters : data   - array (time, cells) or (time, y, x)
+#                    bins   - bin edges (default: TEMP_BINS)
+#                    counts - counts of previous chunks (cells, nbin) or None
+#
+# Output parameters: counts - counts (cells, nbin), int64
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_pdf_cells(data, bins = None, counts = None):
+    
+    if bins is None:
+        bins = TEMP_BINS
+    edges = np.asarray(bins, dtype = np.float64)
+    
+    data  = np.asarray(data)
+    data  = data.reshape(data.shape[0], -1)
+    if data.dtype == np.float32:
+        lim = edges.astype(np.float32)
+        lim = np.where(lim < edges, np.nextafter(lim, np.float32(np.inf)), lim)
+    else:
+        data = data.astype(np.float64, copy = False)
+        lim  = edges
+    
+    # Numbers of values: valid, >= edges, 0 (nan values are not counted)
+    ge = np.zeros((data.shape[1], len(edges) + 2), dtype = np.int64)
+    ge[:, 0] = data.shape[0] - np.isnan(data).sum(axis = 0)
+    for k in range(len(lim)):
+        ge[:, k + 1] = (data >= lim[k]).sum(axis = 0)
+    
+    chunk = ge[:, :-1] - ge[:, 1:]
+    
+    if counts is None:
+        return chunk
+    counts += chunk
+    return counts
+
+# end Subroutine get_pdf_cells
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: DAV_counts
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for DAV of all grid cells from counts of bins (see 
+# get_pdf_cells). Cells without data get nan.
+# 
+# Input parameters : c_obs - counts of observations          (cells, nbin)
+#                    c_lr  - counts of low resolution data   (cells, nbin)
+#                    c_hr  - counts of high resolution data  (cells, nbin)
+#
+# Output parameters: dav   - the DAV metric of cells (float32)
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def DAV_counts(c_obs, c_lr, c_hr):
+    
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        pdf = [c / c.sum(axis = 1, keepdims = True) for c in (c_obs, c_lr, c_hr)]
+        dav = DAV_metric(pdf[2], pdf[1], pdf[0])
+    
+    return np.where(np.isfinite(dav), dav, np.nan).astype(np.float32)
+
+# end Subroutine DAV_counts
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: DAV_grid
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for DAV of all grid cells (gridded daily data with the
+# same time steps). The counts are accumulated in chunks of time steps, so
+# the temporary arrays are chunk x cells.
+# 
+# Input parameters : obs   - observations          (time, cells) or (time, y, x)
+#                    lr    - low resolution data   (the same shape)
+#                    hr    - high resolution data  (the same shape)
+#                    bins  - bin edges for PDF (default: TEMP_BINS)
+#                    chunk - number of time steps in one chunk
+#
+# Output parameters: dav   - the DAV metric of cells (float32, cells)
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def DAV_grid(obs, lr, hr, bins = None, chunk = 365):
+    
+    if not (np.shape(obs) == np.shape(lr) == np.shape(hr)):
+        raise ValueError('Different shapes: ' + str(np.shape(obs)) + ' ' +
+                         str(np.shape(lr)) + ' ' + str(np.shape(hr)))
+    
+    counts = [None, None, None]
+    for t0 in range(0, len(obs), chunk):
+        for k, data in enumerate((obs, lr, hr)):
+            counts[k] = get_pdf_cells(data[t0:t0 + chunk], bins, counts[k])
+    
+    return DAV_counts(*counts)
+
+# end Subroutine DAV_grid
+#------------------------------------------------------------------------------
+
+
+
 #------------------------------------------------------------------------------
 # Subroutine: DAV_analysis
 #------------------------------------------------------------------------------
@@ -186,6 +505,9 @@ def DAV_metric(pr1, pr2, pr3):
 #                    sf_data_ds_dav  - subfolder for model data
 #                    par_list        - the list with parameters
 #                    ds_name         - the name of model dataset
+#                    ctx             - CDO_reader.DataContext, the reference 
+#                                      (obs, lr) data are read only once
+#                                      (optional)
 
 
 # Output parameters: DAV_list - the DAV list for parameters from par_list 
@@ -201,7 +523,7 @@ def DAV_metric(pr1, pr2, pr3):
 def DAV_analysis(mf_com, sf_obs_data, 
                          sf_lr_data ,
                          sf_hr_data ,
-                         par_list, refer, ds_name, mode):
+                         par_list, refer, ds_name, mode, ctx = None):
     
     # FileNames for data
     #d_obs = refer             + '_' + par_list + '_mean_dav_obs.csv'
@@ -222,68 +544,184 @@ def DAV_analysis(mf_com, sf_obs_data,
     path_hr  = mf_com + sf_hr_data  + d_hr    
     
     
-    df_dav_obs = get_dav(path_obs, 'OBS')
-    df_dav_lr  = get_dav(path_lr , 'LR')
-    df_dav_hr  = get_dav(path_hr , 'HR')
+    df_dav_obs = get_dav(path_obs, ctx)
+    df_dav_lr  = get_dav(path_lr , ctx)
+    df_dav_hr  = get_dav(path_hr      )
          
-    df_data = pd.concat([df_dav_obs, df_dav_lr, df_dav_hr], axis = 1) 
-
-    # Create PDF for temperature
-    obs = get_pdf(df_data['OBS'])
-    lr  = get_pdf(df_data['LR'] )
-    hr  = get_pdf(df_data['HR'] )
-             
-        
     # Calculate DAV metric
-    dav = DAV_metric(hr, lr, obs)
+    dav = DAV_series(df_dav_obs, df_dav_lr, df_dav_hr, get_bins(par_list))
 
     return dav
- 
-
-
-
 
 
 
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of get_pdf with the original loop
+# (TEST_dataset, temperature)
+# 
+# Input parameters : par_name - the name of parameter
+#
+# Output parameters: pdf      - probability density function for HYRAS data
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
 
+def test1(par_name = 'T_2M'):
     
+    import os
+    
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                        'TEST_dataset', 'HYRAS', 
+                        'hyras_' + par_name + '_mean_dav_obs.csv')
+    data = get_dav(path)[1]
+    
+    # The original loop
+    count = [0] * 10
+    for j in range(len(data)):
+        if data[j] < -10.0:
+            count[0] = count[0] + 1
+        elif data[j] >= 30.0:
+            count[9] = count[9] + 1
+        else:
+            for k in range(1, 9):
+                if data[j] >= TEMP_BINS[k - 1] and data[j] < TEMP_BINS[k]:
+                    count[k] = count[k] + 1
+    
+    pdf = get_pdf(data)
+    assert list(pdf) == count
+    
+    return pdf
 
+# end Subroutine test1
+#------------------------------------------------------------------------------
 
 
+#------------------------------------------------------------------------------
+# Subroutine: test2
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of get_pdf_cells (float32 and float64
+# data, values at bin edges, nan values) with get_pdf of every cell
+# 
+# Input parameters : par_name - the name of parameter
+#
+# Output parameters: counts   - counts of cells
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
 
+def test2(par_name = 'TOT_PREC'):
+    
+    bins  = get_bins(par_name)
+    rng   = np.random.default_rng(1)
+    data  = rng.normal(5.0, 15.0, (200, 50)).astype(np.float32)
+    edges = np.asarray(bins, dtype = np.float32)
+    data[:20] = edges[rng.integers(0, len(edges), (20, 50))]
+    data[20:30] = np.nextafter(data[:10], np.float32(-np.inf))
+    data[::13, 3] = np.nan
+    data[:, 7] = np.nan
+    
+    for arr in (data, data.astype(np.float64)):
+        counts = get_pdf_cells(arr[:90], bins)
+        counts = get_pdf_cells(arr[90:], bins, counts)
+        for cell in range(arr.shape[1]):
+            assert list(counts[cell]) == list(get_pdf(arr[:, cell], bins))
+    
+    return counts
 
+# end Subroutine test2
+#------------------------------------------------------------------------------
 
 
 
+#------------------------------------------------------------------------------
+# Subroutine: test3
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of days of get_dav with the dates of
+# pandas (TEST_dataset) and of align_dav with the intersection of pandas
+# (timeseries with missing and extra days)
+# 
+# Input parameters : par_name - the name of parameter
+#
+# Output parameters: dav      - DAV of timeseries with missing days
+#
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-        
-  
+def test3(par_name = 'TOT_PREC'):
     
-
-
- 
-          
-
-       
-      
+    import os
+    import tempfile
     
-
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                        'TEST_dataset', 'HYRAS', 
+                        'hyras_' + par_name + '_mean_dav_obs.csv')
+    df   = pd.read_csv(path, sep = r'\s+', header = None)
+    date = pd.to_datetime(df[0] + ' ' + df[1], format = '%Y-%m-%d %H:%M:%S')
+    day, value = get_dav(path)
+    assert np.array_equal(day, date.values.astype('datetime64[D]').astype(np.int64))
+    assert np.array_equal(value, df[2].to_numpy(dtype = np.float64))
+    
+    # LR without the first days, HR with extra days and not sorted
+    rng    = np.random.default_rng(1)
+    ts_obs = (day, value)
+    ts_lr  = (day[30:], value[30:] * rng.lognormal(0.0, 0.3, len(day) - 30))
+    ts_hr  = (np.concatenate([day[-10:] + 10, day]),
+              np.concatenate([np.ones(10), value * 1.1]))
+    
+    result = align_dav(ts_obs, ts_lr, ts_hr)
+    series = [pd.Series(ts[1], index = pd.DatetimeIndex(
+                  ts[0].astype('datetime64[D]').astype('datetime64[ns]')))
+              for ts in [ts_obs, ts_lr, ts_hr]]
+    ref = pd.concat(series, axis = 1, join = 'inner').sort_index()
+    assert np.array_equal(result[0], ref.index.values.astype('datetime64[D]')
+                                        .astype(np.int64))
+    assert np.array_equal(result[1], ref.to_numpy().T, equal_nan = True)
+    # pandas Series (e.g. NetCDF data) as timeseries
+    result_pd = align_dav(*series, report = False)
+    assert all(np.array_equal(a, b, equal_nan = True)
+               for a, b in zip(result, result_pd))
+    
+    # Several values of one day are not accepted
+    ts_dup = (np.append(day, day[5]), np.append(value, 1.0))
+    try:
+        align_dav(ts_obs, ts_lr, ts_dup)
+        raise AssertionError('duplicated days are accepted')
+    except ValueError:
+        pass
+    with tempfile.TemporaryDirectory() as tmp:
+        path_dup = os.path.join(tmp, 'hourly.csv')
+        with open(path_dup, 'w') as f:
+            f.write(' 2002-01-01 00:00:00 1.0\n 2002-01-01 12:00:00 2.0\n')
+        try:
+            rd.parse_ts(path_dup)
+            raise AssertionError('hourly data are accepted')
+        except ValueError:
+            pass
     
+    return DAV_series(ts_obs, ts_lr, ts_hr, get_bins(par_name))
+
+# end Subroutine test3
+#------------------------------------------------------------------------------
 
 
+if __name__ == '__main__':
+    
+    for par in ['T_2M', 'TMAX_2M', 'TMIN_2M']:
+        print(par, '- PDF:', test1(par))
+    for par in ['T_2M', 'TOT_PREC']:
+        print(par, '- PDF of cells:', test2(par).sum(axis = 0))
+    print('TOT_PREC - DAV of common days:', test3())
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+The FIELD_store is the program for the store of gridded fields (per-cell KGE
+and RMSD, see KGE_RMSD.KGE_RMSD_grid, and bias of mean values). The fields
+are float32 .npy files which are written and read as memory-mapped arrays,
+so maps can be plotted without recalculation and without loading of full
+files into memory.
+
+The coordinates (lon, lat) are saved once per grid and shared by all fields
+of this grid. Files in the store folder:
+    grid_<id>.lon.npy, grid_<id>.lat.npy - coordinates of grid <id>
+    <name>.<field>.npy                   - field (e.g. KGE) of the data <name>
+    <name>.json                          - grid id, number of cells, fields,
+                                           key of input data (see
+                                           STAT_store.task_key)
+
+The progam contains several subroutine:
+    grid_id       ---> The subroutine needs for the id of grid (coordinates)
+    save_grid     ---> The subroutine needs for saving of coordinates
+    create        ---> The subroutine needs for creation of fields
+    commit        ---> The subroutine needs for finishing of fields
+    exists        ---> The subroutine needs for checking of fields
+    load          ---> The subroutine needs for loading of fields
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import json
+import hashlib
+import numpy as np
+
+
+# Fields of KGE_RMSD.KGE_RMSD_grid and bias (mean_mod - mean_obs) of tasks
+FIELDS = ['KGE', 'RMSD', 'BIAS']
+
+
+#------------------------------------------------------------------------------
+# Subroutine: grid_id
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the id of grid: hash of coordinates (float32)
+#
+# Input parameters : lon, lat - coordinates of grid cells
+#
+#
+# Output parameters: gid      - id of grid (16 hexadecimal symbols)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def grid_id(lon, lat):
+    sha = hashlib.sha1()
+    sha.update(np.ascontiguousarray(lon, dtype = np.float32))
+    sha.update(np.ascontiguousarray(lat, dtype = np.float32))
+
+    return sha.hexdigest()[:16]
+
+# end Subroutine grid_id
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: save_grid
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for saving of coordinates. The coordinates are saved
+# only if the grid is not in the store yet.
+#
+# Input parameters : store    - path for the store (folder)
+#                    lon, lat - coordinates of grid cells
+#
+#
+# Output parameters: gid      - id of grid (see grid_id)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def save_grid(store, lon, lat):
+    gid = grid_id(lon, lat)
+    os.makedirs(store, exist_ok = True)
+    for col, arr in [('lon', lon), ('lat', lat)]:
+        path = os.path.join(store, 'grid_' + gid + '.' + col + '.npy')
+        if os.path.exists(path):
+            continue
+        # Other processes can save the same grid
+        tmp = path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(arr, dtype = np.float32))
+        os.replace(tmp, path)
+
+    return gid
+
+# end Subroutine save_grid
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: create
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for creation of fields (memory-mapped float32 arrays
+# with one value per grid cell). The meta data of the previous fields are
+# deleted first, so the fields are valid only after commit (also if the
+# calculation is broken).
+#
+# Input parameters : store    - path for the store (folder)
+#                    name     - the name of data (e.g. hyras_GC_T_2M)
+#                    lon, lat - coordinates of grid cells
+#                    fields   - names of fields
+#                    key      - key of input data (see STAT_store.task_key)
+#                               or None
+#
+#
+# Output parameters: data     - dictionary with fields (writable arrays)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def create(store, name, lon, lat, fields = FIELDS, key = None):
+    gid  = save_grid(store, lon, lat)
+    # The files of fields are rewritten: the old fields are not valid
+    meta = os.path.join(store, name + '.json')
+    if os.path.exists(meta):
+        os.remove(meta)
+    data = {}
+    for field in fields:
+        data[field] = np.lib.format.open_memmap(
+            os.path.join(store, name + '.' + field + '.npy'), mode = 'w+',
+            dtype = np.float32, shape = (len(lon),))
+
+    with open(os.path.join(store, name + '.json.tmp'), 'w') as f:
+        json.dump({'grid' : gid, 'size' : len(lon), 'fields' : list(fields),
+                   'key'  : key}, f)
+
+    return data
+
+# end Subroutine create
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: commit
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for finishing of fields: the arrays are written to
+# disk and the meta data are saved (the fields are valid for load).
+#
+# Input parameters : store - path for the store (folder)
+#                    name  - the name of data
+#                    data  - dictionary with fields (see create)
+#
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def commit(store, name, data):
+    for arr in data.values():
+        arr.flush()
+    os.replace(os.path.join(store, name + '.json.tmp'),
+               os.path.join(store, name + '.json'))
+
+# end Subroutine commit
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: exists
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for checking of fields in the store
+#
+# Input parameters : store  - path for the store (folder)
+#                    name   - the name of data
+#                    fields - the names of fields
+#                    key    - key of input data (see STAT_store.task_key) or
+#                             None (the key is not checked)
+#
+#
+# Output parameters: status - True if the fields (of the same input data) are
+#                             in the store
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def exists(store, name, fields = FIELDS, key = None):
+    path = os.path.join(store, name + '.json')
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        meta = json.load(f)
+
+    if key is not None and meta.get('key') != key:
+        return False
+
+    return set(fields) <= set(meta['fields'])
+
+# end Subroutine exists
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: load
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for loading of fields from the store. The arrays are
+# memory-mapped (read only).
+#
+# Input parameters : store    - path for the store (folder)
+#                    name     - the name of data
+#
+#
+# Output parameters: lon, lat - coordinates of grid cells
+#                    data     - dictionary with fields
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def load(store, name):
+    with open(os.path.join(store, name + '.json')) as f:
+        meta = json.load(f)
+
+    grid = os.path.join(store, 'grid_' + meta['grid'])
+    lon  = np.load(grid + '.lon.npy', mmap_mode = 'r')
+    lat  = np.load(grid + '.lat.npy', mmap_mode = 'r')
+    data = {}
+    for field in meta['fields']:
+        data[field] = np.load(os.path.join(store, name + '.' + field + '.npy'),
+                              mmap_mode = 'r')
+
+    return lon, lat, data
+
+# end Subroutine load
+#------------------------------------------------------------------------------
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+The GRID_index is the program for alignment of gridded data (cdo -outputtab
+files) by coordinates instead of row order. The index of grid maps the
+rounded coordinates (lon, lat) of every cell to the canonical cell id (row
+of the reference file). The rows of other files are mapped to the cell ids
+once per grid, the values are aligned by integer gathers:
+    rows   = get_rows(index, lon, lat)      # row of file for every cell
+    values = gather(values, rows)           # nan - cell is not in the file
+
+Files with the same coordinates as the reference (the usual case) are found
+by the hash of coordinates (see FIELD_store.grid_id), the values are used
+without copy. Files on slightly different grids (other order, missing or
+extra cells, differences of coordinates up to one step of rounding, e.g.
+6.96691 46.5964 and 6.96691 46.5965 of regridded files) are aligned, the
+mismatch is reported. The rows without the exact key are searched in the
+neighbouring keys (SHIFTS).
+
+The key of cell is the exact integer of rounded coordinates:
+    key = round(lon * 10**decimals) * 2**32 + round(lat * 10**decimals)
+The keys of index are calculated only for the first file with other grid,
+they are saved in the folder (grid_<id>_<decimals>.npz) and are loaded by
+other runs and processes.
+
+The progam contains several subroutine:
+    cell_keys     ---> The subroutine needs for keys of cells
+    build         ---> The subroutine needs for the index of grid
+    get_index     ---> The subroutine needs for the index of grid (cached)
+    get_keys      ---> The subroutine needs for keys of index (cached)
+    get_rows      ---> The subroutine needs for rows of file for cells of grid
+    gather        ---> The subroutine needs for values of cells of grid
+    align         ---> The subroutine needs for alignment of file to grid
+    test1         ---> The subroutine needs for tests of alignment
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import numpy as np
+import FIELD_store as fs
+
+
+# Rounding of coordinates, decimal places of degree (1e-4 deg ~ 10 m)
+DECIMALS = 4
+
+# Shifts of neighbouring keys (steps of rounding of lon, lat) for rows
+# without the exact key: the nearest first
+SHIFTS = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+# Indexes and rows of this process:
+#     (grid id, decimals)            --> index (see build)
+#     (grid id, decimals, file grid) --> rows, stat (see get_rows)
+indexes = {}
+rows_cache = {}
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cell_keys
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for keys of cells (int64): rounded longitude in the
+# high 32 bits and rounded latitude in the low 32 bits
+#
+# Input parameters : lon, lat - coordinates of cells
+#                    decimals - decimal places of rounding
+#                    shift    - shift of key (steps of rounding of lon, lat)
+#
+#
+# Output parameters: keys     - keys of cells (int64)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def cell_keys(lon, lat, decimals = DECIMALS, shift = (0, 0)):
+    scale = 10.0**decimals
+    ilon  = np.rint(np.asarray(lon, dtype = np.float64) * scale).astype(np.int64)
+    ilat  = np.rint(np.asarray(lat, dtype = np.float64) * scale).astype(np.int64)
+    ilon += shift[0]
+    ilat += shift[1]
+
+    return (ilon << 32) + (ilat & 0xFFFFFFFF)
+
+# end Subroutine cell_keys
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: build
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the index of grid: the keys of cells are sorted,
+# so the cells of other files are found by binary search
+#
+# Input parameters : lon, lat - coordinates of cells of the reference grid
+#                    decimals - decimal places of rounding
+#
+#
+# Output parameters: index    - dictionary: grid (id of grid), size (number
+#                               of cells), decimals, keys (sorted keys),
+#                               cells (cell ids of sorted keys)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def build(lon, lat, decimals = DECIMALS):
+    keys  = cell_keys(lon, lat, decimals)
+    cells = np.argsort(keys, kind = 'stable')
+    keys  = keys[cells]
+    if len(keys) > 1 and (keys[1:] == keys[:-1]).any():
+        raise ValueError('Cells with the same rounded coordinates (decimals = ' +
+                         str(decimals) + ')')
+
+    return {'grid'     : fs.grid_id(lon, lat),
+            'size'     : len(keys),
+            'decimals' : decimals,
+            'keys'     : keys,
+            'cells'    : cells.astype(np.int64)}
+
+# end Subroutine build
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_index
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the index of grid (one per grid in this process).
+# Only the id of grid is calculated, the keys are calculated by get_keys.
+#
+# Input parameters : lon, lat - coordinates of cells of the reference grid
+#                    folder   - path for keys of indexes or None (not saved)
+#                    decimals - decimal places of rounding
+#
+#
+# Output parameters: index    - dictionary: grid (id of grid), size, decimals,
+#                               lon, lat, folder (keys and cells see build)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_index(lon, lat, folder = None, decimals = DECIMALS):
+    gid = fs.grid_id(lon, lat)
+    if (gid, decimals) not in indexes:
+        indexes[(gid, decimals)] = {'grid'     : gid,
+                                    'size'     : len(lon),
+                                    'decimals' : decimals,
+                                    'lon'      : lon,
+                                    'lat'      : lat,
+                                    'folder'   : folder}
+
+    return indexes[(gid, decimals)]
+
+# end Subroutine get_index
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_keys
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for keys of index: from the index, from the folder or
+# new (the new keys are saved to the folder)
+#
+# Input parameters : index - index of grid (see get_index)
+#
+#
+# Output parameters: index - index with keys and cells (see build)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_keys(index):
+    if 'keys' in index:
+        return index
+
+    path = None
+    if index['folder']:
+        path = os.path.join(index['folder'], 'grid_' + index['grid'] + '_' +
+                            str(index['decimals']) + '.npz')
+        if os.path.exists(path):
+            with np.load(path) as data:
+                index['keys' ] = data['keys' ]
+                index['cells'] = data['cells']
+            return index
+
+    new = build(index['lon'], index['lat'], index['decimals'])
+    index['keys' ] = new['keys' ]
+    index['cells'] = new['cells']
+    if path:
+        # Other processes can save the same keys
+        os.makedirs(index['folder'], exist_ok = True)
+        tmp = path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, keys = index['keys'], cells = index['cells'])
+        os.replace(tmp, path)
+
+    return index
+
+# end Subroutine get_keys
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_rows
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for rows of file for cells of grid. The rows are
+# calculated once per grid of file (hash of coordinates), the file with the
+# grid of index has rows None (the same order).
+#
+# Input parameters : index    - index of grid (see get_index)
+#                    lon, lat - coordinates of rows of file
+#
+#
+# Output parameters: rows     - row of file for every cell (-1 - no row) or
+#                               None (the same grid)
+#                    stat     - dictionary: same (True - the same grid),
+#                               missing (cells without row), extra (rows
+#                               without cell), duplicate (rows of cells
+#                               with several rows, the first row is used)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_rows(index, lon, lat):
+    gid = fs.grid_id(lon, lat)
+    if gid == index['grid']:
+        return None, {'same' : True, 'missing' : 0, 'extra' : 0, 'duplicate' : 0}
+
+    key = (index['grid'], index['decimals'], gid)
+    if key not in rows_cache:
+        index = get_keys(index)
+        found = np.full(len(lon), -1, dtype = np.int64)
+        for shift in [(0, 0)] + SHIFTS:
+            todo = np.flatnonzero(found < 0)
+            if len(todo) == 0:
+                break
+            keys = cell_keys(lon[todo], lat[todo], index['decimals'], shift)
+            # Binary search of sorted keys (random order of keys is ~10 times
+            # slower, cache misses)
+            sort = np.argsort(keys)
+            pos  = np.empty(len(keys), dtype = np.int64)
+            pos[sort] = np.searchsorted(index['keys'], keys[sort])
+            pos  = np.minimum(pos, index['size'] - 1)
+            ok   = index['keys'][pos] == keys
+            found[todo[ok]] = index['cells'][pos[ok]]
+        ok    = found >= 0
+        cell  = found[ok]
+        row   = np.flatnonzero(ok)
+
+        # The first row of every cell
+        rows = np.full(index['size'], len(lon), dtype = np.int64)
+        np.minimum.at(rows, cell, row)
+        rows[rows == len(lon)] = -1
+
+        missing = int((rows < 0).sum())
+        stat = {'same'      : False,
+                'missing'   : missing,
+                'extra'     : int((~ok).sum()),
+                'duplicate' : int(len(cell) - (index['size'] - missing))}
+        rows_cache[key] = (rows, stat)
+
+    return rows_cache[key]
+
+# end Subroutine get_rows
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: gather
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for values of cells of grid (integer gather)
+#
+# Input parameters : values - values of rows of file
+#                    rows   - rows of cells (see get_rows) or None
+#
+#
+# Output parameters: values - values of cells (nan - no row)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def gather(values, rows):
+    if rows is None:
+        return values
+
+    out = np.take(values, rows).astype(np.float64, copy = False)
+    out[rows < 0] = np.nan
+
+    return out
+
+# end Subroutine gather
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: align
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for alignment of file (cdo -outputtab data) to grid.
+# The mismatch of grids is printed.
+#
+# Input parameters : index    - index of grid (see get_index)
+#                    lon, lat - coordinates of rows of file
+#                    values   - values of rows of file
+#                    name     - the name of file (for messages)
+#
+#
+# Output parameters: values   - values of cells of grid
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def align(index, lon, lat, values, name = ''):
+    rows, stat = get_rows(index, lon, lat)
+    if not stat['same'] and (stat['missing'] or stat['extra'] or stat['duplicate']):
+        print('Grid mismatch', name, '- cells without data:', stat['missing'],
+              ', rows out of grid:', stat['extra'],
+              ', duplicate rows:', stat['duplicate'])
+
+    return gather(values, rows)
+
+# end Subroutine align
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for tests of alignment: shuffled rows, missing and
+# extra cells, duplicate rows, small differences of coordinates, cached
+# index (synthetic grid)
+#
+# Input parameters : n    - number of cells
+#
+#
+# Output parameters: stat - mismatch of the test file (see get_rows)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(n = 10000):
+
+    import tempfile
+
+    rng = np.random.default_rng(1)
+    lon = (5.0  + 0.0275 * (np.arange(n) % 100 )).astype(np.float32)
+    lat = (47.0 + 0.0275 * (np.arange(n) // 100)).astype(np.float32)
+    val = rng.normal(size = n).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = get_keys(get_index(lon, lat, tmp))
+        indexes.clear()
+        assert (get_keys(get_index(lon, lat, tmp))['cells'] == index['cells']).all()
+
+    # The same grid: no copy
+    assert align(index, lon, lat, val) is val
+    assert (gather(val, index['cells'][np.argsort(index['cells'])]) == val).all()
+
+    # Other order, 10 missing cells, 5 extra rows, 1 duplicate row, noise of
+    # coordinates (float32 after arithmetic) and the last digit of 100 cells
+    perm  = rng.permutation(n)[10:]
+    digit = np.where(np.arange(len(perm)) < 100, np.float32(1e-4), np.float32(0))
+    lon2  = np.concatenate([lon[perm] + np.float32(1e-6), np.float32(-10.0) +
+                            np.arange(5, dtype = np.float32), lon[perm[:1]]])
+    lat2  = np.concatenate([lat[perm] - np.float32(1e-6) + digit,
+                            np.zeros(5, dtype = np.float32), lat[perm[:1]]])
+    val2 = np.concatenate([val[perm], np.ones(5, np.float32), [np.float32(99.0)]])
+
+    rows, stat = get_rows(index, lon2, lat2)
+    out  = gather(val2, rows)
+    mask = np.zeros(n, dtype = bool)
+    mask[perm] = True
+    assert (out[mask] == val[mask]).all() and np.isnan(out[~mask]).all()
+    assert stat == {'same' : False, 'missing' : 10, 'extra' : 5, 'duplicate' : 1}
+
+    return stat
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    print('Mismatch of test grid:', test1())
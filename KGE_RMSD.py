@@ -10,7 +10,15 @@ https://doi.org/10.1016/j.jhydrol.2009.08.003
 The progam contains several subroutine:
     get_data          ---> The subroutine needs for getting actual COSMO data
     get_grid          ---> The subroutine needs for getting probability density function
+    KGE_RMSD_metric   ---> The subroutine needs for KGE and RMSD calculations (all grid cells)
+    KGE_RMSD_grid     ---> The subroutine needs for KGE and RMSD fields of the full grid
+    KGE_RMSD_arrays   ---> The subroutine needs for statistical analysis of preloaded data
+    KGE_RMSD_bootstrap ---> The subroutine needs for confidence intervals of KGE, RMSD, CORR
+    STD_ratio         ---> The subroutine needs for normalized standard deviation
     KGE_RMSD_analysis ---> The subroutine needs for statistical analysis of the datasets
+    test1             ---> The subroutine needs for comparison with the original loop
+    test2             ---> The subroutine needs for comparison of KGE_RMSD_grid with
+                           KGE_RMSD_metric
     
 Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang, 
                                                 Center for Enviromental System
@@ -29,9 +37,18 @@ Version    Date       Name
 """
 
 
-import math
 import numpy as np
 import pandas as pd
+import CDO_reader as rd
+import GRID_index as gi
+import STAT_boot  as boot
+
+
+# Minimal KGE value: smaller values are outliers (see KGE_RMSD_metric)
+KGE_MIN = -1.5
+
+# Number of grid cells in one block (see KGE_RMSD_grid)
+CHUNK = 1 << 18
 
 #------------------------------------------------------------------------------
 # Subroutine: get_data
@@ -57,12 +74,9 @@ import pandas as pd
 
 
 def get_data(path, par_name):
-    df = pd.read_csv(path, skiprows = 0, sep=' ', skipinitialspace = True, 
-                     na_values = ['-999','-1','***','******'])
-    df = df.drop(['#', 'value', 'Unnamed: 5'], axis = 1 )
-    df.columns = ['lon', 'lat', par_name]  
+    lon, lat, value = rd.get_tab(path)
     
-    df = df.drop(['lon', 'lat'], axis = 1 )
+    df = pd.DataFrame({par_name : value})
     
     return df
 
@@ -96,15 +110,10 @@ def get_data(path, par_name):
 
 
 def get_grid(path, par_name):
-    df = pd.read_csv(path, skiprows = 0, sep=' ', skipinitialspace = True, 
-                     na_values = ['-999','-1','***','******'])
-    df = df.drop(['#', 'value', 'Unnamed: 5'], axis = 1 )
-    df.columns = ['lon', 'lat', par_name]  
+    lon, lat, value = rd.get_tab(path)
     
-    df = df.drop([par_name], axis = 1 )
-    
-    lon = df['lon']
-    lat = df['lat']
+    lon = pd.Series(lon, name = 'lon')
+    lat = pd.Series(lat, name = 'lat')
     
     return lon, lat
 
@@ -115,6 +124,293 @@ def get_grid(path, par_name):
 
 
 
+#------------------------------------------------------------------------------
+# Subroutine: KGE_RMSD_metric
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for calculation of KGE and RMSD for all grid cells in
+# one pass (NumPy arrays instead of the loop over rows)
+#
+# 
+# Input parameters : m_obs - mean values of reference data
+#                    s_obs - std values of reference data
+#                    m_mod - mean values of model data
+#                    s_mod - std values of model data
+#                    corr  - correlation between reference and model data
+#
+#
+# Output parameters: kge  - KGE values for every grid cell
+#                    rmsd - RMSD values for every grid cell
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def KGE_RMSD_metric(m_obs, s_obs, m_mod, s_mod, corr):
+    
+    kge, rmsd = kge_rmsd(m_obs, s_obs, m_mod, s_mod, corr)
+    
+    # Outliers (KGE < KGE_MIN). The row loop replaced them by the mean of the 
+    # neighbours, but the next neighbour was not calculated yet (NaN), so the 
+    # cell was excluded from the mean value. The last cell gets the (already 
+    # smoothed) value of the previous cell.
+    outlier = kge < KGE_MIN
+    if outlier.any():
+        kge = np.where(outlier, np.nan, kge)
+        if outlier[-1]:
+            kge[-1] = kge[-2] if len(kge) > 1 else np.nan
+    
+    return kge, rmsd
+
+# end Subroutine KGE_RMSD_metric
+#------------------------------------------------------------------------------
+
+
+def kge_rmsd(m_obs, s_obs, m_mod, s_mod, corr):
+    m_obs = np.asarray(m_obs, dtype = np.float64)
+    s_obs = np.asarray(s_obs, dtype = np.float64)
+    m_mod = np.asarray(m_mod, dtype = np.float64)
+    s_mod = np.asarray(s_mod, dtype = np.float64)
+    corr  = np.asarray(corr , dtype = np.float64)
+    
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        kge = 1.0 - np.sqrt((corr          - 1.0)**2.0 + 
+                            (s_mod / s_obs - 1.0)**2.0 +
+                            (m_mod / m_obs - 1.0)**2.0 )
+    
+    # Negative values under sqrt give negative RMSD
+    rmsd = s_obs**2.0 + s_mod**2.0 - 2.0 * s_obs * s_mod * corr
+    rmsd = np.sign(rmsd) * np.sqrt(np.abs(rmsd))
+    
+    return kge, rmsd
+
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: KGE_RMSD_grid
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for calculation of KGE and RMSD fields for the full
+# grid of reference data. The cells are processed in blocks (CHUNK cells), so
+# only the input arrays and the output fields are kept in memory. Cells with 
+# missing values (NaN or missing rows) have NaN values in the fields.
+# The output fields can be given (e.g. memory-mapped arrays, see FIELD_store).
+#
+# 
+# Input parameters : lon, lat - coordinates of grid cells
+#                    mean_obs - mean values of reference data
+#                    std_obs  - std values of reference data
+#                    mean_mod - mean values of model data
+#                    std_mod  - std values of model data
+#                    corr     - correlation between reference and model data
+#                    kge      - output array for KGE  field (float32) or None
+#                    rmsd     - output array for RMSD field (float32) or None
+#
+#
+# Output parameters: kge, rmsd - KGE and RMSD fields (len(lon) cells)
+#                    ref_kge, ref_rmsd, ref_corr - mean values of KGE, RMSD
+#                                                  and correlation
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def KGE_RMSD_grid(lon, lat, mean_obs, std_obs, mean_mod, std_mod, corr,
+                  kge = None, rmsd = None):
+    
+    n = len(lon)
+    if kge is None:
+        kge  = np.empty(n, dtype = np.float32)
+    if rmsd is None:
+        rmsd = np.empty(n, dtype = np.float32)
+    
+    sums = np.zeros(3)                  # KGE, RMSD, CORR
+    cnts = np.zeros(3, dtype = np.int64)
+    last = []                           # last valid cells: (index, KGE, outlier)
+    for i0 in range(0, n, CHUNK):
+        i1 = min(i0 + CHUNK, n)
+        data  = [get_part(arr, i0, i1) for arr in [lon, lat, mean_obs, std_obs,
+                                                   mean_mod, std_mod, corr]]
+        valid = np.ones(i1 - i0, dtype = bool)
+        for arr in data:
+            valid &= ~np.isnan(arr)
+        
+        kge_b, rmsd_b = kge_rmsd(*data[2:])
+        kge_b [~valid] = np.nan
+        rmsd_b[~valid] = np.nan
+        outlier = kge_b < KGE_MIN
+        kge_b[outlier] = np.nan
+        
+        kge [i0:i1] = kge_b
+        rmsd[i0:i1] = rmsd_b
+        
+        sums += [np.nansum(kge_b), np.nansum(rmsd_b), data[6][valid].sum()]
+        cnts += [np.count_nonzero(~np.isnan(kge_b)), 
+                 np.count_nonzero(~np.isnan(rmsd_b)), np.count_nonzero(valid)]
+        for j in np.flatnonzero(valid)[-2:]:
+            last = (last + [(i0 + j, kge_b[j], outlier[j])])[-2:]
+    
+    # The last valid cell gets the value of the previous valid cell if it is
+    # an outlier (see KGE_RMSD_metric)
+    if last and last[-1][2]:
+        value = last[-2][1] if len(last) > 1 else np.nan
+        kge[last[-1][0]] = value
+        if not np.isnan(value):
+            sums[0] += value
+            cnts[0] += 1
+    
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        ref_kge, ref_rmsd, ref_corr = sums / cnts
+    
+    return kge, rmsd, ref_kge, ref_rmsd, ref_corr
+
+# end Subroutine KGE_RMSD_grid
+#------------------------------------------------------------------------------
+
+
+def get_part(arr, i0, i1):
+    # Part of array as float64, missing rows (short files) are NaN
+    part = np.full(i1 - i0, np.nan)
+    data = arr[i0:i1]
+    part[:len(data)] = data
+    return part
+
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: KGE_RMSD_arrays
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for statistical analysis of preloaded data
+#
+# 
+# Input parameters : lon, lat - coordinates of grid cells
+#                    mean_obs - mean values of reference data
+#                    std_obs  - std values of reference data
+#                    mean_mod - mean values of model data
+#                    std_mod  - std values of model data
+#                    corr     - correlation between reference and model data
+#                    name     - the name of dataset and parameter for print
+#                    kge      - output array for KGE  field or None (see 
+#                               KGE_RMSD_grid)
+#                    rmsd     - output array for RMSD field or None
+#
+#
+# Output parameters: ref_kge, ref_rmsd, ref_corr - mean values of KGE, RMSD
+#                                                  and correlation
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def KGE_RMSD_arrays(lon, lat, mean_obs, std_obs, mean_mod, std_mod, corr, name = '',
+                    kge = None, rmsd = None):
+    
+    kge, rmsd, ref_kge, ref_rmsd, ref_corr = KGE_RMSD_grid(
+        lon, lat, mean_obs, std_obs, mean_mod, std_mod, corr, kge, rmsd)
+    
+    print('CORR ' + name + ' - ', "{:.3f}".format(ref_corr), '\n')    
+    
+    return ref_kge, ref_rmsd, ref_corr  
+
+# end Subroutine KGE_RMSD_arrays
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: KGE_RMSD_bootstrap
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for bootstrap confidence intervals of mean KGE, RMSD
+# and CORR: the valid grid cells (cells with RMSD value, see KGE_RMSD_grid)
+# are resampled, the mean values of all resamples are calculated in one
+# matrix product (see STAT_boot).
+#
+# 
+# Input parameters : kge, rmsd - KGE and RMSD fields (see KGE_RMSD_grid)
+#                    corr      - correlation between reference and model data
+#                    n_boot    - number of resamples
+#                    seed      - seed of random numbers (see STAT_boot)
+#                    level     - confidence level
+#                    workers   - number of processes
+#
+#
+# Output parameters: ci - dictionary: KGE, RMSD, CORR --> (lower, upper)
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def KGE_RMSD_bootstrap(kge, rmsd, corr, n_boot = 1000, seed = None, level = 0.95,
+                       workers = 1):
+    
+    valid = ~np.isnan(rmsd)
+    kge   = np.asarray(kge [valid], dtype = np.float64)
+    rmsd  = np.asarray(rmsd[valid], dtype = np.float64)
+    corr  = get_part(corr, 0, len(valid))[valid]
+    
+    # Sums of values and numbers of values (KGE outliers are NaN)
+    values = np.column_stack([np.nan_to_num(kge), ~np.isnan(kge), rmsd, 
+                              corr, np.ones(len(rmsd))])
+    sums   = boot.resample_sums(values, n_boot, seed, workers)
+    
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        stats = np.column_stack([sums[:, 0] / sums[:, 1], 
+                                 sums[:, 2] / sums[:, 4],
+                                 sums[:, 3] / sums[:, 4]])
+    lo, hi = boot.get_ci(stats, level)
+    
+    return {'KGE'  : (lo[0], hi[0]),
+            'RMSD' : (lo[1], hi[1]),
+            'CORR' : (lo[2], hi[2])}
+
+# end Subroutine KGE_RMSD_bootstrap
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: STD_ratio
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for normalized standard deviation of model data (for
+# Taylor diagram): mean std of model data / mean std of reference data over
+# the valid grid cells (cells with RMSD value, see KGE_RMSD_grid)
+#
+# 
+# Input parameters : std_obs - std values of reference data
+#                    std_mod - std values of model data
+#                    rmsd    - RMSD field (see KGE_RMSD_grid)
+#
+#
+# Output parameters: ref_std - normalized standard deviation
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def STD_ratio(std_obs, std_mod, rmsd):
+    
+    valid = ~np.isnan(rmsd)
+    s_obs = get_part(std_obs, 0, len(valid))[valid].sum()
+    s_mod = get_part(std_mod, 0, len(valid))[valid].sum()
+    
+    return s_mod / s_obs if s_obs else np.nan
+
+# end Subroutine STD_ratio
+#------------------------------------------------------------------------------
+
+
+
+
 #------------------------------------------------------------------------------
 # Subroutine: KGE_RMSD_analysis
 #------------------------------------------------------------------------------
@@ -128,6 +424,8 @@ def get_grid(path, par_name):
 #                    par_list        - the list with parameters
 #                    refer           - the name of reference data set 
 #                    ds_name         - the name of model dataset  
+#                    ctx             - CDO_reader.DataContext, the reference
+#                                      data are read only once (optional)
 #
 #
 # Output parameters: statistical parameters in a pront version
@@ -140,7 +438,8 @@ def get_grid(path, par_name):
 #
 #------------------------------------------------------------------------------
 
-def KGE_RMSD_analysis(mf_com, sf_data_ref, sf_data_ds, par_list, refer, ds_name, mode):
+def KGE_RMSD_analysis(mf_com, sf_data_ref, sf_data_ds, par_list, refer, ds_name, mode,
+                      ctx = None):
     
     # FileNames for data
     m_obs  = refer           + '_' + par_list + '_mean_obs.csv'
@@ -161,60 +460,74 @@ def KGE_RMSD_analysis(mf_com, sf_data_ref, sf_data_ds, par_list, refer, ds_name,
     path_c     = mf_com + sf_data_ds  + c_name
         
         
-    # Get data    
-    df_mean_obs = get_data(path_m_obs, 'M_obs' )
-    df_std_obs  = get_data(path_s_obs, 'S_obs' )
-    df_mean_mod = get_data(path_m_mod, 'M_mod' )
-    df_std_mod  = get_data(path_s_mod, 'S_mod' )
-    df_corr     = get_data(path_c    , 'P'     )
-                           
-    # Get coordinates
-    lon,lat     = get_grid(path_m_obs, 'M_obs' )   
-     
-    # Combine in one dataframe
-    df_data = pd.concat([lon, lat, df_mean_obs, df_std_obs, df_mean_mod, 
-                                    df_std_mod, df_corr  ], axis = 1)
-    
-    # Delete nan values
-    df_data = df_data.dropna()
-    # Reset index
-    df_data = df_data.reset_index()
-    # Delete previous index
-    df_data = df_data.drop(['index'], axis = 1 )
-
-    
-
-    # Create two zero timeseries
+    # Get data (coordinates are taken from the reference file). The reference
+    # data are shared between model datasets if ctx is used.
+    get_ref = rd.get_tab if ctx is None else ctx.get_tab
+    lon, lat, mean_obs = get_ref(path_m_obs)
+    # Rows of files on other grids are gathered to cells of reference (see
+    # GRID_index), cells without data are NaN (not valid)
+    grid     = gi.get_index(lon, lat)
+    std_obs  = gi.align(grid, *get_ref(path_s_obs), path_s_obs)
+    mean_mod = gi.align(grid, *rd.get_tab(path_m_mod), path_m_mod)
+    std_mod  = gi.align(grid, *rd.get_tab(path_s_mod), path_s_mod)
+    corr     = gi.align(grid, *rd.get_tab(path_c    ), path_c    )
+    
+    return KGE_RMSD_arrays(lon, lat, mean_obs, std_obs, mean_mod, std_mod, corr,
+                           ds_name + '_' + par_list)
+
+# end Subroutine KGE_RMSD_analysis
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of KGE_RMSD_metric with the original 
+# loop over rows (TEST_dataset, HYRAS vs GC)
+#
+# 
+# Input parameters : par_name - the name of parameter
+#
+#
+# Output parameters: max_diff - maximal absolute differences for KGE and RMSD
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(par_name = 'T_2M'):
+    
+    import math
+    import os
+    
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                        'TEST_dataset', '')
+    
+    df_data = pd.concat([
+        get_data(path + 'HYRAS/hyras_' + par_name + '_mean_obs.csv', 'M_obs'),
+        get_data(path + 'HYRAS/hyras_' + par_name + '_std_obs.csv' , 'S_obs'),
+        get_data(path + 'GC/LU_GC_'    + par_name + '_mean_mod.csv', 'M_mod'),
+        get_data(path + 'GC/LU_GC_'    + par_name + '_std_mod.csv' , 'S_mod'),
+        get_data(path + 'GC/Corr_HYRAS_LU_GC_' + par_name + '.csv' , 'P'    )],
+        axis = 1)
+    df_data = df_data.dropna().reset_index(drop = True).astype(np.float64)
+    
+    # The original loop
     kge  = pd.Series(np.nan, index = df_data.index, name = 'KGE' )
     rmsd = pd.Series(np.nan, index = df_data.index, name = 'RMSD')
-        
-    # Get correlation values
-    ref_corr = np.mean(df_data['P'])
-    print('CORR ' + ds_name + '_' + par_list + ' - ',  
-              "{:.3f}".format(ref_corr), '\n')    
-
-   
-    # Get KGE and RMSD
- 
     for row in range(len(df_data)):
-            
         kge[row] = 1.0 - math.sqrt((df_data['P'][row] - 1.0 )**2.0 + 
                                    (df_data['S_mod'][row] / df_data['S_obs'][row] - 1.0 )**2.0 +
                                    (df_data['M_mod'][row] / df_data['M_obs'][row] - 1.0 )**2.0 ) 
-
-        #print (row, '-', len(kge))        
         if row == (len(kge) - 1):
-            print ('hel')
             if kge[row] < -1.5:
                 kge[row] = kge[row - 1]
-
         else:
             if kge[row] < -1.5:
                 kge[row] = (kge[row-1] + kge[row+1]) / 2.0
-
-  
-
-
         
         try:
             rmsd[row] = math.sqrt((df_data['S_obs'][row])**2.0 + 
@@ -222,31 +535,99 @@ def KGE_RMSD_analysis(mf_com, sf_data_ref, sf_data_ds, par_list, refer, ds_name,
                                   2.0 * df_data['S_obs'][row] * 
                                         df_data['S_mod'][row] * 
                                         df_data['P'][row])  
-            
-        except ValueError as error:
-            #print ( 'Line: ', row, 'Parameter ', par, 'sqrt(0) ', error , '\n')
+        except ValueError:
             rmsd[row] = -1.0 * math.sqrt( abs((df_data['S_obs'][row])**2.0 + 
                                               (df_data['S_mod'][row])**2.0 -
                                               2.0 * df_data['S_obs'][row] * 
                                                     df_data['S_mod'][row] * 
-                                                    df_data['P'][row]))        
-        
-   
-    ref_kge  = np.mean(kge)
-    ref_rmsd = np.mean(rmsd)
+                                                    df_data['P'][row]))
     
-    return ref_kge, ref_rmsd, ref_corr  
+    # Vectorized version
+    kge_v, rmsd_v = KGE_RMSD_metric(df_data['M_obs'], df_data['S_obs'],
+                                    df_data['M_mod'], df_data['S_mod'],
+                                    df_data['P'])
+    
+    assert np.array_equal(np.isnan(kge.values), np.isnan(kge_v))
+    assert np.allclose(kge.values , kge_v , rtol = 1e-12, equal_nan = True)
+    assert np.allclose(rmsd.values, rmsd_v, rtol = 1e-12, equal_nan = True)
+    assert np.isclose(np.mean(kge), np.nanmean(kge_v), rtol = 1e-12)
+    assert np.isclose(np.mean(rmsd), np.nanmean(rmsd_v), rtol = 1e-12)
+    
+    max_diff = (np.nanmax(np.abs(kge.values  - kge_v )), 
+                np.nanmax(np.abs(rmsd.values - rmsd_v)))
+    return max_diff
 
+# end Subroutine test1
+#------------------------------------------------------------------------------
 
-       
 
-                 
 
-        
+#------------------------------------------------------------------------------
+# Subroutine: test2
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of KGE_RMSD_grid (small blocks, fields
+# of the full grid) with KGE_RMSD_metric (only valid cells, TEST_dataset)
+#
+# 
+# Input parameters : par_name - the name of parameter
+#                    chunk    - number of grid cells in one block
+#
+#
+# Output parameters: ref_kge, ref_rmsd, ref_corr - mean values of KGE, RMSD
+#                                                  and correlation
+# 
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
 
-       
-               
+def test2(par_name = 'T_2M', chunk = 1000):
+    
+    import os
+    global CHUNK
+    
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                        'TEST_dataset', '')
+    
+    lon, lat, mean_obs = rd.get_tab(path + 'HYRAS/hyras_' + par_name + '_mean_obs.csv')
+    std_obs  = rd.get_tab(path + 'HYRAS/hyras_' + par_name + '_std_obs.csv')[2]
+    mean_mod = rd.get_tab(path + 'GC/LU_GC_'    + par_name + '_mean_mod.csv')[2]
+    std_mod  = rd.get_tab(path + 'GC/LU_GC_'    + par_name + '_std_mod.csv' )[2]
+    corr     = rd.get_tab(path + 'GC/Corr_HYRAS_LU_GC_' + par_name + '.csv' )[2]
+    # The last cells of model data are missing
+    mean_mod = mean_mod[:-chunk // 2]
+    
+    chunk_old, CHUNK = CHUNK, chunk
+    try:
+        kge, rmsd, ref_kge, ref_rmsd, ref_corr = KGE_RMSD_grid(
+            lon, lat, mean_obs, std_obs, mean_mod, std_mod, corr)
+    finally:
+        CHUNK = chunk_old
+    
+    # Only valid cells
+    n = len(mean_mod)
+    data  = np.array([lon[:n], lat[:n], mean_obs[:n], std_obs[:n], mean_mod, 
+                      std_mod[:n], corr[:n]], dtype = np.float64)
+    valid = ~np.isnan(data).any(axis = 0)
+    kge_v, rmsd_v = KGE_RMSD_metric(*data[2:, valid])
+    
+    assert len(kge) == len(lon) and np.isnan(kge[n:]).all()
+    assert np.allclose(kge [:n][valid], kge_v , rtol = 1e-6, equal_nan = True)
+    assert np.allclose(rmsd[:n][valid], rmsd_v, rtol = 1e-6, equal_nan = True)
+    assert np.isnan(kge[:n][~valid]).all() and np.isnan(rmsd[:n][~valid]).all()
+    assert np.isclose(ref_kge , np.nanmean(kge_v ), rtol = 1e-12)
+    assert np.isclose(ref_rmsd, np.nanmean(rmsd_v), rtol = 1e-12)
+    assert np.isclose(ref_corr, np.mean(data[6, valid]), rtol = 1e-12)
+    
+    return ref_kge, ref_rmsd, ref_corr
 
+# end Subroutine test2
+#------------------------------------------------------------------------------
 
-    
 
+if __name__ == '__main__':
+    
+    for par in ['T_2M', 'TMAX_2M', 'TMIN_2M', 'TOT_PREC']:
+        print(par, '- max differences (KGE, RMSD):', test1(par))
+        print(par, '- KGE_RMSD_grid (KGE, RMSD, CORR):', test2(par))
@@ -0,0 +1,797 @@
+# -*- coding: utf-8 -*-
+"""
+The NC_stream is the program for calculation of statistics directly from
+NetCDF files (COSMO-CLM, HYRAS) instead of cdo timmean, timstd, timcor and
+fldmean + cdo -outputtab/-outputts. The time dimension is read in chunks and
+all statistics are accumulated in one pass over the data (Welford/Chan
+updates for mean, variance and co-moment).
+
+The progam contains several subroutine:
+    get_var       ---> The subroutine needs for getting data variable from NetCDF
+    get_grid      ---> The subroutine needs for getting lon, lat of grid cells
+    get_time      ---> The subroutine needs for getting dates of time steps
+    moments       ---> The subroutine needs for moments of one chunk
+    merge         ---> The subroutine needs for merging of moments
+    stream_stat   ---> The subroutine needs for statistics of reference/model pair
+    stream_fldmean---> The subroutine needs for field mean of one file
+    stream_dav    ---> The subroutine needs for DAV of every grid cell
+    NC_analysis   ---> The subroutine needs for KGE, RMSD, CORR and DAV analysis
+    NC_labels     ---> The subroutine needs for KGE, RMSD, CORR and DAV of labels
+    make_test_nc  ---> The subroutine needs for synthetic NetCDF files (tests)
+    test1         ---> The subroutine needs for comparison with full arrays
+    test2         ---> The subroutine needs for comparison of DAV of cells
+    test3         ---> The subroutine needs for comparison of statistics of labels
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import numpy as np
+import pandas as pd
+import netCDF4
+import KGE_RMSD    as kge
+import DAV_metric  as dav
+import FIELD_store as fs
+import STAT_labels as sl
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_var
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for getting data variable from NetCDF file. If the
+# name is not given, the first variable with (time, y, x) dimensions is used.
+#
+# Input parameters : nc       - netCDF4.Dataset
+#                    var_name - the name of variable (optional)
+#
+#
+# Output parameters: var      - netCDF4.Variable
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_var(nc, var_name = None):
+    if var_name is not None:
+        return nc.variables[var_name]
+
+    for var in nc.variables.values():
+        if var.ndim == 3 and var.dimensions[0] == 'time':
+            return var
+
+    raise KeyError('No (time, y, x) variable in ' + nc.filepath())
+
+# end Subroutine get_var
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_grid
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for getting lon, lat of grid cells in the same order
+# as in cdo -outputtab (rows of y, x)
+#
+# Input parameters : nc  - netCDF4.Dataset
+#
+#
+# Output parameters: lon - longitude (float32 array)
+#                    lat - latitude  (float32 array)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_grid(nc):
+    lon = np.asarray(nc.variables['lon'][:], dtype = np.float32)
+    lat = np.asarray(nc.variables['lat'][:], dtype = np.float32)
+    if lon.ndim == 1:
+        lon, lat = np.meshgrid(lon, lat)
+
+    return lon.ravel(), lat.ravel()
+
+# end Subroutine get_grid
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_time
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for getting dates of time steps
+#
+# Input parameters : nc   - netCDF4.Dataset
+#
+#
+# Output parameters: date - dates (datetime64[D] array)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_time(nc):
+    time = nc.variables['time']
+    date = netCDF4.num2date(time[:], time.units,
+                            getattr(time, 'calendar', 'standard'),
+                            only_use_cftime_datetimes = False,
+                            only_use_python_datetimes = True)
+
+    return np.array(date, dtype = 'datetime64[D]')
+
+# end Subroutine get_time
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: moments
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for moments of one chunk (time, cells) for every cell.
+# Only valid (not nan) values are used, the co-moment is calculated for time
+# steps where both values are valid.
+#
+# Input parameters : x, y - data of the chunk (y is optional)
+#
+#
+# Output parameters: mom  - dictionary with moments: n, mean, m2 for x (and y)
+#                           and np, mx, my, m2x, m2y, cxy for pairs (x, y)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def moments(x, y = None):
+    mom = single_moments(x, '')
+    if y is None:
+        return mom
+    mom.update(single_moments(y, '_y'))
+
+    # Pairs: both values are valid
+    valid = ~(np.isnan(x) | np.isnan(y))
+    xp = np.where(valid, x, np.nan)
+    yp = np.where(valid, y, np.nan)
+    pair = single_moments(xp, 'x')
+    pair.update(single_moments(yp, 'y'))
+    mom['np' ] = pair['nx']
+    mom['mx' ] = pair['meanx']
+    mom['my' ] = pair['meany']
+    mom['m2x'] = pair['m2x']
+    mom['m2y'] = pair['m2y']
+    mom['cxy'] = np.nansum((xp - pair['meanx']) * (yp - pair['meany']), axis = 0)
+
+    return mom
+
+# end Subroutine moments
+#------------------------------------------------------------------------------
+
+
+def single_moments(x, sfx):
+    n = np.sum(~np.isnan(x), axis = 0).astype(np.float64)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        mean = np.where(n > 0, np.nansum(x, axis = 0) / n, 0.0)
+    m2 = np.nansum((x - mean)**2.0, axis = 0)
+
+    return {'n' + sfx : n, 'mean' + sfx : mean, 'm2' + sfx : m2}
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: merge
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for merging of moments of two chunks (Chan et al.,
+# 1979): for the cell with n = na + nb values
+#     mean = mean_a + d * nb / n,           d = mean_b - mean_a
+#     m2   = m2_a + m2_b + d**2 * na * nb / n
+#     cxy  = cxy_a + cxy_b + dx * dy * na * nb / n
+#
+# Input parameters : a, b - dictionaries with moments (see moments)
+#
+#
+# Output parameters: a    - merged moments (a is updated)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def merge(a, b):
+    if a is None:
+        return b
+
+    # Single moments: n, mean, m2 (x) and n_y, mean_y, m2_y (y)
+    for sfx in [s for s in ['', '_y'] if 'n' + s in a]:
+        na, nb = a['n' + sfx], b['n' + sfx]
+        n  = na + nb
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            f = np.where(n > 0, na * nb / n, 0.0)
+            d = b['mean' + sfx] - a['mean' + sfx]
+            a['mean' + sfx] = a['mean' + sfx] + np.where(n > 0, d * nb / n, 0.0)
+        a['m2'   + sfx] = a['m2' + sfx] + b['m2' + sfx] + d**2.0 * f
+        a['n'    + sfx] = n
+
+    # Pairs
+    if 'np' in a:
+        na, nb = a['np'], b['np']
+        n  = na + nb
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            f  = np.where(n > 0, na * nb / n, 0.0)
+            dx = b['mx'] - a['mx']
+            dy = b['my'] - a['my']
+            a['mx'] = a['mx'] + np.where(n > 0, dx * nb / n, 0.0)
+            a['my'] = a['my'] + np.where(n > 0, dy * nb / n, 0.0)
+        a['m2x'] = a['m2x'] + b['m2x'] + dx**2.0 * f
+        a['m2y'] = a['m2y'] + b['m2y'] + dy**2.0 * f
+        a['cxy'] = a['cxy'] + b['cxy'] + dx * dy * f
+        a['np' ] = n
+
+    return a
+
+# end Subroutine merge
+#------------------------------------------------------------------------------
+
+
+def fldmean(x, weights):
+    valid = ~np.isnan(x)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        return (np.where(valid, x, 0.0) @ weights) / (valid @ weights)
+
+
+def read_chunk(var, t0, t1, dtype = np.float64):
+    x = var[t0:t1]
+    x = np.ma.filled(np.ma.asarray(x, dtype = dtype), np.nan)
+
+    return x.reshape(x.shape[0], -1)
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: stream_stat
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for statistics of reference/model pair in one pass
+# over the time dimension (analogue of cdo timmean, timstd, timcor, fldmean).
+# The std is the population std (as cdo timstd). The field mean is weighted
+# by weights (cdo fldmean uses the grid cell area, e.g. cdo gridarea), by
+# default all cells have the same weight.
+#
+# Input parameters : path_obs - path for reference NetCDF file
+#                    path_mod - path for model NetCDF file
+#                    var_obs  - the name of reference variable (optional)
+#                    var_mod  - the name of model variable (optional)
+#                    chunk    - number of time steps in one chunk
+#                    weights  - weights of grid cells for field mean (optional)
+#
+#
+# Output parameters: stat     - dictionary with arrays:
+#                               lon, lat, mean_obs, std_obs, mean_mod,
+#                               std_mod, corr (grid cells)
+#                               date, fld_obs, fld_mod (time steps)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def stream_stat(path_obs, path_mod, var_obs = None, var_mod = None,
+                chunk = 365, weights = None):
+
+    with netCDF4.Dataset(path_obs) as nc_obs, netCDF4.Dataset(path_mod) as nc_mod:
+        v_obs = get_var(nc_obs, var_obs)
+        v_mod = get_var(nc_mod, var_mod)
+        if v_obs.shape != v_mod.shape:
+            raise ValueError('Different shapes: ' + str(v_obs.shape) + ' ' +
+                                                    str(v_mod.shape))
+        lon, lat = get_grid(nc_obs)
+        date     = get_time(nc_obs)
+
+        ntime = v_obs.shape[0]
+        if weights is None:
+            weights = np.ones(lon.size)
+
+        acc     = None
+        fld_obs = np.empty(ntime)
+        fld_mod = np.empty(ntime)
+        for t0 in range(0, ntime, chunk):
+            t1 = min(t0 + chunk, ntime)
+            x  = read_chunk(v_obs, t0, t1)
+            y  = read_chunk(v_mod, t0, t1)
+
+            acc = merge(acc, moments(x, y))
+            fld_obs[t0:t1] = fldmean(x, weights)
+            fld_mod[t0:t1] = fldmean(y, weights)
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        stat = {'lon'      : lon,
+                'lat'      : lat,
+                'mean_obs' : np.where(acc['n'  ] > 0, acc['mean'  ], np.nan),
+                'std_obs'  : np.sqrt(acc['m2'  ] / acc['n'  ]),
+                'mean_mod' : np.where(acc['n_y'] > 0, acc['mean_y'], np.nan),
+                'std_mod'  : np.sqrt(acc['m2_y'] / acc['n_y']),
+                'corr'     : acc['cxy'] / np.sqrt(acc['m2x'] * acc['m2y']),
+                'date'     : date,
+                'fld_obs'  : fld_obs,
+                'fld_mod'  : fld_mod}
+
+    return stat
+
+# end Subroutine stream_stat
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: stream_fldmean
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for field mean of one file (analogue of cdo fldmean)
+#
+# Input parameters : path    - path for NetCDF file
+#                    var     - the name of variable (optional)
+#                    chunk   - number of time steps in one chunk
+#                    weights - weights of grid cells (optional)
+#
+#
+# Output parameters: ts      - timeseries of field mean
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def stream_fldmean(path, var = None, chunk = 365, weights = None):
+
+    with netCDF4.Dataset(path) as nc:
+        v    = get_var(nc, var)
+        date = get_time(nc)
+        if weights is None:
+            weights = np.ones(int(np.prod(v.shape[1:])))
+
+        fld = np.empty(v.shape[0])
+        for t0 in range(0, v.shape[0], chunk):
+            t1 = min(t0 + chunk, v.shape[0])
+            fld[t0:t1] = fldmean(read_chunk(v, t0, t1), weights)
+
+    return pd.Series(fld, index = pd.DatetimeIndex(date, name = 'Date'))
+
+# end Subroutine stream_fldmean
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: stream_dav
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for DAV of every grid cell (map of added value) in one
+# pass over the time dimension: the PDFs (counts of bins) of all cells are
+# accumulated per chunk (see DAV_metric.get_pdf_cells), the files should have
+# the same grid and time steps. The values are read as float32 (the bins
+# are the same as for float64).
+#
+# Input parameters : path_obs - path for reference NetCDF file
+#                    path_lr  - path for low resolution NetCDF file
+#                    path_hr  - path for high resolution NetCDF file
+#                    par_name - the name of parameter (bins of PDF)
+#                    var_obs  - the name of reference variable (optional)
+#                    var_mod  - the name of model variable (optional)
+#                    chunk    - number of time steps in one chunk
+#                    store    - path for the field store or None (see
+#                               FIELD_store, the field DAV)
+#                    name     - the name of field data in the store
+#
+#
+# Output parameters: stat     - dictionary with arrays (grid cells):
+#                               lon, lat, dav
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def stream_dav(path_obs, path_lr, path_hr, par_name, var_obs = None,
+               var_mod = None, chunk = 365, store = None, name = None):
+
+    bins   = dav.get_bins(par_name)
+    counts = [None, None, None]
+    with netCDF4.Dataset(path_obs) as nc_obs, \
+         netCDF4.Dataset(path_lr ) as nc_lr , \
+         netCDF4.Dataset(path_hr ) as nc_hr :
+        v_obs = get_var(nc_obs, var_obs)
+        v_lr  = get_var(nc_lr , var_mod)
+        v_hr  = get_var(nc_hr , var_mod)
+        if not (v_obs.shape == v_lr.shape == v_hr.shape):
+            raise ValueError('Different shapes: ' + str(v_obs.shape) + ' ' +
+                             str(v_lr.shape) + ' ' + str(v_hr.shape))
+        lon, lat = get_grid(nc_obs)
+
+        ntime = v_obs.shape[0]
+        for t0 in range(0, ntime, chunk):
+            t1 = min(t0 + chunk, ntime)
+            for k, v in enumerate((v_obs, v_lr, v_hr)):
+                counts[k] = dav.get_pdf_cells(read_chunk(v, t0, t1, np.float32),
+                                              bins, counts[k])
+
+    stat = {'lon' : lon, 'lat' : lat, 'dav' : dav.DAV_counts(*counts)}
+
+    if store is not None:
+        data = fs.create(store, name, lon, lat, ['DAV'])
+        data['DAV'][:] = stat['dav']
+        fs.commit(store, name, data)
+
+    return stat
+
+# end Subroutine stream_dav
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: NC_analysis
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for KGE, RMSD, CORR and DAV analysis based on NetCDF
+# files. The arrays are used directly by KGE_RMSD and DAV_metric (no CDO
+# text output).
+#
+# Input parameters : path_obs - path for reference NetCDF file
+#                    path_lr  - path for low resolution NetCDF file (DAV)
+#                    path_hr  - path for model NetCDF file
+#                    par_name - the name of parameter
+#                    var_obs  - the name of reference variable (optional)
+#                    var_mod  - the name of model variable (optional)
+#                    chunk    - number of time steps in one chunk
+#
+#
+# Output parameters: kge_res, rmsd_res, cor_res, dav_res - statistics
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def NC_analysis(path_obs, path_lr, path_hr, par_name, var_obs = None,
+                var_mod = None, chunk = 365):
+
+    stat = stream_stat(path_obs, path_hr, var_obs, var_mod, chunk)
+
+    kge_res, rmsd_res, cor_res = kge.KGE_RMSD_arrays(
+        stat['lon'], stat['lat'], stat['mean_obs'], stat['std_obs'],
+        stat['mean_mod'], stat['std_mod'], stat['corr'], par_name)
+
+    index = pd.DatetimeIndex(stat['date'], name = 'Date')
+    ts_lr = stream_fldmean(path_lr, var_mod, chunk)
+    dav_res = dav.DAV_series(pd.Series(stat['fld_obs'], index = index), ts_lr,
+                             pd.Series(stat['fld_mod'], index = index),
+                             dav.get_bins(par_name))
+
+    return kge_res, rmsd_res, cor_res, dav_res
+
+# end Subroutine NC_analysis
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: NC_labels
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for KGE, RMSD, CORR and DAV of labels (stratified
+# analysis, see STAT_labels) in one pass over the NetCDF files: the moments
+# of cells and the PDFs of the label mean series are accumulated per chunk.
+# The label with all cells has the statistics of NC_analysis.
+#
+# Input parameters : path_obs - path for reference NetCDF file
+#                    path_lr  - path for low resolution NetCDF file (DAV)
+#                    path_hr  - path for model NetCDF file
+#                    par_name - the name of parameter
+#                    labels   - index of labels of grid cells (see
+#                               STAT_labels.get_labels, read_labels)
+#                    var_obs  - the name of reference variable (optional)
+#                    var_mod  - the name of model variable (optional)
+#                    chunk    - number of time steps in one chunk
+#                    weights  - weights of grid cells for label means
+#                               (optional)
+#
+#
+# Output parameters: table    - DataFrame (rows: labels, columns: KGE, RMSD,
+#                               CORR, CELLS, DAV)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def NC_labels(path_obs, path_lr, path_hr, par_name, labels, var_obs = None,
+              var_mod = None, chunk = 365, weights = None):
+
+    bins   = dav.get_bins(par_name)
+    counts = [None, None, None]
+    acc    = None
+    with netCDF4.Dataset(path_obs) as nc_obs, \
+         netCDF4.Dataset(path_lr ) as nc_lr , \
+         netCDF4.Dataset(path_hr ) as nc_hr :
+        v_obs = get_var(nc_obs, var_obs)
+        v_lr  = get_var(nc_lr , var_mod)
+        v_hr  = get_var(nc_hr , var_mod)
+        if not (v_obs.shape == v_lr.shape == v_hr.shape):
+            raise ValueError('Different shapes: ' + str(v_obs.shape) + ' ' +
+                             str(v_lr.shape) + ' ' + str(v_hr.shape))
+        lon, lat = get_grid(nc_obs)
+
+        ntime = v_obs.shape[0]
+        for t0 in range(0, ntime, chunk):
+            t1 = min(t0 + chunk, ntime)
+            x  = read_chunk(v_obs, t0, t1)
+            y  = read_chunk(v_hr , t0, t1)
+            acc = merge(acc, moments(x, y))
+            for k, data in enumerate((x, read_chunk(v_lr, t0, t1), y)):
+                counts[k] = dav.get_pdf_cells(sl.label_means(labels, data, weights),
+                                              bins, counts[k])
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        corr = acc['cxy'] / np.sqrt(acc['m2x'] * acc['m2y'])
+        kge_f, rmsd_f = kge.KGE_RMSD_grid(
+            lon, lat,
+            np.where(acc['n'  ] > 0, acc['mean'  ], np.nan),
+            np.sqrt(acc['m2'  ] / acc['n'  ]),
+            np.where(acc['n_y'] > 0, acc['mean_y'], np.nan),
+            np.sqrt(acc['m2_y'] / acc['n_y']),
+            corr, np.empty(lon.size), np.empty(lon.size))[:2]
+
+    stat = sl.KGE_RMSD_labels(labels, kge_f, rmsd_f, corr)
+    stat['DAV'] = dav.DAV_counts(*counts).astype(np.float64)
+
+    return sl.get_table(labels, stat)
+
+# end Subroutine NC_labels
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: make_test_nc
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for synthetic NetCDF files (daily data on a small
+# rotated grid with missing values) for tests
+#
+# Input parameters : path   - path for NetCDF file
+#                    ntime  - number of days
+#                    ny, nx - size of grid
+#                    seed   - seed for random numbers
+#                    shift  - shift of values (model bias)
+#                    var    - the name of variable
+#
+#
+# Output parameters: data   - the written data (time, ny, nx), nan - missing
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def make_test_nc(path, ntime = 400, ny = 6, nx = 8, seed = 1, shift = 0.0,
+                 var = 'T_2M'):
+
+    # Annual cycle + noise, the same for all files (seed 0) + own noise
+    day   = np.arange(ntime)
+    cycle = 10.0 - 10.0 * np.cos(2.0 * np.pi * day / 365.25)
+    base  = np.random.default_rng(0).normal(0.0, 3.0, (ntime, ny, nx))
+    noise = np.random.default_rng(seed).normal(0.0, 1.0, (ntime, ny, nx))
+    data  = cycle[:, None, None] + base + noise + shift
+
+    # Missing values: the corner of domain and some days in one cell
+    data[:, 0, 0] = np.nan
+    data[::7, 1, 1] = np.nan
+
+    with netCDF4.Dataset(path, 'w') as nc:
+        nc.createDimension('time', None)
+        nc.createDimension('rlat', ny)
+        nc.createDimension('rlon', nx)
+        time = nc.createVariable('time', 'f8', ('time',))
+        time.units    = 'days since 2002-01-01 00:00:00'
+        time.calendar = 'proleptic_gregorian'
+        time[:] = day
+        lon = nc.createVariable('lon', 'f4', ('rlat', 'rlon'))
+        lat = nc.createVariable('lat', 'f4', ('rlat', 'rlon'))
+        lon[:], lat[:] = np.meshgrid(6.0 + 0.04 * np.arange(nx),
+                                     47.0 + 0.03 * np.arange(ny))
+        v = nc.createVariable(var, 'f4', ('time', 'rlat', 'rlon'),
+                              fill_value = -999.0)
+        v[:] = np.ma.masked_invalid(data)
+
+    return data.astype(np.float32).astype(np.float64)
+
+# end Subroutine make_test_nc
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of stream_stat (chunks) with the
+# statistics of full arrays (synthetic NetCDF files)
+#
+# Input parameters : chunk    - number of time steps in one chunk
+#
+#
+# Output parameters: max_diff - maximal absolute differences of statistics
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(chunk = 30):
+
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        x = make_test_nc(os.path.join(tmp, 'obs.nc'), seed = 1)
+        y = make_test_nc(os.path.join(tmp, 'mod.nc'), seed = 2, shift = 0.5)
+        stat = stream_stat(os.path.join(tmp, 'obs.nc'),
+                           os.path.join(tmp, 'mod.nc'), chunk = chunk)
+
+    x = x.reshape(x.shape[0], -1)
+    y = y.reshape(y.shape[0], -1)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    corr  = np.full(x.shape[1], np.nan)
+    for cell in range(x.shape[1]):
+        if valid[:, cell].sum() > 1:
+            corr[cell] = np.corrcoef(x[valid[:, cell], cell],
+                                     y[valid[:, cell], cell])[0, 1]
+
+    with np.errstate(invalid = 'ignore'):
+        ref = {'mean_obs' : np.nanmean(x, axis = 0),
+               'std_obs'  : np.nanstd (x, axis = 0),
+               'mean_mod' : np.nanmean(y, axis = 0),
+               'std_mod'  : np.nanstd (y, axis = 0),
+               'corr'     : corr,
+               'fld_obs'  : np.nanmean(x, axis = 1),
+               'fld_mod'  : np.nanmean(y, axis = 1)}
+
+    max_diff = {}
+    for name, arr in ref.items():
+        assert np.allclose(stat[name], arr, rtol = 1e-9, atol = 1e-9,
+                           equal_nan = True), name
+        max_diff[name] = np.nanmax(np.abs(stat[name] - arr))
+
+    return max_diff
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test2
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of stream_dav (chunks) with DAV of
+# every grid cell (DAV_series of one cell, synthetic NetCDF files)
+#
+# Input parameters : chunk    - number of time steps in one chunk
+#
+#
+# Output parameters: max_diff - maximal absolute difference of DAV
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test2(chunk = 30):
+
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f) for f in ['obs.nc', 'lr.nc', 'hr.nc']]
+        x  = make_test_nc(paths[0], seed = 1)
+        lr = make_test_nc(paths[1], seed = 2, shift = 1.5)
+        hr = make_test_nc(paths[2], seed = 3, shift = 0.5)
+        stat = stream_dav(*paths, 'T_2M', chunk = chunk)
+
+    index = pd.date_range('2002-01-01', periods = len(x), name = 'Date')
+    x, lr, hr = [a.reshape(len(a), -1) for a in (x, lr, hr)]
+    ref = np.full(x.shape[1], np.nan)
+    for cell in range(x.shape[1]):
+        if np.isnan(x[:, cell]).all():
+            continue
+        ref[cell] = dav.DAV_series(pd.Series(x [:, cell], index = index),
+                                   pd.Series(lr[:, cell], index = index),
+                                   pd.Series(hr[:, cell], index = index))
+
+    assert np.allclose(stat['dav'], ref, rtol = 1e-6, atol = 1e-7,
+                       equal_nan = True)
+    assert np.allclose(dav.DAV_grid(x, lr, hr, chunk = chunk), ref,
+                       rtol = 1e-6, atol = 1e-7, equal_nan = True)
+
+    return np.nanmax(np.abs(stat['dav'] - ref))
+
+# end Subroutine test2
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test3
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of NC_labels with NC_analysis (one
+# label with all cells) and with DAV of the label mean series (labels of
+# columns of grid, synthetic NetCDF files)
+#
+# Input parameters : chunk    - number of time steps in one chunk
+#
+#
+# Output parameters: table    - statistics of labels
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test3(chunk = 30):
+
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f) for f in ['obs.nc', 'lr.nc', 'hr.nc']]
+        x  = make_test_nc(paths[0], seed = 1)
+        lr = make_test_nc(paths[1], seed = 2, shift = 1.5)
+        hr = make_test_nc(paths[2], seed = 3, shift = 0.5)
+
+        ncell = x[0].size
+        ref   = NC_analysis(*paths, 'T_2M', chunk = chunk)
+        one   = NC_labels(*paths, 'T_2M', sl.get_labels(np.zeros(ncell)),
+                          chunk = chunk)
+        labels = sl.get_labels(np.arange(ncell) % x.shape[2] // 3)
+        table  = NC_labels(*paths, 'T_2M', labels, chunk = chunk)
+
+    assert np.allclose(one.loc['0', ['KGE', 'RMSD', 'CORR', 'DAV']], ref)
+
+    index = pd.date_range('2002-01-01', periods = len(x), name = 'Date')
+    x, lr, hr = [a.reshape(len(a), -1) for a in (x, lr, hr)]
+    for k, name in enumerate(labels['names']):
+        mask = labels['codes'] == k
+        ts   = [pd.Series(np.nanmean(a[:, mask], axis = 1), index = index)
+                for a in (x, lr, hr)]
+        assert np.isclose(table.loc[name, 'DAV'], dav.DAV_series(*ts))
+
+    return table
+
+# end Subroutine test3
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    for chunk in [1, 30, 365, 1000]:
+        print('chunk', chunk, '- max differences:', test1(chunk))
+        print('chunk', chunk, '- max difference of DAV:', test2(chunk))
+    print(test3())
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_boot is the program for bootstrap confidence intervals of the
+statistics (KGE, RMSD, CORR - resampling of grid cells, DAV - resampling of
+days). All statistics are ratios of sums over the rows (cells or days), so
+the sums of all resamples are calculated as one matrix product:
+    sums = counts @ values
+where counts[b, i] is the number of times the row i is in the resample b.
+The rows of resamples are drawn in blocks of BLOCK resamples: every block has
+own random numbers (SeedSequence.spawn), the rows of all resamples of the
+block are drawn in one call (BLOCK x rows). The resamples are calculated in
+batches of whole blocks (BATCH rows x resamples), so the results do not
+depend on the number of processes and on the size of batches.
+
+The progam contains several subroutine:
+    get_seed      ---> The subroutine needs for the seed of one task
+    batch_sums    ---> The subroutine needs for sums of one batch of resamples
+    resample_sums ---> The subroutine needs for sums of all resamples
+    get_ci        ---> The subroutine needs for confidence intervals
+    test1         ---> The subroutine needs for comparison with loop bootstrap
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import zlib
+import warnings
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Maximal number of elements of counts matrix in one batch (resamples x rows)
+BATCH = 1 << 22
+
+# Number of resamples with the same random numbers (one Generator), the
+# results depend on this number
+BLOCK = 64
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_seed
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the seed of one task: the seed of run and the name
+# of task (e.g. hyras_GC_T_2M), so every task has own random numbers
+# independent of the order of tasks
+#
+# Input parameters : seed - seed of run (int)
+#                    name - the name of task
+#
+#
+# Output parameters: seq  - numpy.random.SeedSequence
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_seed(seed, name):
+    return np.random.SeedSequence([seed, zlib.crc32(name.encode())])
+
+# end Subroutine get_seed
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: batch_sums
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for sums of one batch of resamples: the rows of every
+# block of BLOCK resamples are drawn in one call of its Generator
+#
+# Input parameters : values - array (rows, k)
+#                    seqs   - SeedSequences of blocks of the batch
+#                    n_boot - number of resamples of the batch
+#
+#
+# Output parameters: sums   - array (resamples, k)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def batch_sums(values, seqs, n_boot):
+    rows = len(values)
+
+    # Rows of resamples (own random numbers of every block)
+    idx = np.empty((n_boot, rows), dtype = np.int64)
+    for k, seq in enumerate(seqs):
+        b0, b1 = k * BLOCK, min((k + 1) * BLOCK, n_boot)
+        idx[b0:b1] = np.random.default_rng(seq).integers(0, rows, (b1 - b0, rows))
+
+    # Numbers of rows in resamples (one bincount for all resamples)
+    idx   += np.arange(n_boot)[:, None] * rows
+    counts = np.bincount(idx.ravel(), minlength = n_boot * rows)
+
+    return counts.reshape(n_boot, rows).astype(np.float64) @ values
+
+# end Subroutine batch_sums
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: resample_sums
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for sums of values over all bootstrap resamples of
+# rows
+#
+# Input parameters : values  - array (rows, k), NaN values are not allowed
+#                    n_boot  - number of resamples
+#                    seed    - seed (int or SeedSequence, see get_seed)
+#                    workers - number of processes
+#
+#
+# Output parameters: sums    - array (n_boot, k)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def resample_sums(values, n_boot, seed = None, workers = 1):
+    values = np.asarray(values, dtype = np.float64)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    if len(values) == 0:
+        return np.zeros((n_boot, values.shape[1]))
+
+    # Blocks of resamples, batches of whole blocks
+    nblk  = -(-n_boot // BLOCK)
+    size  = max(1, BATCH // (BLOCK * len(values)))
+    blks  = seed.spawn(nblk)
+    seqs  = [blks[k:k + size] for k in range(0, nblk, size)]
+    nums  = [min(n_boot - k * BLOCK, size * BLOCK) for k in range(0, nblk, size)]
+
+    if workers > 1 and len(seqs) > 1:
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            sums = list(pool.map(batch_sums, [values] * len(seqs), seqs, nums))
+    else:
+        sums = [batch_sums(values, seq, num) for seq, num in zip(seqs, nums)]
+
+    return np.concatenate(sums)
+
+# end Subroutine resample_sums
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_ci
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for confidence intervals (percentile method)
+#
+# Input parameters : stats  - statistics of resamples (n_boot, k)
+#                    level  - confidence level (e.g. 0.95)
+#
+#
+# Output parameters: lo, hi - lower and upper limits (k values)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_ci(stats, level = 0.95):
+    q = 50.0 * (1.0 - level)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)   # All-NaN columns
+        lo, hi = np.nanpercentile(stats, [q, 100.0 - q], axis = 0)
+
+    return lo, hi
+
+# end Subroutine get_ci
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of the bootstrap (counts @ values) with
+# the loop over resamples (the same random numbers of resamples): sums with
+# 1 and 2 processes and different sizes of batches, intervals of mean values,
+# KGE_RMSD_bootstrap and DAV_bootstrap (small random arrays)
+#
+# Input parameters : rows   - number of rows (cells, days)
+#                    n_boot - number of resamples
+#
+#
+# Output parameters: ci     - intervals of KGE, RMSD, CORR and DAV
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(rows = 50, n_boot = 150):
+
+    global BATCH
+    import pandas as pd
+    import KGE_RMSD   as kge
+    import DAV_metric as dav
+
+    rng    = np.random.default_rng(1)
+    values = rng.normal(0.0, 1.0, (rows, 3))
+
+    # Loop over resamples: rows of resample b from the block of resample b
+    def loop(seed, rows, n_boot):
+        seqs = get_seed(seed, 'test').spawn(-(-n_boot // BLOCK))
+        idx  = [np.random.default_rng(seq).integers(
+                    0, rows, (min(BLOCK, n_boot - k * BLOCK), rows))
+                for k, seq in enumerate(seqs)]
+        return list(np.concatenate(idx))
+
+    idx = loop(1, rows, n_boot)
+    ref = np.array([values[i].sum(axis = 0) for i in idx])
+
+    # Processes and batches (BATCH: 1, 2 and all blocks in one batch)
+    batch = BATCH
+    try:
+        for BATCH in [BLOCK * rows, 2 * BLOCK * rows, batch]:
+            for workers in [1, 2]:
+                sums = resample_sums(values, n_boot, get_seed(1, 'test'),
+                                     workers)
+                assert np.allclose(sums, ref, rtol = 1e-12, atol = 1e-12)
+    finally:
+        BATCH = batch
+
+    # Intervals of mean values
+    lo, hi = get_ci(resample_sums(values, n_boot, get_seed(1, 'test')) / rows)
+    assert np.allclose([lo, hi], np.percentile(ref / rows, [2.5, 97.5], axis = 0))
+
+    # KGE, RMSD, CORR: valid cells (RMSD), KGE outliers are NaN
+    field = rng.normal(0.5, 0.3, (3, rows))
+    field[0, ::7] = np.nan
+    field[1, ::11] = np.nan
+    ci    = kge.KGE_RMSD_bootstrap(field[0], field[1], field[2], n_boot,
+                                   get_seed(1, 'test'))
+    valid = ~np.isnan(field[1])
+    cells = field[:, valid]
+    stats = np.array([[np.nanmean(cells[0, i]), cells[1, i].mean(),
+                       cells[2, i].mean()] for i in loop(1, valid.sum(), n_boot)])
+    lo, hi = np.percentile(stats, [2.5, 97.5], axis = 0)
+    for k, metric in enumerate(['KGE', 'RMSD', 'CORR']):
+        assert np.allclose(ci[metric], (lo[k], hi[k])), metric
+
+    # DAV: the same days of all timeseries
+    bins  = dav.get_bins('T_2M')
+    index = pd.date_range('2002-01-01', periods = rows, name = 'Date')
+    ts    = [pd.Series(rng.normal(10.0, 8.0, rows), index = index)
+             for k in range(3)]
+    ts[1][::9] = np.nan
+    ci['DAV'] = dav.DAV_bootstrap(*ts, bins, n_boot, get_seed(1, 'test'))
+    stats = []
+    for i in loop(1, rows, n_boot):
+        pdf = [dav.get_pdf(t.to_numpy()[i], bins, norm = True) for t in ts]
+        stats.append(dav.DAV_metric(pdf[2], pdf[1], pdf[0]))
+    assert np.allclose(ci['DAV'], np.percentile(stats, [2.5, 97.5]))
+
+    return ci
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    print(test1())
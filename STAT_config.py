@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_config is the program for reading of run specification (TOML file)
+of STAT_project. The specification describes the reference dataset, model
+datasets, parameters, file name templates and output folder, see config/.
+
+The file name templates are paths relative to mf_com with the fields:
+    {refer} - the name of reference dataset
+    {ds}    - the name of model dataset
+    {par}   - the name of parameter
+
+Several reference datasets can be evaluated in one run (refer is a list).
+The table [references.<refer>] can replace the datasets and file name
+templates (e.g. mean_obs, corr, dav_lr) for one reference dataset:
+    refer = ["hyras", "LU_GC"]
+    [references.LU_GC]
+    datasets = ["E2015", "E38", "E", "G", "ECO"]
+    [references.LU_GC.files]
+    mean_obs = "DATA/GC/{refer}_{par}_mean_obs.csv"
+The model files of (dataset, parameter) are read once for all references
+(see STAT_runner.run_tasks).
+
+The table [pairs] describes the pairwise comparison of model datasets
+(STAT_project.py --pairs, see STAT_pairs): NetCDF files of daily data with
+the fields {ds}, {par}, the name of variable (optional, field {par}) and the
+number of days in one chunk:
+    [pairs]
+    datasets = ["E2015", "E38", "E", "G", "GC", "ECO"]
+    files    = "NC/{ds}/{ds}_{par}.nc"
+    var      = "{par}"
+    chunk    = 31
+
+The table [labels] describes the stratified statistics (STAT_project.py
+--labels, see STAT_labels): KGE, RMSD and CORR for every label of a label
+grid (cdo -outputtab file, path relative to mf_com) from the fields of the
+tasks. The labels are the values of the grid (names are optional), the
+transitions of classes to the second map (to) or bands of values (edges):
+    [labels]
+    file  = "DATA/LABELS/landuse_2000.csv"
+    to    = "DATA/LABELS/landuse_2015.csv"
+    [labels.names]
+    "10" = "cropland"
+    "19" = "urban"
+
+The progam contains several subroutine:
+    read_config   ---> The subroutine needs for reading of run specification
+    get_tasks     ---> The subroutine needs for tasks of (dataset, parameter)
+    get_pairs     ---> The subroutine needs for pairwise comparisons of datasets
+    test1         ---> The subroutine needs for test of shipped specifications
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+
+try:
+    import tomllib
+except ImportError:                     # Python < 3.11
+    import tomli as tomllib
+
+
+# Default settings of bootstrap confidence intervals (see STAT_boot):
+# number of resamples (0 - no intervals), confidence level, seed, processes
+BOOTSTRAP = {'samples' : 0, 'level' : 0.95, 'seed' : 1, 'workers' : 1}
+
+# File name templates of the task (KGE, RMSD, CORR and DAV)
+FILES = ['mean_obs', 'std_obs', 'mean_mod', 'std_mod', 'corr',
+         'dav_obs' , 'dav_lr' , 'dav_hr']
+
+
+#------------------------------------------------------------------------------
+# Subroutine: read_config
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for reading of run specification (TOML file)
+#
+# Input parameters : path - path for TOML file
+#
+#
+# Output parameters: spec - dictionary with run specification:
+#                           mf_com, path_exit, path_store, path_fields,
+#                           path_grid, workers, prefetch, excel, refer,
+#                           datasets, parameters, files, bootstrap,
+#                           references (dictionary:
+#                           reference --> datasets, files), pairs
+#                           (datasets, files, var, chunk or None), labels
+#                           (file, to, edges, names or None)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def read_config(path):
+    with open(path, 'rb') as f:
+        spec = tomllib.load(f)
+
+    for key in ['mf_com', 'refer', 'datasets', 'parameters', 'files']:
+        if key not in spec:
+            raise KeyError('No "' + key + '" in ' + path)
+    # Reference datasets: datasets and files of reference (or of run)
+    refs = spec['refer'] if isinstance(spec['refer'], list) else [spec['refer']]
+    conf = spec.get('references', {})
+    spec['references'] = {}
+    for refer in refs:
+        ref = conf.get(refer, {})
+        spec['references'][refer] = {
+            'datasets' : ref.get('datasets', spec['datasets']),
+            'files'    : dict(spec['files'], **ref.get('files', {}))}
+        for key in FILES:
+            if key not in spec['references'][refer]['files']:
+                raise KeyError('No "files.' + key + '" in ' + path)
+
+    spec.setdefault('path_exit' , 'RESULT/')
+    spec.setdefault('path_store' , spec['path_exit'] + 'store/')
+    spec.setdefault('path_fields', spec['path_exit'] + 'fields/')
+    spec.setdefault('path_grid'  , spec['path_exit'] + 'grid/')
+    spec.setdefault('workers'    , 1)
+    spec.setdefault('prefetch'   , 1)
+    spec.setdefault('excel'      , True)
+    spec['bootstrap'] = dict(BOOTSTRAP, **spec.get('bootstrap', {}))
+    if 'pairs' in spec:
+        if 'files' not in spec['pairs']:
+            raise KeyError('No "pairs.files" in ' + path)
+        spec['pairs'] = dict({'datasets' : spec['datasets'], 'var' : None,
+                              'chunk'    : 31}, **spec['pairs'])
+    else:
+        spec['pairs'] = None
+    if 'labels' in spec:
+        if 'file' not in spec['labels']:
+            raise KeyError('No "labels.file" in ' + path)
+        labels = dict({'to' : None, 'edges' : None}, **spec['labels'])
+        if labels['to'] is not None and labels['edges'] is not None:
+            raise ValueError('"labels.to" and "labels.edges" in ' + path)
+        labels['file'] = os.path.join(spec['mf_com'], labels['file'])
+        if labels['to'] is not None:
+            labels['to'] = os.path.join(spec['mf_com'], labels['to'])
+        # Values of label grid: keys of TOML tables are strings
+        labels['names'] = {float(value) : name for value, name
+                           in labels.get('names', {}).items()}
+        spec['labels'] = labels
+    else:
+        spec['labels'] = None
+    spec['path_exit' ] = os.path.join(spec['mf_com'], spec['path_exit' ])
+    spec['path_store'] = os.path.join(spec['mf_com'], spec['path_store'])
+    # Empty path: the fields of KGE and RMSD are not saved
+    if spec['path_fields']:
+        spec['path_fields'] = os.path.join(spec['mf_com'], spec['path_fields'])
+    # Empty path: the indexes of grids are not saved
+    if spec['path_grid']:
+        spec['path_grid'] = os.path.join(spec['mf_com'], spec['path_grid'])
+
+    return spec
+
+# end Subroutine read_config
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_tasks
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for tasks of all (reference, dataset, parameter)
+# combinations. The order of tasks: references, datasets, then parameters
+# (the order of Statistic.xlsx)
+#
+# Input parameters : spec  - run specification (see read_config)
+#
+#
+# Output parameters: tasks - list of tasks (dictionary): ds, par, refer,
+#                            paths (input files), store (folder for results,
+#                            see STAT_store), fields (folder for KGE and RMSD
+#                            fields or '', see FIELD_store), bootstrap
+#                            (settings of confidence intervals)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_tasks(spec):
+    tasks = []
+    for refer, ref in spec['references'].items():
+        for ds in ref['datasets']:
+            for par in spec['parameters']:
+                names = {'refer' : refer, 'ds' : ds, 'par' : par}
+                paths = {}
+                for key in FILES:
+                    paths[key] = os.path.join(spec['mf_com'],
+                                              ref['files'][key].format(**names))
+                tasks.append({'ds'        : ds,
+                              'par'       : par,
+                              'refer'     : refer,
+                              'paths'     : paths,
+                              'store'     : spec['path_store'],
+                              'fields'    : spec['path_fields'],
+                              'grid'      : spec['path_grid'],
+                              'bootstrap' : spec['bootstrap']})
+
+    return tasks
+
+# end Subroutine get_tasks
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_pairs
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for pairwise comparisons of model datasets: one
+# comparison (all pairs of datasets) per parameter
+#
+# Input parameters : spec  - run specification (see read_config)
+#
+#
+# Output parameters: pairs - list of comparisons (dictionary): par, names
+#                            (datasets), paths (NetCDF files), var, chunk
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_pairs(spec):
+    if spec['pairs'] is None:
+        raise KeyError('No [pairs] in the run specification')
+
+    conf  = spec['pairs']
+    pairs = []
+    for par in spec['parameters']:
+        pairs.append({'par'   : par,
+                      'names' : list(conf['datasets']),
+                      'paths' : [os.path.join(spec['mf_com'],
+                                              conf['files'].format(ds = ds, par = par))
+                                 for ds in conf['datasets']],
+                      'var'   : conf['var'].format(par = par) if conf['var'] else None,
+                      'chunk' : conf['chunk']})
+
+    return pairs
+
+# end Subroutine get_pairs
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of shipped specifications (config/): all
+# files are expanded to tasks (pairs, labels), the tasks of ALL_refer.toml and
+# their paths (relative to mf_com) are the union of the tasks of single
+# references (GC_refer.toml, G_refer.toml, HYRAS_refer.toml)
+#
+# Input parameters : folder - folder with specifications (default: config/)
+#
+#
+# Output parameters: count  - number of tasks of specifications
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(folder = None):
+
+    if folder is None:
+        folder = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'config')
+
+    # Tasks: (refer, ds, par, paths relative to mf_com)
+    tasks = {}
+    count = {}
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith('.toml'):
+            continue
+        spec = read_config(os.path.join(folder, name))
+        rows = set()
+        for task in get_tasks(spec):
+            assert sorted(task['paths']) == sorted(FILES), name
+            paths = tuple((key, os.path.relpath(path, spec['mf_com']))
+                          for key, path in sorted(task['paths'].items()))
+            rows.add((task['refer'], task['ds'], task['par'], paths))
+        assert len(rows) == len(get_tasks(spec)), name
+        if spec['pairs'] is not None:
+            assert len(get_pairs(spec)) == len(spec['parameters']), name
+        if spec['labels'] is not None:
+            assert spec['labels']['file'].startswith(spec['mf_com']), name
+        tasks[name] = rows
+        count[name] = len(rows)
+
+    union = tasks['GC_refer.toml'] | tasks['G_refer.toml'] | tasks['HYRAS_refer.toml']
+    assert tasks['ALL_refer.toml'] == union, sorted(tasks['ALL_refer.toml'] ^ union)
+
+    return count
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    print('Tasks of specifications:', test1())
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_ensemble is the program for ensemble statistics of the land cover
+experiments (model datasets) per grid cell: the fields of tasks (KGE, RMSD,
+BIAS, see FIELD_store) of one reference and parameter are stacked into one
+contiguous float32 array (dataset, cell), the statistics are reductions
+along the dataset axis:
+    mean, spread (std), min, max, range - e.g. spread of KGE or range of
+                                          bias: uncertainty due to land cover
+    rank                                - rank of datasets in every cell
+                                          (1 - the best KGE, |RMSD|, |BIAS|)
+The maps are saved to the field store (<refer>_ENS_<par>, fields
+<FIELD>_<statistic>), the ranks of datasets to Ensemble.csv.
+
+The progam contains several subroutine:
+    stack         ---> The subroutine needs for stacked fields of datasets
+    ensemble      ---> The subroutine needs for ensemble statistics of cells
+    rank          ---> The subroutine needs for ranks of datasets in cells
+    rank_table    ---> The subroutine needs for the table of ranks of datasets
+    run_ensemble  ---> The subroutine needs for ensemble statistics of run
+    test1         ---> The subroutine needs for comparison with loop over cells
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import numpy as np
+import pandas as pd
+import FIELD_store as fs
+import GRID_index  as gi
+
+
+# Ensemble statistics of cells (see ensemble)
+STATS = ['mean', 'spread', 'min', 'max', 'range']
+
+# Score of ranks (the smallest score - rank 1)
+SCORE = {'KGE'  : lambda x: -x,
+         'RMSD' : np.abs,
+         'BIAS' : np.abs}
+
+
+#------------------------------------------------------------------------------
+# Subroutine: stack
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for stacked fields of datasets: one contiguous float32
+# array (dataset, cell) per field. The fields on other grids are aligned to
+# the grid of the first dataset (see GRID_index).
+#
+# Input parameters : store  - path for the field store (see FIELD_store)
+#                    names  - the names of field data of datasets
+#                    fields - the names of fields
+#
+#
+# Output parameters: lon, lat - coordinates of grid cells
+#                    data     - dictionary: field --> array (dataset, cell)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def stack(store, names, fields = fs.FIELDS):
+    lon, lat, first = fs.load(store, names[0])
+    grid = gi.get_index(lon, lat)
+    data = {field : np.empty((len(names), len(lon)), dtype = np.float32)
+            for field in fields}
+    for k, name in enumerate(names):
+        lon_k, lat_k, arr = (lon, lat, first) if k == 0 else fs.load(store, name)
+        for field in fields:
+            data[field][k] = gi.align(grid, lon_k, lat_k, arr[field], name)
+
+    return lon, lat, data
+
+# end Subroutine stack
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: ensemble
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for ensemble statistics of cells (reductions along the
+# dataset axis, nan values are not used, the sums are float64)
+#
+# Input parameters : arr  - stacked field (dataset, cell)
+#
+#
+# Output parameters: stat - dictionary: mean, spread (population std), min,
+#                           max, range (float32), count (number of datasets)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def ensemble(arr):
+    valid = ~np.isnan(arr)
+    count = valid.sum(axis = 0)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        mean = np.nansum(arr, axis = 0, dtype = np.float64) / count
+        var  = np.nansum((arr - mean)**2.0, axis = 0, dtype = np.float64) / count
+    # fmin, fmax: nan values are not used (nan - no valid datasets)
+    vmin = np.fmin.reduce(arr, axis = 0)
+    vmax = np.fmax.reduce(arr, axis = 0)
+
+    return {'mean'   : mean.astype(np.float32),
+            'spread' : np.sqrt(var).astype(np.float32),
+            'min'    : vmin,
+            'max'    : vmax,
+            'range'  : vmax - vmin,
+            'count'  : count}
+
+# end Subroutine ensemble
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: rank
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for ranks of datasets in every cell: 1 - the smallest
+# score (see SCORE), 0 - no value
+#
+# Input parameters : arr   - stacked field (dataset, cell)
+#                    field - the name of field (score of ranks)
+#
+#
+# Output parameters: ranks - ranks (dataset, cell), int16
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def rank(arr, field):
+    score = SCORE.get(field, lambda x: x)(arr)
+    score = np.where(np.isnan(score), np.inf, score)
+    order = np.argsort(score, axis = 0, kind = 'stable')
+
+    ranks = np.empty(arr.shape, dtype = np.int16)
+    np.put_along_axis(ranks, order,
+                      np.arange(1, arr.shape[0] + 1, dtype = np.int16)[:, None],
+                      axis = 0)
+    ranks[np.isnan(arr)] = 0
+
+    return ranks
+
+# end Subroutine rank
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: rank_table
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the table of ranks of datasets: mean rank and the
+# part of cells with rank 1 (cells with values)
+#
+# Input parameters : ranks - ranks (dataset, cell), see rank
+#                    names - the names of datasets
+#
+#
+# Output parameters: table - DataFrame (rows: datasets, columns: mean_rank,
+#                            best)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def rank_table(ranks, names):
+    valid = ranks > 0
+    cnt   = np.maximum(valid.sum(axis = 1), 1)
+
+    return pd.DataFrame({'mean_rank' : ranks.sum(axis = 1) / cnt,
+                         'best'      : (ranks == 1).sum(axis = 1) / cnt},
+                        index = pd.Index(names, name = 'dataset'))
+
+# end Subroutine rank_table
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: run_ensemble
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for ensemble statistics of run: for every reference
+# and parameter with several datasets the fields of tasks are stacked once,
+# the maps of statistics are saved to the field store and the ranks of
+# datasets to Ensemble.csv
+#
+# Input parameters : spec  - run specification (see STAT_config)
+#                    tasks - list of tasks (see STAT_config.get_tasks)
+#
+#
+# Output parameters: table - DataFrame: reference, parameter, field,
+#                            dataset, mean_rank, best
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def run_ensemble(spec, tasks):
+    store  = spec['path_fields']
+    groups = {}
+    for task in tasks:
+        groups.setdefault((task['refer'], task['par']), []).append(task['ds'])
+
+    tables = []
+    for (refer, par), datasets in groups.items():
+        if len(datasets) < 2:
+            continue
+        lon, lat, data = stack(store, [refer + '_' + ds + '_' + par
+                                       for ds in datasets])
+
+        name = refer + '_ENS_' + par
+        maps = fs.create(store, name, lon, lat,
+                         [f + '_' + s for f in data for s in STATS])
+        for field, arr in data.items():
+            stat = ensemble(arr)
+            for s in STATS:
+                maps[field + '_' + s][:] = stat[s]
+            table = rank_table(rank(arr, field), datasets).reset_index()
+            table.insert(0, 'field', field)
+            table.insert(0, 'parameter', par)
+            table.insert(0, 'reference', refer)
+            tables.append(table)
+        fs.commit(store, name, maps)
+
+    if not tables:
+        return None
+    table = pd.concat(tables, ignore_index = True)
+    table.to_csv(spec['path_exit'] + 'Ensemble.csv', index = False,
+                 float_format = '%.4f')
+
+    return table
+
+# end Subroutine run_ensemble
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of ensemble statistics and ranks with
+# the loop over cells (random fields with nan values)
+#
+# Input parameters : ncell - number of grid cells
+#                    nds   - number of datasets
+#
+#
+# Output parameters: table - ranks of datasets (KGE)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(ncell = 2000, nds = 6):
+
+    rng = np.random.default_rng(1)
+    arr = rng.normal(0.6, 0.2, (nds, ncell)).astype(np.float32)
+    arr[rng.random(arr.shape) < 0.1] = np.nan
+    arr[:, 0] = np.nan
+
+    stat  = ensemble(arr)
+    ranks = rank(arr, 'KGE')
+    for cell in range(ncell):
+        col = arr[:, cell]
+        val = col[~np.isnan(col)]
+        if len(val) == 0:
+            assert np.isnan(stat['mean'][cell]) and (ranks[:, cell] == 0).all()
+            continue
+        assert np.isclose(stat['mean'  ][cell], val.mean(dtype = np.float64))
+        assert np.isclose(stat['spread'][cell], val.std(dtype = np.float64))
+        assert stat['min'][cell] == val.min() and stat['max'][cell] == val.max()
+        order = np.argsort(-val, kind = 'stable')
+        assert (ranks[~np.isnan(col), cell][order] == np.arange(1, len(val) + 1)).all()
+
+    return rank_table(ranks, ['E2015', 'E38', 'E', 'G', 'GC', 'ECO'][:nds])
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    print(test1())
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_export is the program for export of STAT_project results. The
+results are saved as a long table (one row per reference, dataset, parameter
+and metric), every run is appended to the files of the output folder:
+    Statistic.csv      - all runs (CSV, always)
+    Statistic.parquet/ - all runs, one file per run (only with pyarrow)
+    Statistic.xlsx     - the last run in the old layout (optional view)
+Every run appends all tasks of the run: the results of unchanged tasks are
+loaded from the store (see STAT_store) and appended again with the time of
+the new run and cached = True. So the last run is the complete table of the
+run (load(last = True)), the calculated results of runs are the rows with
+cached = False (load(fresh = True)).
+
+Columns of the table:
+    run        - start time of run (ISO format)
+    reference  - reference dataset
+    dataset    - model dataset
+    parameter  - parameter (e.g. T_2M)
+    metric     - KGE, RMSD, CORR, DAV or STD
+    value      - value of metric
+    ci_low     - lower limit of confidence interval (NaN - no bootstrap)
+    ci_high    - upper limit of confidence interval
+    n          - sample size: number of days (DAV), number of grid cells
+                 (KGE, RMSD, CORR, STD - mean values of cells)
+    cached     - True: results of the store (not calculated in this run)
+
+The progam contains several subroutine:
+    get_table     ---> The subroutine needs for the long table of results
+    append_csv    ---> The subroutine needs for appending of table to CSV
+    append_parquet---> The subroutine needs for saving of table to Parquet
+    save_excel    ---> The subroutine needs for the Excel view of results
+    load          ---> The subroutine needs for loading of all runs
+    test1         ---> The subroutine needs for test of CSV table of runs
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:                     # Parquet is not written
+    pyarrow = None
+
+
+# Metrics of results (see STAT_runner.run_task) and metrics of Excel view
+METRICS = ['KGE', 'RMSD', 'CORR', 'DAV', 'STD']
+EXCEL   = ['KGE', 'RMSD', 'CORR', 'DAV']
+
+# Sample sizes of metrics (keys of results, see STAT_runner.run_task)
+SIZES   = {'KGE' : 'NKGE', 'RMSD' : 'NCELL', 'CORR' : 'NCELL', 'DAV' : 'N',
+           'STD' : 'NCELL'}
+
+# Columns of the table
+COLUMNS = ['run', 'reference', 'dataset', 'parameter', 'metric', 'value',
+           'ci_low', 'ci_high', 'n', 'cached']
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_table
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the long table of results: one row per reference,
+# dataset, parameter and metric (the order of tasks)
+#
+# Input parameters : tasks   - list of tasks (see STAT_config.get_tasks)
+#                    results - list of results (see STAT_runner.run_tasks)
+#                    run     - start time of run
+#                    cached  - list: True - results of the store (see
+#                              STAT_runner.run_tasks), None - calculated
+#
+#
+# Output parameters: table   - DataFrame with COLUMNS
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_table(tasks, results, run, cached = None):
+    if cached is None:
+        cached = [False] * len(tasks)
+    rows = {col : [] for col in COLUMNS}
+    for task, res, old in zip(tasks, results, cached):
+        for metric in METRICS:
+            rows['reference'].append(task['refer'])
+            rows['dataset'  ].append(task['ds'])
+            rows['parameter'].append(task['par'])
+            rows['metric'   ].append(metric)
+            rows['value'    ].append(res.get(metric, np.nan))
+            rows['ci_low'   ].append(res.get(metric + '_lo', np.nan))
+            rows['ci_high'  ].append(res.get(metric + '_hi', np.nan))
+            rows['n'        ].append(res.get(SIZES[metric], 0))
+            rows['cached'   ].append(bool(old))
+    rows['run'] = [run] * len(rows['metric'])
+
+    table = pd.DataFrame(rows, columns = COLUMNS)
+    table['value'  ] = table['value'  ].astype(np.float64)
+    table['ci_low' ] = table['ci_low' ].astype(np.float64)
+    table['ci_high'] = table['ci_high'].astype(np.float64)
+
+    return table
+
+# end Subroutine get_table
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: append_csv
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for appending of table to CSV file (the header is
+# written only to new file). The file of older version (other columns) is
+# rewritten with COLUMNS, the missing values of cached are False.
+#
+# Input parameters : path  - path for CSV file
+#                    table - DataFrame with COLUMNS (see get_table)
+#
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def append_csv(path, table):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok = True)
+    new = not os.path.exists(path) or os.path.getsize(path) == 0
+    if not new:
+        with open(path) as f:
+            header = f.readline().strip().split(',')
+        if header != COLUMNS:
+            old = pd.read_csv(path)
+            if 'cached' not in old:
+                old['cached'] = False
+            old.reindex(columns = COLUMNS).to_csv(path + '.tmp', index = False)
+            os.replace(path + '.tmp', path)
+    table.to_csv(path, mode = 'a', header = new, index = False,
+                 columns = COLUMNS)
+
+# end Subroutine append_csv
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: append_parquet
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for saving of table to Parquet dataset (folder, one
+# file per run). The table is not saved without pyarrow.
+#
+# Input parameters : folder - path for Parquet dataset
+#                    table  - DataFrame with COLUMNS (see get_table)
+#
+#
+# Output parameters: path   - path for file or None (no pyarrow)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def append_parquet(folder, table):
+    if pyarrow is None:
+        return None
+
+    os.makedirs(folder, exist_ok = True)
+    name = 'part-' + table['run'].iloc[0].replace(':', '') + '.parquet'
+    path = os.path.join(folder, name)
+    table.to_parquet(path + '.tmp', index = False)
+    os.replace(path + '.tmp', path)
+
+    return path
+
+# end Subroutine append_parquet
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: save_excel
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the Excel view of results: block of datasets
+# (rows: Unit and metrics), parameters side by side (columns: Parameter,
+# Values and CI_low, CI_high if confidence intervals are calculated). The
+# results of several references are written to sheets of references.
+#
+# Input parameters : path  - path for Excel file
+#                    table - DataFrame with COLUMNS of one run (see get_table)
+#
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def save_excel(path, table):
+    table = table[table['metric'].isin(EXCEL)]
+    ci    = table['ci_low'].notna().any()
+    refs  = table['reference'].unique()
+
+    with pd.ExcelWriter(path) as writer:
+        for refer in refs:
+            df_fin = excel_view(table[table['reference'] == refer], ci)
+            df_fin.to_excel(writer, float_format = '%.3f',
+                            sheet_name = refer if len(refs) > 1 else 'Sheet1')
+
+# end Subroutine save_excel
+#------------------------------------------------------------------------------
+
+
+def excel_view(table, ci):
+    ds     = table['dataset'  ].unique()
+    par    = table['parameter'].unique()
+    fields = ['value']
+    names  = ['Values']
+    if ci:
+        fields += ['ci_low', 'ci_high']
+        names  += ['CI_low', 'CI_high']
+
+    # Values of metrics: (dataset, parameter, metric)
+    index  = pd.MultiIndex.from_product([ds, par, EXCEL])
+    table  = table.set_index(['dataset', 'parameter', 'metric']).reindex(index)
+
+    nrow   = len(EXCEL) + 1
+    values = np.empty((len(fields), len(ds), nrow, len(par)), dtype = object)
+    for f, field in enumerate(fields):
+        arr = table[field].to_numpy().reshape(len(ds), len(par), len(EXCEL))
+        values[f, :, 1:, :] = arr.transpose(0, 2, 1)
+    values[0 , :, 0, :] = par           # Unit
+    values[1:, :, 0, :] = np.nan
+
+    # Columns: Parameter and fields for every parameter (side by side)
+    columns = []
+    for j in range(len(par)):
+        columns.append(np.tile(['Unit'] + EXCEL, len(ds)).astype(object))
+        columns.extend(values[f, :, :, j].ravel() for f in range(len(fields)))
+
+    return pd.DataFrame(np.column_stack(columns),
+                        columns = (['Parameter'] + names) * len(par),
+                        index   = np.tile(np.arange(nrow), len(ds)))
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: load
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for loading of all runs from the output folder (CSV
+# file has all runs, the Parquet dataset only runs with pyarrow)
+#
+# Input parameters : path_exit - path for results (see STAT_config)
+#                    last      - True: only the last run
+#                    fresh     - True: only calculated results (without
+#                                results of the store, cached = False)
+#
+#
+# Output parameters: table     - DataFrame with COLUMNS
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def load(path_exit, last = False, fresh = False):
+    table = pd.read_csv(os.path.join(path_exit, 'Statistic.csv'))
+    if 'cached' not in table:
+        table['cached'] = False
+    if last:
+        table = table[table['run'] == table['run'].max()]
+    if fresh:
+        table = table[~table['cached'].astype(bool)]
+
+    return table.reset_index(drop = True)
+
+# end Subroutine load
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of CSV table of runs (temporary folder): the
+# file of older version (without cached) is extended, the runs with results
+# of the store are marked, load of the last run and of calculated results
+#
+# Input parameters : -
+#
+#
+# Output parameters: table - all runs (see load)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1():
+
+    import tempfile
+
+    tasks   = [{'refer' : 'hyras', 'ds' : ds, 'par' : 'T_2M'}
+               for ds in ['E', 'GC']]
+    results = [{'KGE' : 0.5 + 0.1 * k, 'RMSD' : 1.0, 'CORR' : 0.9, 'DAV' : 0.1,
+                'STD' : 1.1, 'N' : 3652, 'NCELL' : 500, 'NKGE' : 490}
+               for k in range(len(tasks))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'RESULT', 'Statistic.csv')
+
+        # Older version: without cached
+        os.makedirs(os.path.dirname(path))
+        old = get_table(tasks, results, '2026-01-01T00:00:00.000')
+        old.drop(columns = 'cached').to_csv(path, index = False)
+
+        # Run 2: E is calculated, GC is loaded from the store; run 3: no-op
+        append_csv(path, get_table(tasks, results, '2026-01-02T00:00:00.000',
+                                   [False, True]))
+        append_csv(path, get_table(tasks, results, '2026-01-03T00:00:00.000',
+                                   [True, True]))
+
+        table = load(os.path.join(tmp, 'RESULT'))
+        assert list(table.columns) == COLUMNS and len(table) == 6 * len(METRICS)
+        last  = load(os.path.join(tmp, 'RESULT'), last = True)
+        assert len(last) == 2 * len(METRICS) and last['cached'].all()
+        assert np.allclose(last['value'][last['metric'] == 'KGE'], [0.5, 0.6])
+        fresh = load(os.path.join(tmp, 'RESULT'), fresh = True)
+        assert len(fresh) == 3 * len(METRICS)
+        assert list(fresh['run'].unique()) == ['2026-01-01T00:00:00.000',
+                                               '2026-01-02T00:00:00.000']
+        assert set(fresh['dataset'][fresh['run'] > old['run'][0]]) == {'E'}
+        assert len(load(os.path.join(tmp, 'RESULT'), True, True)) == 0
+
+    return table
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    print(test1())
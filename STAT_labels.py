@@ -0,0 +1,611 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_labels is the program for stratified statistics: KGE, RMSD, CORR and
+DAV for every label of a label grid (e.g. classes of land use, transitions
+of classes between two maps, federal states, elevation bands). The index of
+labels (label of every grid cell) is calculated once, the statistics of all
+labels are calculated by grouped reductions without loop over masks:
+    KGE, RMSD, CORR - one bincount of the fields of cells (KGE_RMSD_grid)
+    DAV             - DAV of the label mean series (analogue of cdo fldmean
+                      for every label, one matrix product with the one-hot
+                      matrix of labels per block of cells)
+The statistics of the label with all cells are the domain-wide statistics.
+The stratified statistics of the run (STAT_project.py --labels, table
+[labels] of run specification) are calculated from the fields of tasks (see
+FIELD_store) and saved to path_exit/Labels.csv (DAV of labels needs gridded
+daily data, see NC_stream.NC_labels).
+
+The progam contains several subroutine:
+    get_labels    ---> The subroutine needs for the index of labels
+    transitions   ---> The subroutine needs for labels of transitions of classes
+    bands         ---> The subroutine needs for labels of bands (e.g. elevation)
+    read_labels   ---> The subroutine needs for labels of label grid files
+    KGE_RMSD_labels --> The subroutine needs for KGE, RMSD and CORR of labels
+    label_means   ---> The subroutine needs for mean values of labels
+    DAV_labels    ---> The subroutine needs for DAV of labels
+    get_table     ---> The subroutine needs for the table of label statistics
+    run_labels    ---> The subroutine needs for label statistics of run
+    test1         ---> The subroutine needs for comparison with loop over masks
+    test2         ---> The subroutine needs for test of label statistics of run
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import numpy as np
+import pandas as pd
+import CDO_reader  as rd
+import GRID_index  as gi
+import DAV_metric  as dav
+import FIELD_store as fs
+
+
+# Number of grid cells in one block of the one-hot matrix (label_means)
+BLOCK = 65536
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_labels
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the index of labels: the label of every grid cell
+# (number of label, -1 - cell without label). Non-finite values have no
+# label.
+#
+# Input parameters : values - values of label grid (e.g. classes of land use)
+#                    names  - dictionary: value --> name of label (optional)
+#
+#
+# Output parameters: labels - dictionary: codes (number of label of cells,
+#                             int64), names (names of labels), values
+#                             (values of labels), cells (number of cells)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_labels(values, names = None):
+    values = np.asarray(values, dtype = np.float64)
+    valid  = np.isfinite(values)
+    uniq, inv = np.unique(values[valid], return_inverse = True)
+
+    codes = np.full(len(values), -1, dtype = np.int64)
+    codes[valid] = inv
+    if names is None:
+        names = {}
+
+    return {'codes'  : codes,
+            'names'  : [names.get(v, '%g' % v) for v in uniq],
+            'values' : uniq,
+            'cells'  : np.bincount(inv, minlength = len(uniq))}
+
+# end Subroutine get_labels
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: transitions
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for labels of transitions of classes between two maps
+# (e.g. land use of two periods): the label of cell is the pair of classes,
+# the name is 'before->after'
+#
+# Input parameters : before - classes of the first map
+#                    after  - classes of the second map (the same cells)
+#                    names  - dictionary: class --> name of class (optional)
+#
+#
+# Output parameters: labels - index of labels (see get_labels)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def transitions(before, after, names = None):
+    before = np.asarray(before, dtype = np.float64)
+    after  = np.asarray(after , dtype = np.float64)
+    valid  = np.isfinite(before) & np.isfinite(after)
+    if names is None:
+        names = {}
+
+    # Pair of classes: number of class before * number of classes + after
+    c_bef, i_bef = np.unique(before[valid], return_inverse = True)
+    c_aft, i_aft = np.unique(after [valid], return_inverse = True)
+    pair = np.full(len(before), np.nan)
+    pair[valid] = i_bef * len(c_aft) + i_aft
+
+    labels = get_labels(pair)
+    name   = lambda v: names.get(v, '%g' % v)
+    labels['names'] = [name(c_bef[p // len(c_aft)]) + '->' +
+                       name(c_aft[p %  len(c_aft)])
+                       for p in labels['values'].astype(np.int64)]
+
+    return labels
+
+# end Subroutine transitions
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: bands
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for labels of bands of values (e.g. elevation bands):
+# edges[i] <= value < edges[i + 1], the values out of edges have no label
+#
+# Input parameters : values - values of cells (e.g. elevation, m)
+#                    edges  - edges of bands
+#
+#
+# Output parameters: labels - index of labels (see get_labels), the names are
+#                             'edge_i-edge_i+1'
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def bands(values, edges):
+    values = np.asarray(values, dtype = np.float64)
+    edges  = np.asarray(edges , dtype = np.float64)
+
+    band = np.searchsorted(edges, values, side = 'right') - 1.0
+    band[(band < 0) | (band >= len(edges) - 1) | np.isnan(values)] = np.nan
+
+    return get_labels(band, {float(i) : '%g-%g' % (edges[i], edges[i + 1])
+                             for i in range(len(edges) - 1)})
+
+# end Subroutine bands
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: read_labels
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for labels of label grid files (cdo -outputtab, the
+# same format as the input files of KGE_RMSD). The files are aligned to the
+# grid by coordinates (see GRID_index).
+#
+# Input parameters : path     - path for label grid file
+#                    lon, lat - coordinates of grid cells
+#                    path_to  - path for the second label grid file (labels
+#                               of transitions, see transitions) or None
+#                    names    - dictionary: value --> name (optional)
+#                    folder   - path for indexes of grids (see GRID_index)
+#                    edges    - edges of bands of values (see bands) or None
+#
+#
+# Output parameters: labels   - index of labels (see get_labels)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def read_labels(path, lon, lat, path_to = None, names = None, folder = None,
+                edges = None):
+    grid   = gi.get_index(lon, lat, folder)
+    values = gi.align(grid, *rd.get_tab(path), path)
+    if edges is not None:
+        return bands(values, edges)
+    if path_to is None:
+        return get_labels(values, names)
+
+    return transitions(values, gi.align(grid, *rd.get_tab(path_to), path_to),
+                       names)
+
+# end Subroutine read_labels
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: KGE_RMSD_labels
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for mean values of KGE, RMSD and CORR of labels from
+# the fields of cells (see KGE_RMSD.KGE_RMSD_grid, FIELD_store): the cells
+# are valid as in the domain-wide mean values (KGE and RMSD are not nan,
+# CORR of cells with RMSD). All fields and labels in one bincount.
+#
+# Input parameters : labels    - index of labels (see get_labels)
+#                    kge, rmsd - KGE and RMSD fields
+#                    corr      - correlation between reference and model data
+#
+#
+# Output parameters: stat      - dictionary: KGE, RMSD, CORR (mean values of
+#                                labels), CELLS (number of valid cells)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def KGE_RMSD_labels(labels, kge, rmsd, corr):
+    nlab = len(labels['names'])
+    rmsd = np.asarray(rmsd, dtype = np.float64)
+    data = np.vstack([np.asarray(kge, dtype = np.float64), rmsd,
+                      np.where(np.isnan(rmsd), np.nan, corr)])
+
+    # Number of (field, label) of valid cells
+    ok  = ~np.isnan(data) & (labels['codes'] >= 0)
+    idx = (labels['codes'] + nlab * np.arange(3)[:, None])[ok]
+    sums = np.bincount(idx, weights = data[ok], minlength = 3 * nlab)
+    cnts = np.bincount(idx,                     minlength = 3 * nlab)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        mean = (sums / cnts).reshape(3, nlab)
+
+    return {'KGE'   : mean[0],
+            'RMSD'  : mean[1],
+            'CORR'  : mean[2],
+            'CELLS' : cnts.reshape(3, nlab)[1]}
+
+# end Subroutine KGE_RMSD_labels
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: label_means
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for mean values of labels for every time step
+# (analogue of cdo fldmean for every label, nan values are not used). The
+# sums of labels are matrix products with the one-hot matrix of labels
+# (cells, labels), the matrix is created per block of BLOCK cells.
+#
+# Input parameters : labels  - index of labels (see get_labels)
+#                    x       - data (time, cells) or (time, y, x)
+#                    weights - weights of grid cells (optional, see
+#                              NC_stream.stream_stat)
+#
+#
+# Output parameters: means   - mean values of labels (time, labels)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def label_means(labels, x, weights = None):
+    x    = np.asarray(x)
+    x    = x.reshape(x.shape[0], -1)
+    nlab = len(labels['names'])
+
+    sums = np.zeros((x.shape[0], nlab))
+    wsum = np.zeros((x.shape[0], nlab))
+    for i0 in range(0, x.shape[1], BLOCK):
+        i1   = min(i0 + BLOCK, x.shape[1])
+        code = labels['codes'][i0:i1]
+        cell = np.flatnonzero(code >= 0)
+
+        onehot = np.zeros((i1 - i0, nlab))
+        onehot[cell, code[cell]] = 1.0 if weights is None else weights[i0:i1][cell]
+
+        valid = ~np.isnan(x[:, i0:i1])
+        sums += np.where(valid, x[:, i0:i1], 0.0) @ onehot
+        wsum += valid @ onehot
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return sums / wsum
+
+# end Subroutine label_means
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: DAV_labels
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for DAV of labels (gridded daily data with the same
+# time steps): DAV of the label mean series (see label_means), the label
+# with all cells has the domain-wide DAV (DAV_metric.DAV_series of fldmean)
+#
+# Input parameters : labels  - index of labels (see get_labels)
+#                    obs     - observations         (time, cells) or (time, y, x)
+#                    lr      - low resolution data  (the same shape)
+#                    hr      - high resolution data (the same shape)
+#                    bins    - bin edges for PDF (default: TEMP_BINS)
+#                    weights - weights of grid cells (optional)
+#
+#
+# Output parameters: dav     - the DAV metric of labels
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def DAV_labels(labels, obs, lr, hr, bins = None, weights = None):
+    counts = [dav.get_pdf_cells(label_means(labels, x, weights), bins)
+              for x in (obs, lr, hr)]
+
+    return dav.DAV_counts(*counts).astype(np.float64)
+
+# end Subroutine DAV_labels
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_table
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the table of label statistics
+#
+# Input parameters : labels - index of labels (see get_labels)
+#                    stat   - dictionary: metric --> values of labels (see
+#                             KGE_RMSD_labels, DAV_labels)
+#
+#
+# Output parameters: table  - DataFrame (rows: labels, columns: metrics)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_table(labels, stat):
+    table = pd.DataFrame(stat, index = pd.Index(labels['names'], name = 'label'))
+
+    return table
+
+# end Subroutine get_table
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: run_labels
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for label statistics of run: KGE, RMSD and CORR of
+# labels (see KGE_RMSD_labels) from the fields of tasks (see FIELD_store,
+# STAT_runner.run_task) and the correlation files of tasks. The index of
+# labels is calculated once per grid. The table is saved to
+# path_exit/Labels.csv.
+#
+# Input parameters : spec  - run specification (see STAT_config), labels:
+#                            file, to, edges, names
+#                    tasks - list of tasks (see STAT_config.get_tasks)
+#
+#
+# Output parameters: table - DataFrame: reference, dataset, parameter,
+#                            label, KGE, RMSD, CORR, CELLS
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def run_labels(spec, tasks):
+    conf = spec['labels']
+    if conf is None:
+        raise KeyError('No [labels] in the run specification')
+    if not spec['path_fields']:
+        raise KeyError('No path_fields in the run specification (the fields '
+                       'of tasks are needed for labels)')
+
+    folder = spec['path_grid'] or None
+    index  = {}
+    tables = []
+    for task in tasks:
+        lon, lat, data = fs.load(spec['path_fields'], task['refer'] + '_' +
+                                 task['ds'] + '_' + task['par'])
+        grid = fs.grid_id(lon, lat)
+        if grid not in index:
+            index[grid] = read_labels(conf['file'], lon, lat, conf['to'],
+                                      conf['names'], folder, conf['edges'])
+        labels = index[grid]
+
+        path = task['paths']['corr']
+        corr = gi.align(gi.get_index(lon, lat, folder), *rd.get_tab(path), path)
+        stat = KGE_RMSD_labels(labels, data['KGE'], data['RMSD'], corr)
+
+        table = get_table(labels, stat).reset_index()
+        table.insert(0, 'parameter', task['par'])
+        table.insert(0, 'dataset', task['ds'])
+        table.insert(0, 'reference', task['refer'])
+        tables.append(table)
+
+    table = pd.concat(tables, ignore_index = True)
+    os.makedirs(spec['path_exit'], exist_ok = True)
+    table.to_csv(spec['path_exit'] + 'Labels.csv', index = False,
+                 float_format = '%.4f')
+
+    return table
+
+# end Subroutine run_labels
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of grouped reductions with the loop
+# over masks of labels and with the domain-wide statistics (one label)
+#
+# Input parameters : ncell - number of grid cells
+#                    ntime - number of days
+#                    nlab  - number of labels
+#
+#
+# Output parameters: table - statistics of labels
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(ncell = 5000, ntime = 400, nlab = 12):
+
+    import KGE_RMSD as kge
+
+    rng   = np.random.default_rng(1)
+    lon   = np.arange(ncell, dtype = np.float64)
+    lat   = np.zeros(ncell)
+    m_obs = rng.normal(10.0, 3.0, ncell)
+    s_obs = rng.uniform(1.0, 3.0, ncell)
+    m_mod = m_obs + rng.normal(0.5, 1.0, ncell)
+    s_mod = s_obs * rng.uniform(0.7, 1.3, ncell)
+    corr  = rng.uniform(-0.2, 1.0, ncell)
+    m_obs[::97] = np.nan
+
+    # Labels: classes with missing cells, transitions, bands
+    classes = rng.integers(0, nlab, ncell).astype(np.float64)
+    classes[::50] = np.nan
+    labels = get_labels(classes)
+    tr     = transitions(classes, np.where(rng.random(ncell) < 0.2, 0, classes))
+    assert tr['cells'].sum() == np.isfinite(classes).sum()
+    bd     = bands(m_obs, [0.0, 5.0, 10.0, 15.0])
+    assert bd['names'] == ['0-5', '5-10', '10-15']
+
+    kge_f, rmsd_f, ref_kge, ref_rmsd, ref_corr = kge.KGE_RMSD_grid(
+        lon, lat, m_obs, s_obs, m_mod, s_mod, corr,
+        np.empty(ncell), np.empty(ncell))
+    stat = KGE_RMSD_labels(labels, kge_f, rmsd_f, corr)
+
+    # Gridded daily data: DAV of labels
+    day = np.arange(ntime)[:, None]
+    obs = 10.0 - 10.0 * np.cos(2.0 * np.pi * day / 365.25) + \
+          rng.normal(0.0, 3.0, (ntime, ncell))
+    lr  = obs + rng.normal(1.5, 2.0, (ntime, ncell))
+    hr  = obs + rng.normal(0.5, 1.0, (ntime, ncell))
+    obs[::7, ::13] = np.nan
+    stat['DAV'] = DAV_labels(labels, obs, lr, hr)
+
+    # Loop over masks
+    valid = ~np.isnan(rmsd_f)
+    for k in range(len(labels['names'])):
+        mask = labels['codes'] == k
+        assert np.isclose(stat['KGE' ][k], np.nanmean(kge_f [mask]))
+        assert np.isclose(stat['RMSD'][k], np.nanmean(rmsd_f[mask]))
+        assert np.isclose(stat['CORR'][k], corr[mask & valid].mean())
+        index = pd.date_range('2002-01-01', periods = ntime, name = 'Date')
+        ts    = [pd.Series(np.nanmean(x[:, mask], axis = 1), index = index)
+                 for x in (obs, lr, hr)]
+        assert np.isclose(stat['DAV'][k], dav.DAV_series(*ts))
+
+    # One label: domain-wide statistics
+    one = get_labels(np.zeros(ncell))
+    res = KGE_RMSD_labels(one, kge_f, rmsd_f, corr)
+    assert np.allclose([res['KGE'][0], res['RMSD'][0], res['CORR'][0]],
+                       [ref_kge, ref_rmsd, ref_corr])
+
+    return get_table(labels, stat)
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test2
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of label statistics of run (tasks of
+# TEST_dataset, results in temporary folder): one label has the domain-wide
+# statistics of the tasks, the labels of transitions (two maps) and of
+# bands share the valid cells of the tasks
+#
+# Input parameters : path  - path for run specification (TEST_dataset.toml)
+#
+#
+# Output parameters: table - statistics of labels (transitions)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test2(path = None):
+
+    import tempfile
+    import STAT_config as config
+    import STAT_runner as runner
+
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'config', 'TEST_dataset.toml')
+    spec = config.read_config(path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec.update(path_exit   = os.path.join(tmp, 'RESULT', ''),
+                    path_store  = os.path.join(tmp, 'store'),
+                    path_fields = os.path.join(tmp, 'fields'),
+                    path_grid   = os.path.join(tmp, 'grid'))
+        tasks   = config.get_tasks(spec)
+        results = runner.run_tasks(tasks, prefetch = 0)[0]
+
+        # Label grids on the reference grid: one label, west/east, south/north
+        lon, lat, _ = rd.get_tab(tasks[0]['paths']['mean_obs'])
+        maps = {'one'  : np.ones(len(lon)),
+                'west' : np.where(lon < np.median(lon), 1.0, 2.0),
+                'south': np.where(lat < np.median(lat), 1.0, 2.0)}
+        for name, values in maps.items():
+            with open(os.path.join(tmp, name + '.csv'), 'w') as f:
+                f.write('#      date    lon    lat    value \n')
+                for x, y, v in zip(lon, lat, values):
+                    f.write(' 2006-12-31 %s %s %g \n' % (x, y, v))
+
+        def run(**conf):
+            spec['labels'] = dict({'to' : None, 'edges' : None, 'names' : {}},
+                                  **conf)
+            return run_labels(spec, tasks)
+
+        # One label: domain-wide statistics and sample size
+        table = run(file = os.path.join(tmp, 'one.csv'))
+        assert os.path.exists(spec['path_exit'] + 'Labels.csv')
+        for row, res in zip(table.itertuples(), results):
+            assert np.allclose([row.RMSD, row.CORR], [res['RMSD'], res['CORR']])
+            assert np.isclose(row.KGE, res['KGE'], equal_nan = True)
+            assert row.CELLS == res['NCELL']
+
+        # Transitions and bands: all valid cells, weighted means of RMSD
+        trans = run(file = os.path.join(tmp, 'west.csv'),
+                    to   = os.path.join(tmp, 'south.csv'),
+                    names = {1.0 : 'A', 2.0 : 'B'})
+        band  = run(file = os.path.join(tmp, 'west.csv'), edges = [0.5, 1.5, 2.5])
+        for tab in [trans, band]:
+            for res, (key, rows) in zip(results, tab.groupby('parameter',
+                                                            sort = False)):
+                assert rows['CELLS'].sum() == res['NCELL']
+                assert np.isclose((rows['RMSD'] * rows['CELLS']).sum() /
+                                  rows['CELLS'].sum(), res['RMSD'])
+        assert list(trans['label'][:4]) == ['A->A', 'A->B', 'B->A', 'B->B']
+        assert list(band ['label'][:2]) == ['0.5-1.5', '1.5-2.5']
+
+    return trans
+
+# end Subroutine test2
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    print(test1())
+    print(test2())
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_pairs is the program for pairwise comparison of land cover
+experiments (E2015, E38, E, G, GC, ECO): KGE, RMSD and CORR of all pairs of
+experiments (N x N matrices, rows - experiment as reference, columns -
+experiment as model). Every NetCDF file is read once: the sums of values and
+squares (per experiment) and the cross-products (per pair) of every grid cell
+are accumulated per chunk of time steps, the statistics of all pairs are
+calculated from these sums:
+    mean, std - own valid days of experiment (as cdo timmean, timstd)
+    corr      - days valid in both experiments (as cdo timcor)
+The values are shifted by the mean value of the first chunk (per experiment
+and cell), so the sums of squares are accurate. KGE and RMSD of pairs are
+the domain-wide mean values of KGE_RMSD.KGE_RMSD_grid.
+
+The progam contains several subroutine:
+    pair_sums     ---> The subroutine needs for sums of one chunk (all pairs)
+    pair_stat     ---> The subroutine needs for statistics of cells (all pairs)
+    pair_matrices ---> The subroutine needs for KGE, RMSD, CORR matrices
+    NC_pairs      ---> The subroutine needs for matrices of NetCDF files
+    save_pairs    ---> The subroutine needs for saving of matrices (CSV)
+    test1         ---> The subroutine needs for comparison with pairs of files
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import numpy as np
+import pandas as pd
+import netCDF4
+import KGE_RMSD  as kge
+import NC_stream as ns
+
+
+# Metrics of pairs
+METRICS = ['KGE', 'RMSD', 'CORR']
+
+
+#------------------------------------------------------------------------------
+# Subroutine: pair_sums
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for sums of one chunk of all experiments (shifted
+# values, nan values are not used). For experiments i, j and every cell:
+#     n[i, j] - number of days valid in i and j
+#     a[i, j] - sum of values of i (days valid in j)
+#     b[i, j] - sum of squares of i (days valid in j)
+#     g[i, j] - sum of products of i and j (upper triangle, j >= i)
+# If all experiments have the same missing values in the chunk (e.g. the
+# same land-sea mask), n, a and b are calculated per experiment.
+#
+# Input parameters : x   - data of the chunk (experiments, time, cells)
+#                    acc - sums of previous chunks or None
+#
+#
+# Output parameters: acc - dictionary with sums (experiments, experiments,
+#                          cells) and shift (experiments, cells)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def pair_sums(x, acc = None):
+    nexp  = x.shape[0]
+    valid = ~np.isnan(x)
+    if acc is None:
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            shift = np.nansum(x, axis = 1) / valid.sum(axis = 1)
+        acc = {'shift' : np.where(np.isfinite(shift), shift, 0.0)}
+        for key in ['n', 'a', 'b', 'g']:
+            acc[key] = np.zeros((nexp, nexp, x.shape[2]))
+
+    xs = np.where(valid, x - acc['shift'][:, None, :], 0.0)
+    if (valid == valid[0]).all():
+        acc['n'] += valid[0].sum(axis = 0)
+        acc['a'] += xs.sum(axis = 1)[:, None, :]
+        acc['b'] += (xs**2.0).sum(axis = 1)[:, None, :]
+    else:
+        v = valid.astype(np.float64)
+        for i in range(nexp):
+            acc['n'][i] += np.einsum('tc,jtc->jc', v[i], v)
+            acc['a'][i] += np.einsum('tc,jtc->jc', xs[i], v)
+            acc['b'][i] += np.einsum('tc,jtc->jc', xs[i]**2.0, v)
+    for i in range(nexp):
+        acc['g'][i, i:] += np.einsum('tc,jtc->jc', xs[i], xs[i:])
+
+    return acc
+
+# end Subroutine pair_sums
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: pair_stat
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for statistics of cells of all experiments and pairs
+# from the sums (see pair_sums). The std is the population std (as cdo
+# timstd).
+#
+# Input parameters : acc  - sums of all chunks (see pair_sums)
+#
+#
+# Output parameters: stat - dictionary: mean, std (experiments, cells), corr
+#                           (experiments, experiments, cells)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def pair_stat(acc):
+    nexp = acc['n'].shape[0]
+    diag = np.arange(nexp)
+    # Products of pairs: the lower triangle from the upper triangle
+    g = acc['g'] + np.transpose(acc['g'], (1, 0, 2))
+    g[diag, diag] = acc['g'][diag, diag]
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        n   = acc['n']
+        mx  = acc['a'] / n
+        my  = np.transpose(mx, (1, 0, 2))
+        vx  = acc['b'] / n - mx**2.0
+        vy  = np.transpose(vx, (1, 0, 2))
+        cov = g / n - mx * my
+
+        stat = {'mean' : np.where(n[diag, diag] > 0,
+                                  acc['shift'] + mx[diag, diag], np.nan),
+                'std'  : np.sqrt(np.maximum(vx[diag, diag], 0.0)),
+                'corr' : cov / np.sqrt(vx * vy)}
+
+    return stat
+
+# end Subroutine pair_stat
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: pair_matrices
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for KGE, RMSD and CORR matrices of experiments: the
+# mean values of fields of cells (see KGE_RMSD.KGE_RMSD_grid) for every
+# pair (row - reference, column - model)
+#
+# Input parameters : lon, lat - coordinates of grid cells
+#                    stat     - statistics of cells (see pair_stat)
+#                    names    - the names of experiments
+#
+#
+# Output parameters: matrices - dictionary: metric --> DataFrame (N x N)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def pair_matrices(lon, lat, stat, names):
+    nexp = len(names)
+    res  = np.full((len(METRICS), nexp, nexp), np.nan)
+    out  = [np.empty(len(lon)), np.empty(len(lon))]
+    for i in range(nexp):
+        for j in range(nexp):
+            res[:, i, j] = kge.KGE_RMSD_grid(
+                lon, lat, stat['mean'][i], stat['std'][i], stat['mean'][j],
+                stat['std'][j], stat['corr'][i, j], *out)[2:]
+
+    return {metric : pd.DataFrame(res[k],
+                                  index   = pd.Index(names, name = 'reference'),
+                                  columns = pd.Index(names, name = 'dataset'))
+            for k, metric in enumerate(METRICS)}
+
+# end Subroutine pair_matrices
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: NC_pairs
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for KGE, RMSD and CORR matrices of experiments based
+# on NetCDF files (the same grid and time steps). Every file is read once.
+#
+# Input parameters : paths - paths for NetCDF files of experiments
+#                    names - the names of experiments
+#                    var   - the name of variable (optional)
+#                    chunk - number of time steps in one chunk
+#
+#
+# Output parameters: matrices - dictionary: metric --> DataFrame (N x N)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def NC_pairs(paths, names, var = None, chunk = 31):
+    ncs = [netCDF4.Dataset(path) for path in paths]
+    try:
+        data = [ns.get_var(nc, var) for nc in ncs]
+        if len(set(v.shape for v in data)) > 1:
+            raise ValueError('Different shapes: ' +
+                             ' '.join(str(v.shape) for v in data))
+        lon, lat = ns.get_grid(ncs[0])
+
+        acc   = None
+        ntime = data[0].shape[0]
+        for t0 in range(0, ntime, chunk):
+            t1  = min(t0 + chunk, ntime)
+            acc = pair_sums(np.stack([ns.read_chunk(v, t0, t1) for v in data]),
+                            acc)
+    finally:
+        for nc in ncs:
+            nc.close()
+
+    return pair_matrices(lon, lat, pair_stat(acc), names)
+
+# end Subroutine NC_pairs
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: save_pairs
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for saving of matrices of one parameter (CSV): the
+# blocks of metrics one below the other (columns: metric, reference and
+# experiments)
+#
+# Input parameters : path     - path for CSV file
+#                    matrices - dictionary: metric --> DataFrame (see
+#                               pair_matrices)
+#
+#
+# Output parameters: table    - the saved table
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def save_pairs(path, matrices):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok = True)
+    table = pd.concat(matrices, names = ['metric'])
+    table.to_csv(path, float_format = '%.6f')
+
+    return table
+
+# end Subroutine save_pairs
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for comparison of NC_pairs with the statistics of
+# every pair of files (NC_stream.stream_stat and KGE_RMSD_arrays, synthetic
+# NetCDF files with different missing values)
+#
+# Input parameters : chunk    - number of time steps in one chunk
+#
+#
+# Output parameters: matrices - dictionary: metric --> DataFrame (N x N)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(chunk = 30):
+
+    import os
+    import tempfile
+
+    names = ['E2015', 'E38', 'GC', 'ECO']
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, name + '.nc') for name in names]
+        for k, path in enumerate(paths):
+            ns.make_test_nc(path, seed = k + 1, shift = 0.3 * k)
+        # Other missing values in one experiment (the first chunks), the
+        # same missing values in the other chunks
+        with netCDF4.Dataset(paths[2], 'a') as nc:
+            nc['T_2M'][:60:5, 2, 3] = np.ma.masked
+
+        matrices = NC_pairs(paths, names, chunk = chunk)
+        for i in range(len(names)):
+            for j in range(len(names)):
+                stat = ns.stream_stat(paths[i], paths[j], chunk = chunk)
+                ref  = kge.KGE_RMSD_arrays(stat['lon'], stat['lat'],
+                                           stat['mean_obs'], stat['std_obs'],
+                                           stat['mean_mod'], stat['std_mod'],
+                                           stat['corr'])
+                res  = [matrices[m].iloc[i, j] for m in METRICS]
+                assert np.allclose(res, ref, rtol = 1e-9, atol = 1e-9), (i, j)
+
+    return matrices
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    for metric, matrix in test1().items():
+        print(metric, '\n', matrix, '\n')
@@ -6,7 +6,19 @@ land cover maps on regional climate in convection-permitting climate simulations
 The progam contains several additional modules:
     DAV_metric       ---> module with algoritms for DAV metrci analysis
     KGE_RMSD         ---> module with KGE and RMSD metrci analysis
+    CDO_reader       ---> module for reading of CDO text output
+    STAT_runner      ---> module for running of analysis (process pool)
+    STAT_config      ---> module for run specification (TOML file)
+    STAT_export      ---> module for export of results (CSV, Parquet, Excel)
+    STAT_ensemble    ---> module for ensemble statistics of datasets (maps of
+                          spread, ranks of datasets)
     taylorDiagram    ---> module with Taylor diagram visualization and analysis
+    TAYLOR_plot      ---> module for Taylor diagrams of results (loaded only
+                          for plotting, --no-plot does not import matplotlib)
+    STAT_pairs       ---> module for pairwise comparison of model datasets
+                          (--pairs, loaded only for this mode)
+    STAT_labels      ---> module for statistics of labels of a label grid
+                          (--labels, e.g. classes of land use, transitions)
     
     
 Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang, 
@@ -28,12 +40,13 @@ Version    Date       Name
 #------------------------------------------------------------------------------
 # Import liblararies and personal modules
 #------------------------------------------------------------------------------
-import numpy as np
-import pandas as pd
-import DAV_metric as dav
-import KGE_RMSD   as kge 
-import matplotlib.pyplot as plt
-from taylorDiagram import TaylorDiagram
+import argparse
+from datetime import datetime
+import STAT_runner   as runner
+import STAT_config   as cfg
+import STAT_timer    as tm
+import STAT_export   as ex
+import STAT_ensemble as en
 #------------------------------------------------------------------------------
 
 # Start the main programm
@@ -48,243 +61,194 @@ There are several options for ds_name --> should be changed according to dataset
 '''
 
 #------------------------------------------------------------------------------
-# Section: Can be changed by user
+# Section: Can be changed by user --> run specification (TOML file)
 #------------------------------------------------------------------------------ 
 
-# Parameters for statistical work: 1 - Reference dataset GlobCover2009
-#                                  2 - Reference dataset GLC2000
-#                                  3 - Reference dataset HYRAS
-
-mode = 3
-
-
-#precip = 'yes'
-precip = 'no'
-
-
-if mode == 1:
-    # The main path for folder with data
-    mf_com = 'C:/Users/Churiulin/Desktop/STAT/'
-    # The REFERENCE dataset
-    refer = 'LU_GC'
-    # Subfolders for KGE and RMSD data
-    sf_data_ref  = 'DATA/GC/'  
-    # Subfolders for DAV data
-    sf_obs_data   = 'DATA/HYRAS/'                                              
-    sf_lr_data    = 'DATA/GC/'
-    # Calculate different parameters
-    if precip == 'yes':
-        ds_name = ['E2015', 'E38', 'E', 'G']
-        par_list = ['T_2M', 'TMAX_2M', 'TMIN_2M', 'TOT_PREC']    
-    elif precip == 'no':
-        par_list = ['T_2M', 'TMAX_2M', 'TMIN_2M']
-        ds_name = ['E2015', 'E38', 'E', 'G', 'ECO']
-    else:
-        print('No data')
-        
-elif mode == 2:
-    # The main path for folder with data
-    mf_com = 'C:/Users/Churiulin/Desktop/STAT2/'
-    # The REFERENCE dataset
-    refer = 'LU_G'
-    # Subfolders for KGE and RMSD data
-    sf_data_ref  = 'DATA/G/'       
-    # Subfolders for DAV data
-    sf_obs_data   = 'DATA/HYRAS/'                                              
-    sf_lr_data    = 'DATA/G/'
-    # Calculate different parameters
-    if precip == 'yes':
-        ds_name = ['E2015', 'E38', 'E', 'GC']
-        par_list = ['T_2M', 'TMAX_2M', 'TMIN_2M', 'TOT_PREC']    
-    elif precip == 'no':
-        par_list = ['T_2M', 'TMAX_2M', 'TMIN_2M']
-        ds_name = ['E2015', 'E38', 'E', 'GC', 'ECO']
-    else:
-        print('No data')
-    
-elif mode == 3:
-    # The main path for folder with data
-    mf_com = 'C:/Users/Churiulin/Desktop/STAT3/'
-    # Reference dataset
-    refer  = 'hyras'
-    # Subfolders for KGE and RMSD data
-    sf_data_ref  = 'DATA/HYRAS/'      
-    # Subfolders for DAV data
-    sf_obs_data   = 'DATA/HYRAS/'                                              
-    sf_lr_data    = 'DATA/GC/'      
-    # Calculate different parameters
-    if precip == 'yes':
-        ds_name = ['E2015', 'E38', 'E', 'G', 'GC']
-        par_list = ['T_2M', 'TMAX_2M', 'TMIN_2M', 'TOT_PREC']    
-    elif precip == 'no':
-        par_list = ['T_2M', 'TMAX_2M', 'TMIN_2M']
-        ds_name = ['E2015', 'E38', 'E', 'G', 'GC', 'ECO']
-    else:
-        print('No data')
-else:
-    print('Change reference dataset')
-    
-    
-# path for results
-path_exit = mf_com + 'RESULT/'
+# Run specifications for reference datasets (see config/):
+#     config/GC_refer.toml    - Reference dataset GlobCover2009 (mode 1)
+#     config/G_refer.toml     - Reference dataset GLC2000       (mode 2)
+#     config/HYRAS_refer.toml - Reference dataset HYRAS         (mode 3)
+#     config/ALL_refer.toml   - All reference datasets in one run (model
+#                               files are read once)
+#     config/TEST_dataset.toml- TEST_dataset of the project
+#
+# Usage: python STAT_project.py config/HYRAS_refer.toml [--workers N] [--force]
+#                               [--prefetch N] [--bootstrap N] [--memory]
+#                               [--profile DS_PAR] [--no-plot] [--no-excel]
+#                               [--pairs] [--labels]
+# The timing of stages is saved to path_exit/timing.json, the results are
+# appended to path_exit/Statistic.csv (see STAT_export, the results of the
+# store are appended with cached = True). With --labels the
+# statistics of labels ([labels] of run specification) are saved to
+# path_exit/Labels.csv (see STAT_labels).
 
+path_config = 'config/HYRAS_refer.toml'
 
 
 
+#------------------------------------------------------------------------------
+# Section: Main program (the guard is needed for the process pool)
+#------------------------------------------------------------------------------
 
-df_fin_list = []
-for j in range(len(ds_name)):
-    # Subfolders for KGE and RMSD data
-    sf_data_ds    = 'DATA/' + ds_name[j] + '/'
-    # Subfolders for DAV data
-    sf_hr_data    = 'DATA/' + ds_name[j] + '/'
+def main(spec, force = False, memory = False, profile = None):
+    # Tasks: all (reference, dataset, parameter) combinations
+    tasks = cfg.get_tasks(spec)
     
-    df_stat_list = []
+    #--------------------------------------------------------------------------
+    # Section 1, 2: Run KGE, RMSD and DAV statistic analysis
+    #--------------------------------------------------------------------------
     
+    results, records, cached = runner.run_tasks(
+        tasks, spec['workers'], force, memory, profile,
+        spec['path_exit'] + 'profile_' + str(profile) + '.prof',
+        spec['prefetch'])
+    tm.records.extend(records)
     
-    for i in range(len(par_list)):
-        #----------------------------------------------------------------------
-        # Section 1: Run KGE and RMSD statistic analysis
-        #----------------------------------------------------------------------
-        
-        kge_res, rmsd_res, cor_res =  kge.KGE_RMSD_analysis(mf_com    , sf_data_ref,
-                                                            sf_data_ds, par_list[i],
-                                                            refer     , ds_name[j] , mode)
-
-
+    #--------------------------------------------------------------------------
+    # Section 3: Export results (long table: CSV, Parquet) and Excel view
+    #--------------------------------------------------------------------------
     
-        #----------------------------------------------------------------------
-        # Section 2: Run DAV statistic analysis
-        #----------------------------------------------------------------------
-        
-        dav_res = dav.DAV_analysis(mf_com, sf_obs_data, 
-                                           sf_lr_data ,
-                                           sf_hr_data ,
-                                           par_list[i], refer, ds_name[j], mode)
-
-        #----------------------------------------------------------------------
-        # Section 3: Import results to excel
-        #----------------------------------------------------------------------
-        
-              
-        STAT_result ={'Unit' : par_list[i], 'KGE' : kge_res, 'RMSD' : rmsd_res, 'CORR' : cor_res, 'DAV' : dav_res}
-     
-        df_stat = pd.DataFrame(list(STAT_result.items()), columns = ['Parameter','Values'])
-
-        
-        
-        df_stat_list.append(df_stat)
+    export(spec, tasks, results, cached)
     
-    df_statistic = pd.concat(df_stat_list, axis = 1)
+    #--------------------------------------------------------------------------
+    # Section 3.1: Ensemble statistics of datasets (stacked fields of tasks)
+    #--------------------------------------------------------------------------
     
-    df_fin_list.append(df_statistic)
-
-df_fin = pd.concat(df_fin_list)  
-  
-df_fin.to_excel(path_exit + 'Statistic' + '.xlsx',  float_format='%.3f')
-
-
-
-#------------------------------------------------------------------------------
-# Section 4: Plot Taylor diagram based on Yannick Copin example
-#------------------------------------------------------------------------------
-
-"""
-Example of use of TaylorDiagram. Illustration dataset courtesy of Michael
-Rawlins., R. S. Bradley, H. F. Diaz, 2012. Assessment of regional climate
-model simulation estimates over the Northeast United States, Journal of
-Geophysical Research (2012JGRD..11723112R).
-"""
-
-# Reference std
-stdrefs = dict(tot_prec = 1.0)
-
-# Sample std,rho: Be sure to check order and that correct numbers are placed!
-#                           stddev  corrcoef    name   
-samples = dict(tot_prec = [[7.414,   0.604,    "E2015" ],
-                           [7.407,   0.606,    "E38"   ],
-                           [7.411,   0.605,    "E"     ],
-                           [7.417,   0.604,    "G"     ],
-                           [7.408,   0.605,    "GC"    ],])
-
-
-# Colormap (see http://www.scipy.org/Cookbook/Matplotlib/Show_colormaps)
-colors = plt.matplotlib.cm.Set1(np.linspace(0, 1, len(samples['tot_prec']) ) )
-
-# Here set placement of the points marking 95th and 99th significance
-# levels. For more than 102 samples (degrees freedom > 100), critical
-# correlation levels are 0.195 and 0.254 for 95th and 99th
-# significance levels respectively. Set these by eyeball using the
-# standard deviation x and y axis.
-
-#x95 = [0.01, 0.68] # For Tair, this is for 95th level (r = 0.195)
-#y95 = [0.0, 3.45]
-#x99 = [0.01, 0.95] # For Tair, this is for 99th level (r = 0.254)
-#y99 = [0.0, 3.45]
-
-x95 = [0.05, 13.9] # For Prcp, this is for 95th level (r = 0.195)
-y95 = [0.0 , 72.0]
-x99 = [0.05, 19.0] # For Prcp, this is for 99th level (r = 0.254)
-y99 = [0.0 , 72.0]
-
-rects = dict(tot_prec = 111)
-
-fig = plt.figure(figsize=(11,8))
-fig.suptitle("Precipitation (TOT_PREC)", size='x-large')
-
-for season in ['tot_prec']:
+    if spec['path_fields']:
+        with tm.stage('ensemble', rows = len(tasks)):
+            en.run_ensemble(spec, tasks)
     
-    dia = TaylorDiagram(stdrefs[season], fig = fig, rect = rects[season],
-                        label = 'HYRAS')
-
-    dia.ax.plot(x95, y95, color = 'k')
-    dia.ax.plot(x99, y99, color = 'k')
-
-    # Add samples to Taylor diagram
-    for i, (stddev, corrcoef, name) in enumerate(samples[season]):
-        
-        dia.add_sample(stddev, corrcoef,
-                       marker ='$%d$' % (i + 1), ms = 16, ls = '',
-                       #mfc='k', mec='k', # B&W
-                       mfc = colors[i], mec = colors[i], # Colors
-                       label = name)
-
-    # Add RMS contours, and label them
-    contours = dia.add_contours(levels = 5, colors = '0.5') # 5 levels
-    dia.ax.clabel(contours, inline = 1, fontsize = 16, fmt='%.1f')
-    # Tricky: ax is the polar ax (used for plots), _ax is the
-    # container (used for layout)
-    #dia._ax.set_title(season)
-
-# Add a figure legend and title. For loc option, place x,y tuple inside [ ].
-# Can also use special options here:
-# http://matplotlib.sourceforge.net/users/legend_guide.html
-
-fig.legend(dia.samplePoints,
-           [ p.get_label() for p in dia.samplePoints ],
-           numpoints = 1, prop = dict(size = 'xx-large'), loc = 'upper right')
-
-fig.tight_layout()
-
-
-plt.savefig(path_exit + 'taylor_diagram' + '.png', format='png', dpi = 300) 
-plt.show()
-
+    return results
 
 
 
+def export(spec, tasks, results, cached = None):
+    # All tasks of the run, the results of the store are marked (cached)
+    run   = datetime.now().isoformat(timespec = 'milliseconds')
+    table = ex.get_table(tasks, results, run, cached)
+    
+    with tm.stage('export', rows = len(table)):
+        ex.append_csv(spec['path_exit'] + 'Statistic.csv', table)
+        ex.append_parquet(spec['path_exit'] + 'Statistic.parquet', table)
+    
+    if spec['excel']:
+        with tm.stage('excel', rows = len(table)):
+            ex.save_excel(spec['path_exit'] + 'Statistic' + '.xlsx', table)
+    
+    return table
 
 
 
+#------------------------------------------------------------------------------
+# Section 4: Plot Taylor diagrams (normalized std and correlation of datasets)
+#------------------------------------------------------------------------------
 
+def plot(spec, results):
+    # matplotlib is imported only for plotting (see --no-plot)
+    import TAYLOR_plot as tp
 
+    return tp.plot_taylor(spec, cfg.get_tasks(spec), results, spec['workers'])
 
 
 
+#------------------------------------------------------------------------------
+# Section 5: Pairwise comparison of datasets (KGE, RMSD, CORR matrices)
+#------------------------------------------------------------------------------
 
+def pairs(spec):
+    # NetCDF modules are imported only for the pairwise comparison (--pairs)
+    import STAT_pairs as sp
 
+    tables = {}
+    for job in cfg.get_pairs(spec):
+        with tm.stage('pairs', job['par'], len(job['names'])):
+            matrices = sp.NC_pairs(job['paths'], job['names'], job['var'],
+                                   job['chunk'])
+            tables[job['par']] = sp.save_pairs(
+                spec['path_exit'] + 'Pairs_' + job['par'] + '.csv', matrices)
 
+    return tables
 
 
 
+#------------------------------------------------------------------------------
+# Section 6: Statistics of labels (KGE, RMSD, CORR of land use classes,
+#            transitions of classes, bands) from the fields of tasks
+#------------------------------------------------------------------------------
 
+def labels(spec):
+    import STAT_labels as sl
+
+    tasks = cfg.get_tasks(spec)
+    with tm.stage('labels', rows = len(tasks)):
+        table = sl.run_labels(spec, tasks)
+
+    return table
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Statistical analysis of '
+                                     'COSMO-CLM land cover experiments')
+    parser.add_argument('config', nargs = '?', default = path_config,
+                        help = 'run specification (TOML file)')
+    parser.add_argument('--workers', type = int, default = None,
+                        help = 'number of processes (0 - number of CPUs)')
+    parser.add_argument('--prefetch', type = int, default = None, metavar = 'N',
+                        help = 'number of tasks read in advance (0 - no '
+                               'prefetch)')
+    parser.add_argument('--force', action = 'store_true',
+                        help = 'calculate all tasks (also stored)')
+    parser.add_argument('--bootstrap', type = int, default = None, metavar = 'N',
+                        help = 'number of bootstrap resamples (0 - no intervals)')
+    parser.add_argument('--memory', action = 'store_true',
+                        help = 'peak memory of stages (tracemalloc, slower)')
+    parser.add_argument('--profile', default = None, metavar = 'DS_PAR',
+                        help = 'cProfile of one task, e.g. GC_T_2M or '
+                               'hyras_GC_T_2M')
+    parser.add_argument('--no-plot', action = 'store_true',
+                        help = 'statistics only (no Taylor diagrams, '
+                               'matplotlib is not imported)')
+    parser.add_argument('--no-excel', action = 'store_true',
+                        help = 'no Statistic.xlsx (results only in '
+                               'Statistic.csv)')
+    parser.add_argument('--pairs', action = 'store_true',
+                        help = 'pairwise comparison of datasets ([pairs] of '
+                               'run specification, Pairs_<par>.csv)')
+    parser.add_argument('--labels', action = 'store_true',
+                        help = 'statistics of labels of label grid ([labels] '
+                               'of run specification, Labels.csv)')
+    args = parser.parse_args()
+    
+    spec = cfg.read_config(args.config)
+    if args.labels and spec['labels'] is None:
+        parser.error('--labels: no [labels] in ' + args.config)
+    if args.workers is not None:
+        spec['workers'] = args.workers
+    if args.prefetch is not None:
+        spec['prefetch'] = args.prefetch
+    if args.bootstrap is not None:
+        spec['bootstrap']['samples'] = args.bootstrap
+    if args.no_excel:
+        spec['excel'] = False
+    
+    if args.memory:
+        tm.start_memory()
+    
+    if args.pairs:
+        pairs(spec)
+        results = None
+    else:
+        results = main(spec, args.force, args.memory, args.profile)
+        if args.labels:
+            labels(spec)
+    if results and not args.no_plot:
+        with tm.stage('taylor', rows = len(results)):
+            plot(spec, results)
+    
+    # Timing of stages (see STAT_timer)
+    records = tm.take()
+    print(tm.summary(records))
+    tm.save(spec['path_exit'] + 'timing.json', records,
+            {'config'   : args.config, 'workers' : spec['workers'],
+             'prefetch' : spec['prefetch'], 'overlap' : tm.overlap(records)})
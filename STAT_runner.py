@@ -0,0 +1,671 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_runner is the program for running of statistical analysis for all
+(reference, dataset, parameter) combinations (tasks, see STAT_config). The
+combinations are independent, so they can be calculated in parallel (process
+pool). The tasks with stored results are skipped (see STAT_store). The tasks
+with the same model files (several references) are calculated together, so
+the model files are read once. The files are aligned to the grid of the
+reference by coordinates (see GRID_index). The input files of the next tasks
+are read in a background thread (prefetch) while the current task is
+calculated, the read-ahead depth (number of tasks) is bounded.
+
+The progam contains several subroutine:
+    init_worker   ---> The subroutine needs for initialization of worker process
+    load_task     ---> The subroutine needs for reading of input files of task
+    prefetch      ---> The subroutine needs for reading of input files in advance
+    run_task      ---> The subroutine needs for analysis of one (dataset, parameter)
+    run_group     ---> The subroutine needs for analysis of tasks with timing
+    run_tasks     ---> The subroutine needs for analysis of all tasks
+    test1         ---> The subroutine needs for test of prefetch
+    test2         ---> The subroutine needs for test of shared reference data
+    test3         ---> The subroutine needs for test of continuation of runs
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import collections
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import DAV_metric  as dav
+import KGE_RMSD    as kge
+import CDO_reader  as rd
+import STAT_store  as store
+import FIELD_store as fs
+import GRID_index  as gi
+import STAT_timer  as tm
+import STAT_boot   as boot
+
+
+# Shared data of the process (reference dataset), see CDO_reader.DataContext
+ctx = None
+
+
+#------------------------------------------------------------------------------
+# Subroutine: init_worker
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for initialization of worker process: every process
+# has own DataContext, so the reference data are read once per process. Only
+# the reference data of one parameter are kept (the tasks are sorted by
+# parameter, see load_task and run_tasks), so the memory is bounded.
+#
+# Input parameters : memory - True: tracing of memory (see STAT_timer)
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def init_worker(memory = False):
+    global ctx
+    ctx = rd.DataContext()
+    if memory:
+        tm.start_memory()
+
+# end Subroutine init_worker
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: load_task
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for reading of input files of one task (stage ingest).
+# The files on other grids are aligned to the cells of reference.
+#
+# Input parameters : task - task (see STAT_config.get_tasks)
+#                    mdl  - CDO_reader.DataContext for model data
+#
+#
+# Output parameters: data - tuple: lon, lat, mean_obs, std_obs, mean_mod,
+#                           std_mod, corr (arrays of cells), ts_obs, ts_lr,
+#                           ts_hr (time series of DAV: day, value, see
+#                           DAV_metric.get_dav)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def load_task(task, mdl):
+    paths = task['paths']
+
+    # Reference data are shared by process (the data of one parameter), model
+    # data by tasks of references
+    ctx.set_scope(task['par'])
+    with tm.stage('ingest', field_name(task)) as rec:
+        lon, lat, mean_obs = ctx.get_tab(paths['mean_obs'])
+        # Rows of files on other grids are gathered to cells of reference
+        grid     = gi.get_index(lon, lat, task.get('grid'))
+        std_obs  = gi.align(grid, *ctx.get_tab(paths['std_obs' ]), paths['std_obs' ])
+        mean_mod = gi.align(grid, *mdl.get_tab(paths['mean_mod']), paths['mean_mod'])
+        std_mod  = gi.align(grid, *mdl.get_tab(paths['std_mod' ]), paths['std_mod' ])
+        corr     = gi.align(grid, *rd.get_tab (paths['corr'    ]), paths['corr'    ])
+        ts_obs = dav.get_dav(paths['dav_obs'], ctx)
+        ts_lr  = dav.get_dav(paths['dav_lr' ], ctx)
+        ts_hr  = dav.get_dav(paths['dav_hr' ], mdl)
+        rec['rows'] = len(lon) + len(std_obs) + len(mean_mod) + len(std_mod) + \
+                      len(corr) + len(ts_obs[0]) + len(ts_lr[0]) + len(ts_hr[0])
+
+    return (lon, lat, mean_obs, std_obs, mean_mod, std_mod, corr,
+            ts_obs, ts_lr, ts_hr)
+
+# end Subroutine load_task
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: prefetch
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for reading of input files of tasks in advance: the
+# files of the next tasks are read in one background thread (see load_task)
+# while the current task is calculated. Only depth tasks are read in advance,
+# so the memory is bounded. The time of waiting for the data is the stage
+# wait (see STAT_timer.overlap). The tasks with the key 'profile' are not
+# read in advance (None), the reading is a part of profile. The shared data
+# (ctx, mdl) are used by both threads, DataContext has a lock.
+#
+# Input parameters : items - list of (task, mdl), see load_task
+#                    depth - number of tasks read in advance (0 - the files
+#                            are read without thread)
+#
+#
+# Output parameters: data  - generator of data of tasks (see load_task)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def prefetch(items, depth = 1):
+    if depth <= 0:
+        for task, mdl in items:
+            yield None if task.get('profile') else load_task(task, mdl)
+        return
+
+    with ThreadPoolExecutor(max_workers = 1) as pool:
+        def submit(k):
+            task, mdl = items[k]
+            return None if task.get('profile') else pool.submit(load_task, task, mdl)
+
+        queue = collections.deque(submit(k) for k in range(min(depth, len(items))))
+        for k, (task, mdl) in enumerate(items):
+            if k + depth < len(items):
+                queue.append(submit(k + depth))
+            future = queue.popleft()
+            if future is None:
+                yield None
+                continue
+            with tm.stage('wait', field_name(task)):
+                data = future.result()
+            yield data
+
+# end Subroutine prefetch
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: run_task
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for analysis of one (dataset, parameter) combination.
+# The fields of KGE and RMSD are written to the field store (if it is set).
+# The confidence intervals are calculated if the number of bootstrap 
+# resamples is set (see STAT_boot).
+#
+# Input parameters : task - task (see STAT_config.get_tasks), the key 'key'
+#                           is saved with the fields (see STAT_store.task_key)
+#                    mdl  - CDO_reader.DataContext for model data (shared by
+#                           the tasks of several references) or None
+#                    data - data of task (see load_task) or None (the files
+#                           are read)
+#
+# Output parameters: res  - dictionary with statistics: KGE, RMSD, CORR, DAV,
+#                           STD (normalized std), N (number of days), NCELL
+#                           (number of valid cells), NKGE (number of cells
+#                           of KGE) and confidence intervals (KGE_lo, ...)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def run_task(task, mdl = None, data = None):
+    if ctx is None:
+        init_worker()
+    if mdl is None:
+        mdl = rd.DataContext()
+    if data is None:
+        data = load_task(task, mdl)
+    
+    name  = task['ds'] + '_' + task['par']
+    label = field_name(task)
+    (lon, lat, mean_obs, std_obs, mean_mod, std_mod, corr,
+     ts_obs, ts_lr, ts_hr) = data
+
+    with tm.stage('KGE_RMSD', label, len(lon)):
+        # Fields are written directly to the memory-mapped files
+        if task['fields']:
+            fields = fs.create(task['fields'], field_name(task), lon, lat,
+                               key = task.get('key'))
+        else:
+            fields = {field : np.empty(len(lon), dtype = np.float32)
+                      for field in fs.FIELDS}
+
+        kge_res, rmsd_res, cor_res = kge.KGE_RMSD_arrays(
+            lon, lat, mean_obs, std_obs, mean_mod, std_mod, corr, name,
+            fields['KGE'], fields['RMSD'])
+        std_res = kge.STD_ratio(std_obs, std_mod, fields['RMSD'])
+        # Bias of mean values (valid cells as RMSD), see STAT_ensemble
+        fields['BIAS'][:] = np.where(np.isnan(fields['RMSD']), np.nan,
+                                     kge.get_part(mean_mod, 0, len(lon)) -
+                                     kge.get_part(mean_obs, 0, len(lon)))
+        
+        if task['fields']:
+            fs.commit(task['fields'], field_name(task), fields)
+
+    with tm.stage('DAV', label, len(ts_obs[0])):
+        dav_res = dav.DAV_series(ts_obs, ts_lr, ts_hr, dav.get_bins(task['par']))
+    
+    res = {'KGE'  : float(kge_res), 'RMSD' : float(rmsd_res),
+           'CORR' : float(cor_res), 'DAV'  : float(dav_res),
+           # Taylor diagram: normalized std and number of days (significance
+           # of correlation)
+           'STD'  : float(std_res),
+           'N'    : int(np.count_nonzero(~np.isnan(ts_obs[1]))),
+           # Sample sizes of mean values of cells: valid cells (RMSD) and
+           # cells of KGE (without outliers, see KGE_RMSD.KGE_MIN)
+           'NCELL': int(np.count_nonzero(~np.isnan(fields['RMSD']))),
+           'NKGE' : int(np.count_nonzero(~np.isnan(fields['KGE'])))}
+    
+    # Bootstrap: grid cells for KGE, RMSD, CORR and days for DAV
+    bs = task['bootstrap']
+    if bs['samples']:
+        with tm.stage('bootstrap', label, bs['samples']):
+            # Own random numbers of every reference (see field_name)
+            seed_kge, seed_dav = boot.get_seed(bs['seed'], label).spawn(2)
+            ci = kge.KGE_RMSD_bootstrap(fields['KGE'], fields['RMSD'], corr,
+                                        bs['samples'], seed_kge, bs['level'],
+                                        bs['workers'])
+            ci['DAV'] = dav.DAV_bootstrap(ts_obs, ts_lr, ts_hr,
+                                          dav.get_bins(task['par']),
+                                          bs['samples'], seed_dav, bs['level'],
+                                          bs['workers'])
+        for key, (lo, hi) in ci.items():
+            res[key + '_lo'] = float(lo)
+            res[key + '_hi'] = float(hi)
+    
+    return res
+
+# end Subroutine run_task
+#------------------------------------------------------------------------------
+
+
+def field_name(task):
+    return task['refer'] + '_' + task['ds'] + '_' + task['par']
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: run_group
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for analysis of tasks with timing of stages (see
+# STAT_timer). The model files are read once for all tasks with the same
+# model files (one task per reference), the data are deleted after the last
+# of these tasks. The input files are read in advance (see prefetch). The task
+# with the key 'profile' is run with cProfile, the profile is saved to this
+# path. The results are saved to the store after every task (key of task, see
+# run_tasks), so the finished tasks are not lost if the run is stopped.
+#
+# Input parameters : group   - list of tasks (see STAT_config.get_tasks), the
+#                              tasks with the same model files one by one
+#                    depth   - number of tasks read in advance (0 - no
+#                              prefetch)
+#
+# Output parameters: res     - list of statistics (see run_task)
+#                    records - timing of stages of tasks
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def run_group(group, depth = 1):
+    if ctx is None:
+        init_worker()
+    # Model data: one DataContext per model files
+    left = collections.Counter(model_key(task) for task in group)
+    mdls = {key : rd.DataContext() for key in left}
+    items = [(task, mdls[model_key(task)]) for task in group]
+
+    res = []
+    for (task, mdl), data in zip(items, prefetch(items, depth)):
+        if task.get('profile'):
+            res.append(tm.profile(task['profile'], run_task, task, mdl))
+        else:
+            res.append(run_task(task, mdl, data))
+        if task.get('key'):
+            store.save(task['store'], task['key'], task, res[-1])
+        left[model_key(task)] -= 1
+        if left[model_key(task)] == 0:
+            mdl.clear()
+
+    return res, tm.take()
+
+# end Subroutine run_group
+#------------------------------------------------------------------------------
+
+
+def model_key(task):
+    paths = task['paths']
+    return (paths['mean_mod'], paths['std_mod'], paths['dav_hr'])
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: run_tasks
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for analysis of all tasks. The tasks with stored
+# results (the same input files and metric configuration, see STAT_store) 
+# and saved fields of the same input files (see FIELD_store) are not
+# calculated. The result of every task is saved when the task is finished
+# (see run_group), a stopped run is continued with the next run.
+# The results have the same order as the tasks (independent of the order of
+# calculations).
+#
+# Input parameters : tasks   - list of tasks (see STAT_config.get_tasks)
+#                    workers - number of processes: 1 - serial run in this
+#                              process, 0 or None - number of CPUs
+#                    force   - True: calculate all tasks
+#                    memory  - True: peak memory of stages (tracemalloc)
+#                    profile - the name of task (dataset_parameter or
+#                              reference_dataset_parameter) for
+#                              cProfile or None, the task is always calculated
+#                    profile_path - path for profile file of this task
+#                    prefetch - number of tasks read in advance (see
+#                               prefetch), 0 - no prefetch. Without prefetch
+#                               if memory is traced.
+#
+# Output parameters: results - list of results (see run_task)
+#                    records - timing of stages (see STAT_timer)
+#                    cached  - list: True - the results of task are loaded
+#                              from the store (not calculated in this run)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def run_tasks(tasks, workers = 1, force = False, memory = False, profile = None,
+              profile_path = 'profile.prof', prefetch = 1):
+    tasks   = list(tasks)
+    results = [None] * len(tasks)
+    cached  = [True] * len(tasks)
+    todo    = []
+    with tm.stage('keys') as rec:
+        keys = [store.task_key(task) for task in tasks]
+        rec['rows'] = len(keys)
+    records = tm.take()
+    for k, task in enumerate(tasks):
+        name = task['ds'] + '_' + task['par']
+        res  = None if force else store.load(task['store'], keys[k])
+        # The fields of other input data (e.g. of the previous run) are not valid
+        if task['fields'] and not fs.exists(task['fields'], field_name(task),
+                                            key = keys[k]):
+            res = None
+        if profile in (name, field_name(task)):
+            res = None
+            tasks[k] = dict(task, profile = profile_path)
+        if res is None:
+            tasks[k] = dict(tasks[k], key = keys[k])
+            cached[k] = False
+            todo.append(k)
+        else:
+            results[k] = res
+    
+    # Groups of tasks with the same model files (references), sorted by
+    # parameter: the reference data of one parameter are kept in the process
+    groups = {}
+    order  = {}
+    for k in todo:
+        groups.setdefault(model_key(tasks[k]), []).append(k)
+        order.setdefault(tasks[k]['par'], len(order))
+    groups = sorted(groups.values(), key = lambda g: order[tasks[g[0]]['par']])
+    
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = max(min(workers, len(groups)), 1)
+    # Memory of stages: the stages of prefetch thread would be mixed
+    depth   = 0 if memory else prefetch
+
+    # Batches of groups: one batch per process (the files of the next group
+    # are read during the calculation of the current group)
+    batches = [sum(groups[i::workers], []) for i in range(workers)]
+    if workers == 1:
+        if ctx is None:
+            init_worker()
+        if memory:
+            tm.start_memory()
+        new = [run_group([tasks[k] for k in batches[0]], depth)]
+    else:
+        with ProcessPoolExecutor(max_workers = workers, initializer = init_worker,
+                                 initargs = (memory,)) as pool:
+            new = list(pool.map(run_group, [[tasks[k] for k in b]
+                                            for b in batches],
+                                [depth] * len(batches)))
+    
+    # The results are saved to the store by run_group
+    for b, (res, rec) in zip(batches, new):
+        records.extend(rec)
+        for k, r in zip(b, res):
+            results[k] = r
+
+    return results, records, cached
+
+# end Subroutine run_tasks
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of prefetch (tasks of TEST_dataset, results
+# and fields in temporary folder): the results with and without prefetch are
+# the same, the files of depth tasks (not more) are read in advance (the
+# number of loaded tasks ahead of the task in calculation)
+#
+# Input parameters : path  - path for run specification (TEST_dataset.toml)
+#                    depth - read-ahead depth (number of tasks)
+#                    pause - time of calculation (s), the thread reads the
+#                            files of next tasks in this time
+#
+#
+# Output parameters: ahead - the largest number of tasks read in advance
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1(path = None, depth = 2, pause = 0.2):
+
+    global load_task, run_task
+    import json
+    import time
+    import tempfile
+    import STAT_config as config
+
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'config', 'TEST_dataset.toml')
+    spec = config.read_config(path)
+
+    # Loaded tasks and started calculations (index of task), tasks read in
+    # advance at the end of calculation
+    load, run = load_task, run_task
+    loaded    = []
+    started   = []
+    ahead     = []
+    def load_count(task, mdl):
+        loaded.append(task['index'])
+        return load(task, mdl)
+    def run_count(task, mdl = None, data = None):
+        started.append(task['index'])
+        time.sleep(pause)
+        ahead.append(len(loaded) - len(started))
+        return run(task, mdl, data)
+
+    out = {}
+    try:
+        load_task, run_task = load_count, run_count
+        with tempfile.TemporaryDirectory() as tmp:
+            spec.update(path_store  = os.path.join(tmp, 'store'),
+                        path_fields = os.path.join(tmp, 'fields'),
+                        path_grid   = os.path.join(tmp, 'grid'))
+            tasks = [dict(task, index = i)
+                     for i, task in enumerate(config.get_tasks(spec))]
+            for k in [0, depth]:
+                del loaded[:], started[:], ahead[:]
+                res = run_tasks(tasks, force = True, prefetch = k)[0]
+                out[k] = json.dumps(res, sort_keys = True)
+                assert sorted(loaded) == sorted(started) == list(range(len(tasks)))
+                assert len(ahead) == len(tasks) and max(ahead) == k, ahead
+    finally:
+        load_task, run_task = load, run
+
+    assert out[0] == out[depth]
+
+    return max(ahead)
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test2
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of shared reference data (tasks of
+# TEST_dataset and of a copy of the model dataset GC, results in temporary
+# folder): the tasks of datasets are calculated by parameter, every reference
+# file is read once, only the reference data of the last parameter are kept
+#
+# Input parameters : path  - path for run specification (TEST_dataset.toml)
+#                    depth - read-ahead depth (number of tasks)
+#
+#
+# Output parameters: reads - number of read reference files
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test2(path = None, depth = 1):
+
+    global ctx
+    import shutil
+    import tempfile
+    import STAT_config as config
+
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'config', 'TEST_dataset.toml')
+    spec = config.read_config(path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec.update(path_store  = os.path.join(tmp, 'store'),
+                    path_fields = os.path.join(tmp, 'fields'),
+                    path_grid   = os.path.join(tmp, 'grid'))
+        # Tasks: GC (all parameters), then the copy GC2 (all parameters)
+        tasks = config.get_tasks(spec)
+        for task in list(tasks):
+            paths = dict(task['paths'])
+            for key in ['mean_mod', 'std_mod', 'dav_hr']:
+                paths[key] = os.path.join(tmp, os.path.basename(paths[key]))
+                shutil.copy(task['paths'][key], paths[key])
+            tasks.append(dict(task, ds = 'GC2', paths = paths))
+
+        ctx = None
+        res = run_tasks(tasks, force = True, prefetch = depth)[0]
+        n   = len(tasks) // 2
+        assert res[:n] == res[n:]
+
+        files = {(key, task['paths'][key]) for task in tasks
+                 for key in ['mean_obs', 'std_obs', 'dav_obs', 'dav_lr']}
+        assert ctx.reads == len(files), (ctx.reads, len(files))
+        assert ctx.scope == tasks[-1]['par'] and len(ctx.data) == 4
+        assert all(tasks[-1]['par'] in name for kind, name in ctx.data)
+
+    return ctx.reads
+
+# end Subroutine test2
+#------------------------------------------------------------------------------
+
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test3
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of continuation of a stopped run (tasks of
+# TEST_dataset, results in temporary folder): the run is stopped in the task
+# stop, the results of finished tasks are in the store, the next run
+# calculates only the other tasks and has the results of a full run
+#
+# Input parameters : path  - path for run specification (TEST_dataset.toml)
+#                    stop  - number of task with error
+#
+#
+# Output parameters: count - number of tasks calculated by the next run
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test3(path = None, stop = 2):
+
+    global run_task
+    import tempfile
+    import STAT_config as config
+
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'config', 'TEST_dataset.toml')
+    spec = config.read_config(path)
+
+    run   = run_task
+    calls = []
+    first = [True]
+    def run_stop(task, mdl = None, data = None):
+        calls.append(field_name(task))
+        if first[0] and len(calls) == stop + 1:
+            raise KeyboardInterrupt('Stop of test run')
+        return run(task, mdl, data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec.update(path_store  = os.path.join(tmp, 'store'),
+                    path_fields = os.path.join(tmp, 'fields'),
+                    path_grid   = os.path.join(tmp, 'grid'))
+        tasks = config.get_tasks(spec)
+        try:
+            run_task = run_stop
+            try:
+                run_tasks(tasks, prefetch = 1)
+                raise AssertionError('The test run is not stopped')
+            except KeyboardInterrupt:
+                pass
+            keys = [store.task_key(task) for task in tasks]
+            assert sum(store.load(spec['path_store'], key) is not None
+                       for key in keys) == stop
+
+            # Next run: the other tasks, the results of a full run
+            del calls[:]
+            first[0] = False
+            res = run_tasks(tasks, prefetch = 1)[0]
+            assert calls == [field_name(task) for task in tasks[stop:]], calls
+        finally:
+            run_task = run
+        assert res == run_tasks(tasks, force = True)[0]
+
+    return len(calls)
+
+# end Subroutine test3
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    print('Tasks read in advance:', test1())
+    print('Read reference files:', test2())
+    print('Tasks of the next run:', test3())
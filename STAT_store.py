@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_store is the program for the persistent store of task results. The
+results are saved with a key which is the hash of the content of input files
+and of the metric configuration, so only new or changed (dataset, parameter)
+combinations have to be calculated.
+
+The progam contains several subroutine:
+    file_hash     ---> The subroutine needs for the hash of file content
+    metric_config ---> The subroutine needs for the metric configuration
+    task_key      ---> The subroutine needs for the key of task results
+    load          ---> The subroutine needs for loading of task results
+    save          ---> The subroutine needs for saving of task results
+    test1         ---> The subroutine needs for test of keys and store
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import json
+import hashlib
+import DAV_metric as dav
+import KGE_RMSD   as kge
+
+
+# Version of metrics: should be changed if the calculations are changed
+METRIC_VERSION = 5
+
+# Hashes of files in this process: (path, size, mtime) --> hash
+hashes = {}
+
+
+#------------------------------------------------------------------------------
+# Subroutine: file_hash
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the hash (SHA-1) of file content. The hash is
+# calculated once per process while size and modification time are the same.
+#
+# Input parameters : path - path for file
+#
+#
+# Output parameters: hash - hexadecimal hash of file content
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def file_hash(path):
+    stat = os.stat(path)
+    key  = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in hashes:
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        hashes[key] = sha.hexdigest()
+
+    return hashes[key]
+
+# end Subroutine file_hash
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: metric_config
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the metric configuration of parameter (everything
+# which changes the results except input data)
+#
+# Input parameters : par    - the name of parameter
+#
+#
+# Output parameters: config - dictionary with metric configuration
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def metric_config(par):
+    return {'version' : METRIC_VERSION,
+            'kge_min' : kge.KGE_MIN,
+            'bins'    : [float(b) for b in dav.get_bins(par)]}
+
+# end Subroutine metric_config
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: task_key
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the key of task results: hash of metric
+# configuration, of the content of all input files (with their role) and of
+# bootstrap settings (if confidence intervals are calculated)
+#
+# Input parameters : task - task (see STAT_config.get_tasks)
+#
+#
+# Output parameters: key  - hexadecimal key
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def task_key(task):
+    content = {'metric' : metric_config(task['par']),
+               'files'  : {role : file_hash(path)
+                           for role, path in sorted(task['paths'].items())}}
+    if task.get('bootstrap', {}).get('samples'):
+        content['bootstrap'] = task['bootstrap']
+    text = json.dumps(content, sort_keys = True)
+
+    return hashlib.sha1(text.encode()).hexdigest()
+
+# end Subroutine task_key
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: load
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for loading of task results from the store
+#
+# Input parameters : store   - path for the store (folder)
+#                    key     - key of task results (see task_key)
+#
+#
+# Output parameters: results - dictionary with results or None (not stored)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def load(store, key):
+    try:
+        with open(os.path.join(store, key + '.json')) as f:
+            return json.load(f)['results']
+    except (OSError, ValueError, KeyError):
+        return None
+
+# end Subroutine load
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: save
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for saving of task results to the store. The file has
+# the results and the description of task (dataset, parameter, input files).
+#
+# Input parameters : store   - path for the store (folder)
+#                    key     - key of task results (see task_key)
+#                    task    - task (see STAT_config.get_tasks)
+#                    results - dictionary with results
+#
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def save(store, key, task, results):
+    os.makedirs(store, exist_ok = True)
+    path = os.path.join(store, key + '.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'refer'     : task['refer'],
+                   'ds'        : task['ds'],
+                   'par'       : task['par'],
+                   'paths'     : task['paths'],
+                   'metric'    : metric_config(task['par']),
+                   'bootstrap' : task.get('bootstrap'),
+                   'results'   : results}, f, indent = 1)
+    os.replace(path + '.tmp', path)
+
+# end Subroutine save
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: test1
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for test of keys and store (small files in temporary
+# folder): the same content with new modification time has the same key,
+# changed content, KGE_MIN, bins or METRIC_VERSION give a new key, the store
+# returns None for missing keys and the saved results for others
+#
+# Input parameters : -
+#
+#
+# Output parameters: key - key of the test task
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def test1():
+
+    global METRIC_VERSION
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for role in ['obs', 'lr', 'hr']:
+            paths[role] = os.path.join(tmp, role + '.txt')
+            with open(paths[role], 'w') as f:
+                f.write('2002-01-01 %s\n' % role)
+        task = {'refer' : 'TEST', 'ds' : 'TEST', 'par' : 'T_2M',
+                'paths' : paths, 'bootstrap' : {'samples' : 0}}
+        key  = task_key(task)
+
+        # The same content, new modification time: the same key
+        stat = os.stat(paths['hr'])
+        os.utime(paths['hr'], ns = (stat.st_atime_ns,
+                                    stat.st_mtime_ns + 10**10))
+        assert task_key(task) == key
+
+        # Changed content: new key (and the old key with the old content)
+        with open(paths['hr'], 'a') as f:
+            f.write('2002-01-02 hr\n')
+        new = task_key(task)
+        assert new != key
+        with open(paths['hr'], 'w') as f:
+            f.write('2002-01-01 hr\n')
+        assert task_key(task) == key
+
+        # Metric configuration: KGE_MIN, bins and METRIC_VERSION
+        kge_min, bins, version = kge.KGE_MIN, dav.PDF_BINS, METRIC_VERSION
+        try:
+            kge.KGE_MIN = kge_min - 0.5
+            assert task_key(task) not in [key, new]
+            kge.KGE_MIN = kge_min
+
+            dav.PDF_BINS = dict(bins, T_2M = list(bins['T_2M'])[:-1])
+            assert task_key(task) not in [key, new]
+            dav.PDF_BINS = bins
+
+            METRIC_VERSION = version + 1
+            assert task_key(task) not in [key, new]
+        finally:
+            kge.KGE_MIN, dav.PDF_BINS, METRIC_VERSION = kge_min, bins, version
+        assert task_key(task) == key
+
+        # Store: missing key, saved results
+        store = os.path.join(tmp, 'store')
+        assert load(store, key) is None
+        save(store, key, task, {'KGE' : 0.5, 'N' : 1})
+        assert load(store, key) == {'KGE' : 0.5, 'N' : 1}
+        assert load(store, new) is None
+
+    return key
+
+# end Subroutine test1
+#------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    print('Key of test task:', test1())
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+The STAT_timer is the program for timing of STAT_project runs. Every stage
+(ingest, KGE_RMSD, DAV, export, excel, taylor) of every task (dataset, parameter) is
+saved as a record: wall time, CPU time, processed rows and peak memory
+(tracemalloc, if it is started). The records of worker processes are sent
+with the results (see STAT_runner). The input files are read in a prefetch
+thread (stage ingest), the stage wait is the time of waiting for the data,
+so the overlap of reading and calculation is 1 - wait / ingest.
+
+The progam contains several subroutine:
+    start_memory  ---> The subroutine needs for tracing of memory
+    stage         ---> The subroutine needs for timing of one stage
+    take          ---> The subroutine needs for getting of records
+    overlap       ---> The subroutine needs for overlap of reading and calculation
+    summary       ---> The subroutine needs for the table of records
+    save          ---> The subroutine needs for saving of records (JSON)
+    profile       ---> The subroutine needs for profiling of one function
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import json
+import time
+import cProfile
+import contextlib
+import tracemalloc
+
+
+# Records of this process (see stage)
+records = []
+
+
+#------------------------------------------------------------------------------
+# Subroutine: start_memory
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for tracing of memory (tracemalloc): the stages get
+# the peak memory. The tracing makes the run slower.
+#
+# Input parameters : -
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def start_memory():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+# end Subroutine start_memory
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: stage
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for timing of one stage (context manager). The record
+# is available in the block, so the number of rows can be set later:
+#     with stage('KGE_RMSD', 'GC_T_2M') as rec:
+#         ...
+#         rec['rows'] = len(lon)
+#
+# Input parameters : name   - the name of stage
+#                    task   - the name of task (dataset_parameter) or ''
+#                    rows   - number of processed rows
+#
+#
+# Output parameters: record - dictionary: stage, task, wall, cpu (s), rows,
+#                             peak_mb (None - memory is not traced), pid. The
+#                             CPU time is the time of process (the stages
+#                             of prefetch thread overlap other stages).
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def stage(name, task = '', rows = 0):
+    record = {'stage' : name, 'task' : task, 'rows' : rows, 'peak_mb' : None,
+              'pid'   : os.getpid()}
+    memory = tracemalloc.is_tracing()
+    if memory:
+        tracemalloc.reset_peak()
+        mem0 = tracemalloc.get_traced_memory()[0]
+    wall = time.perf_counter()
+    cpu  = time.process_time()
+    try:
+        yield record
+    finally:
+        record['wall'] = time.perf_counter() - wall
+        record['cpu' ] = time.process_time() - cpu
+        if memory:
+            # Peak of memory which is allocated in the stage
+            record['peak_mb'] = (tracemalloc.get_traced_memory()[1] - mem0) / 2**20
+        records.append(record)
+
+# end Subroutine stage
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: take
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for getting of records of this process. The records
+# are deleted from the process.
+#
+# Input parameters : -
+#
+# Output parameters: result - list of records (see stage)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def take():
+    result = list(records)
+    records.clear()
+
+    return result
+
+# end Subroutine take
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: overlap
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for overlap of reading and calculation (prefetch, see
+# STAT_runner.prefetch): the part of time of reading (stage ingest) which is
+# hidden behind the calculation, 1 - wait / ingest
+#
+# Input parameters : result - list of records (see stage)
+#
+#
+# Output parameters: stat   - dictionary: ingest, wait (s), overlap (0 - 1)
+#                             or None (no prefetch)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def overlap(result):
+    wall = {'ingest' : 0.0, 'wait' : 0.0}
+    for rec in result:
+        if rec['stage'] in wall:
+            wall[rec['stage']] += rec['wall']
+    if not any(rec['stage'] == 'wait' for rec in result) or wall['ingest'] <= 0:
+        return None
+
+    return dict(wall, overlap = max(0.0, 1.0 - wall['wait'] / wall['ingest']))
+
+# end Subroutine overlap
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: summary
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for the table of records (one line per record, the
+# total time of every stage and the overlap of prefetch)
+#
+# Input parameters : result - list of records (see stage)
+#
+#
+# Output parameters: text   - table
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def summary(result):
+    line  = '{:<10s} {:<20s} {:>9s} {:>9s} {:>11s} {:>10s}'
+    lines = [line.format('Stage', 'Task', 'Wall, s', 'CPU, s', 'Rows', 'Peak, MB')]
+    total = {}
+    for rec in result:
+        peak = '-' if rec['peak_mb'] is None else '{:.1f}'.format(rec['peak_mb'])
+        lines.append(line.format(rec['stage'], rec['task'] or '-',
+                                 '{:.3f}'.format(rec['wall']),
+                                 '{:.3f}'.format(rec['cpu']),
+                                 str(rec['rows']), peak))
+        wall, cpu = total.get(rec['stage'], (0.0, 0.0))
+        total[rec['stage']] = (wall + rec['wall'], cpu + rec['cpu'])
+    for name, (wall, cpu) in total.items():
+        lines.append(line.format(name, 'total', '{:.3f}'.format(wall),
+                                 '{:.3f}'.format(cpu), '', ''))
+    stat = overlap(result)
+    if stat is not None:
+        lines.append('Prefetch: ingest {:.3f} s, wait {:.3f} s, overlap '
+                     '{:.1%}'.format(stat['ingest'], stat['wait'],
+                                     stat['overlap']))
+
+    return '\n'.join(lines)
+
+# end Subroutine summary
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: save
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for saving of records to JSON file
+#
+# Input parameters : path   - path for file
+#                    result - list of records (see stage)
+#                    info   - dictionary with information about run (config,
+#                             workers, ...)
+#
+#
+# Output parameters: -
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def save(path, result, info = None):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok = True)
+    with open(path, 'w') as f:
+        json.dump(dict(info or {}, date = time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       records = result), f, indent = 1)
+
+# end Subroutine save
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: profile
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for profiling of one function (cProfile). The file
+# can be read by pstats or snakeviz.
+#
+# Input parameters : path   - path for profile file (.prof)
+#                    func   - function
+#                    args   - arguments of function
+#
+#
+# Output parameters: result - result of function
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def profile(path, func, *args):
+    prof = cProfile.Profile()
+    try:
+        result = prof.runcall(func, *args)
+    finally:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok = True)
+        prof.dump_stats(path)
+
+    return result
+
+# end Subroutine profile
+#------------------------------------------------------------------------------
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+The TAYLOR_plot is the program for Taylor diagrams of STAT_project results.
+The samples are the model datasets: normalized standard deviation (STD, see
+KGE_RMSD.STD_ratio) and correlation (CORR), the reference point is 1.0. The
+lines of significance of correlation (95 and 99 %, t test) are calculated
+from the number of days (N).
+
+The figures are created without pyplot (matplotlib.figure.Figure, Agg), so
+they can be rendered in parallel processes and without display:
+    taylor_<par>.png   - one diagram per parameter
+    taylor_diagram.png - all parameters in one figure (panels)
+The statistics are normalized by the reference, so the results of several
+references are plotted in own figures (taylor_<refer>_<par>.png,
+taylor_diagram_<refer>.png).
+
+The progam contains several subroutine:
+    t_quantile    ---> The subroutine needs for quantile of t distribution
+    r_crit        ---> The subroutine needs for critical correlation
+    get_samples   ---> The subroutine needs for samples of parameters
+    plot_panel    ---> The subroutine needs for Taylor diagram of one parameter
+    render        ---> The subroutine needs for one figure (file)
+    plot_taylor   ---> The subroutine needs for all figures of run
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Huan Zhang,
+                                                Center for Enviromental System
+                                                Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+
+import os
+import math
+import statistics
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib import cm
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from taylorDiagram import TaylorDiagram
+
+
+# Confidence levels of lines of significance
+LEVELS = [0.95, 0.99]
+
+
+#------------------------------------------------------------------------------
+# Subroutine: t_quantile
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for quantile of t distribution (two-sided test) without
+# scipy: for df <= 30 bisection of the exact distribution function of integer
+# df (Abramowitz and Stegun, 26.7.3, 26.7.4), for df > 30 the Cornish-Fisher
+# series of the normal quantile (26.7.5, error < 1e-5)
+#
+# Input parameters : level - confidence level (e.g. 0.95)
+#                    df    - degrees of freedom (int)
+#
+#
+# Output parameters: t     - quantile: P(|T| < t) = level
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def t_quantile(level, df):
+    df = max(int(df), 1)
+    z  = statistics.NormalDist().inv_cdf(0.5 + 0.5 * level)
+    if df > 30:
+        g1 = (z**3 + z) / 4.0
+        g2 = (5.0 * z**5 + 16.0 * z**3 + 3.0 * z) / 96.0
+        g3 = (3.0 * z**7 + 19.0 * z**5 + 17.0 * z**3 - 15.0 * z) / 384.0
+        g4 = (79.0 * z**9 + 776.0 * z**7 + 1482.0 * z**5 - 1920.0 * z**3 -
+              945.0 * z) / 92160.0
+        return z + g1 / df + g2 / df**2 + g3 / df**3 + g4 / df**4
+
+    lo, hi = 0.0, 2.0 * z
+    while t_prob(hi, df) < level:
+        hi = 2.0 * hi
+    for i in range(100):
+        mid = 0.5 * (lo + hi)
+        if t_prob(mid, df) < level:
+            lo = mid
+        else:
+            hi = mid
+
+    return 0.5 * (lo + hi)
+
+# end Subroutine t_quantile
+#------------------------------------------------------------------------------
+
+
+def t_prob(t, df):
+    # P(|T| < t) of t distribution with integer df (A&S 26.7.3, 26.7.4)
+    theta = math.atan(t / math.sqrt(df))
+    c2    = math.cos(theta)**2
+    if df == 1:
+        return 2.0 * theta / math.pi
+    term, total = 1.0, 1.0
+    for k in range(3 if df % 2 else 2, df - 1, 2):
+        term  = term * c2 * (k - 1) / k
+        total = total + term
+    if df % 2:
+        return 2.0 / math.pi * (theta + math.sin(theta) * math.cos(theta) * total)
+    return math.sin(theta) * total
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: r_crit
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for critical correlation (two-sided t test with n - 2
+# degrees of freedom): r = t / sqrt(n - 2 + t**2)
+#
+# Input parameters : n     - sample size (number of days)
+#                    level - confidence level
+#
+#
+# Output parameters: r     - critical correlation
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def r_crit(n, level = 0.95):
+    df = max(n - 2, 1)
+    t  = t_quantile(level, df)
+
+    return t / math.sqrt(df + t**2)
+
+# end Subroutine r_crit
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_samples
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for samples of parameters from the results of run
+# (the order of tasks)
+#
+# Input parameters : tasks   - list of tasks (see STAT_config.get_tasks)
+#                    results - list of results (see STAT_runner.run_tasks)
+#
+#
+# Output parameters: samples - dictionary: reference --> parameter --> list
+#                              of (std, corr, dataset, n)
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def get_samples(tasks, results):
+    samples = {}
+    for task, res in zip(tasks, results):
+        par = samples.setdefault(task['refer'], {}).setdefault(task['par'], [])
+        par.append((res['STD'], res['CORR'], task['ds'], res['N']))
+
+    return samples
+
+# end Subroutine get_samples
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: plot_panel
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for Taylor diagram of one parameter
+#
+# Input parameters : fig     - matplotlib Figure
+#                    rect    - subplot definition (e.g. 111 or SubplotSpec)
+#                    par     - the name of parameter
+#                    samples - list of (std, corr, dataset, n)
+#                    refer   - the name of reference dataset
+#
+#
+# Output parameters: dia     - TaylorDiagram
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def plot_panel(fig, rect, par, samples, refer):
+    std  = [s[0] for s in samples if np.isfinite(s[0])]
+    smax = max([1.5] + [1.1 * s for s in std])
+
+    dia = TaylorDiagram(1.0, fig = fig, rect = rect, label = refer,
+                        srange = (0, smax))
+
+    # Lines of significance of correlation (the smallest sample size)
+    ndays = min(s[3] for s in samples)
+    for level, ls in zip(LEVELS, ['-', '--']):
+        theta = np.arccos(r_crit(ndays, level))
+        dia.ax.plot([theta, theta], [0, dia.smax], color = 'k', ls = ls, lw = 1,
+                    label = '_')
+
+    colors = cm.Set1(np.linspace(0, 1, max(len(samples), 2)))
+    for i, (stddev, corrcoef, name, _) in enumerate(samples):
+        dia.add_sample(stddev, corrcoef,
+                       marker = '$%d$' % (i + 1), ms = 16, ls = '',
+                       mfc = colors[i], mec = colors[i],
+                       label = name)
+
+    contours = dia.add_contours(levels = 5, colors = '0.5')
+    dia.ax.clabel(contours, inline = 1, fontsize = 12, fmt = '%.1f')
+    dia._ax.set_title(par, size = 'x-large')
+
+    return dia
+
+# end Subroutine plot_panel
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: render
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for one figure (file) with Taylor diagrams of one or
+# several parameters (panels)
+#
+# Input parameters : path    - path for file (png)
+#                    samples - dictionary: parameter --> samples (see
+#                              get_samples)
+#                    refer   - the name of reference dataset
+#
+#
+# Output parameters: path    - path for file
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def render(path, samples, refer):
+    npan = len(samples)
+    ncol = min(npan, 2)
+    nrow = int(math.ceil(npan / ncol))
+
+    fig  = Figure(figsize = (11 * ncol, 8 * nrow))
+    # Agg canvas: one renderer for all labels of contours (inline labels)
+    FigureCanvasAgg(fig)
+    grid = fig.add_gridspec(nrow, ncol)
+    for k, (par, smp) in enumerate(samples.items()):
+        dia = plot_panel(fig, grid[k], par, smp, refer)
+
+    fig.legend(dia.samplePoints,
+               [p.get_label() for p in dia.samplePoints],
+               numpoints = 1, prop = dict(size = 'xx-large'), loc = 'upper right')
+    # Fixed layout: tight_layout is slow for many floating axes
+    fig.subplots_adjust(left = 0.06, right = 0.9, bottom = 0.06 / nrow,
+                        top = 1.0 - 0.06 / nrow, wspace = 0.25, hspace = 0.3)
+    fig.savefig(path, format = 'png', dpi = 150)
+
+    return path
+
+# end Subroutine render
+#------------------------------------------------------------------------------
+
+
+
+#------------------------------------------------------------------------------
+# Subroutine: plot_taylor
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for all figures of run: one figure per parameter and
+# one figure with all parameters. The figures are rendered in parallel.
+#
+# Input parameters : spec    - run specification (see STAT_config)
+#                    tasks   - list of tasks (see STAT_config.get_tasks)
+#                    results - list of results (see STAT_runner.run_tasks)
+#                    workers - number of processes (0 or None - number of
+#                              CPUs)
+#
+#
+# Output parameters: paths   - list of files
+#
+#
+# Author: Center for Environmental Systems Research (CESR) --- 18.10.2026
+#
+#------------------------------------------------------------------------------
+
+def plot_taylor(spec, tasks, results, workers = 1):
+    samples = get_samples(tasks, results)
+
+    jobs = []
+    for refer, smp_ref in samples.items():
+        # The name of reference only for several references
+        name = refer + '_' if len(samples) > 1 else ''
+        for par, smp in smp_ref.items():
+            jobs.append((spec['path_exit'] + 'taylor_' + name + par + '.png',
+                         {par : smp}, refer))
+        jobs.append((spec['path_exit'] + 'taylor_diagram' +
+                     ('_' + refer if name else '') + '.png', smp_ref, refer))
+
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+
+    paths = [job[0] for job in jobs]
+    smp   = [job[1] for job in jobs]
+    refer = [job[2] for job in jobs]
+    if workers <= 1:
+        return list(map(render, paths, smp, refer))
+
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        return list(pool.map(render, paths, smp, refer))
+
+# end Subroutine plot_taylor
+#------------------------------------------------------------------------------
@@ -26,12 +26,38 @@ Version    Date       Name
 ---------- ---------- ----                                                   
     1.1    2021-03-23 Evgenii Churiulin, Center for Enviromental System Research (CESR)
            Adaptation of tailor diagram to the research task
+    1.2    2026-10-18 Center for Enviromental System Research (CESR)
+           Many samples in one artist (add_samples), cached RMS contour grid,
+           pyplot is imported only if it is needed (figure, tests)
                  
 
 """
 
 import numpy as NP
-import matplotlib.pyplot as PLT
+
+
+# Cache of RMS fields for contours: (refstd, smin, smax, tmax) -> (ts, rs, rms)
+RMS_CACHE = {}
+
+
+def rms_grid(refstd, smin, smax, tmax, npts=50):
+    """
+    Grid (theta, radius) and centered RMS difference for contours. The
+    fields are calculated once for the same *refstd* and axis extent and
+    reused by all diagrams (the arrays are read only).
+    """
+
+    key = (refstd, smin, smax, tmax, npts)
+    if key not in RMS_CACHE:
+        rs, ts = NP.meshgrid(NP.linspace(smin, smax, npts),
+                             NP.linspace(0, tmax, npts))
+        # Compute centered RMS difference
+        rms = NP.sqrt(refstd**2 + rs**2 - 2*refstd*rs*NP.cos(ts))
+        for arr in (ts, rs, rms):
+            arr.flags.writeable = False
+        RMS_CACHE[key] = (ts, rs, rms)
+
+    return RMS_CACHE[key]
 
 
 class TaylorDiagram(object):
@@ -87,6 +113,7 @@ class TaylorDiagram(object):
                         grid_locator1=gl1, tick_formatter1=tf1)
 
         if fig is None:
+            import matplotlib.pyplot as PLT   # pyplot only without *fig*
             fig = PLT.figure()
 
         ax = FA.FloatingSubplot(fig, rect, grid_helper = ghelper)
@@ -135,6 +162,7 @@ class TaylorDiagram(object):
 
         # Collect sample points for latter use (e.g. legend)
         self.samplePoints = [l]
+        self.sampleCollections = []     # Samples of add_samples
 
     def add_sample(self, stddev, corrcoef, *args, **kwargs):
         """
@@ -149,6 +177,41 @@ class TaylorDiagram(object):
 
         return l
 
+    def add_samples(self, stddev, corrcoef, labels=None, colors=None,
+                    **kwargs):
+        """
+        Add many samples (arrays *stddev*, *corrcoef*) to the Taylor
+        diagram as one artist (`Axes.scatter`), e.g. ensemble members.
+        * labels: labels of samples (see sample_legend)
+        * colors: colors of samples (list of colors or values for *cmap*)
+        *kwargs* are directly propagated to the `Axes.scatter` command.
+        """
+
+        stddev = NP.asarray(stddev, dtype=float)
+        theta = NP.arccos(NP.asarray(corrcoef, dtype=float))
+        pts = self.ax.scatter(theta, stddev, c=colors, **kwargs)
+        pts.sample_labels = [] if labels is None else list(labels)
+        self.sampleCollections.append(pts)
+
+        return pts
+
+    def sample_legend(self, pts):
+        """
+        Legend handles and labels for samples of *pts* (see add_samples).
+        The handles are not added to the diagram.
+        """
+
+        from matplotlib.lines import Line2D
+
+        # Colors of values (cmap) are mapped at drawing, map them now
+        pts.update_scalarmappable()
+        colors = pts.get_facecolors()
+        handles = [Line2D([], [], ls='', marker='o',
+                          color=colors[i % len(colors)])
+                   for i in range(len(pts.sample_labels))]
+
+        return handles, pts.sample_labels
+
     def add_grid(self, *args, **kwargs):
         """Add a grid."""
 
@@ -159,10 +222,7 @@ class TaylorDiagram(object):
         Add constant centered RMS difference contours, defined by *levels*.
         """
 
-        rs, ts = NP.meshgrid(NP.linspace(self.smin, self.smax),
-                             NP.linspace(0, self.tmax))
-        # Compute centered RMS difference
-        rms = NP.sqrt(self.refstd**2 + rs**2 - 2*self.refstd*rs*NP.cos(ts))
+        ts, rs, rms = rms_grid(self.refstd, self.smin, self.smax, self.tmax)
 
         contours = self.ax.contour(ts, rs, rms, levels, **kwargs)
 
@@ -172,6 +232,8 @@ class TaylorDiagram(object):
 def test1():
     """Display a Taylor diagram in a separate axis."""
 
+    import matplotlib.pyplot as PLT
+
     # Reference dataset
     x = NP.linspace(0, 4*NP.pi, 100)
     data = NP.sin(x)
@@ -227,6 +289,8 @@ def test2():
     Climatology-oriented example (after iteration w/ Michael A. Rawlins).
     """
 
+    import matplotlib.pyplot as PLT
+
     # Reference std
     stdref = 48.491
 
@@ -264,8 +328,43 @@ def test2():
     return dia
 
 
+def test3(n=100):
+    """
+    Ensemble example: *n* members in one artist (add_samples).
+    """
+
+    import matplotlib.pyplot as PLT
+    from matplotlib.colors import to_rgba
+
+    rng = NP.random.default_rng(1)
+    stddev = 1.0 + 0.2*rng.standard_normal(n)
+    corrcoef = NP.clip(0.8 + 0.1*rng.standard_normal(n), 0, 1)
+
+    fig = PLT.figure()
+
+    dia = TaylorDiagram(1.0, fig=fig, label='Reference', srange=(0, 1.5))
+    pts = dia.add_samples(stddev, corrcoef, colors=NP.arange(n),
+                          labels=['Member %d' % (i+1) for i in range(n)],
+                          cmap='viridis', s=12)
+
+    contours = dia.add_contours(levels=5, colors='0.5')
+    PLT.clabel(contours, inline=1, fontsize=10, fmt='%.1f')
+    fig.colorbar(pts, ax=dia._ax, label='Member')
+
+    # Legend handles have the colors of points (values mapped by cmap)
+    handles, labels = dia.sample_legend(pts)
+    colors = pts.to_rgba(pts.get_array())
+    assert len(handles) == n
+    for handle, color in zip(handles, colors):
+        assert NP.allclose(to_rgba(handle.get_color()), color)
+
+    return dia
+
+
 if __name__ == '__main__':
 
+    import matplotlib.pyplot as PLT
+
     #dia = test1()
     dia = test2()
 